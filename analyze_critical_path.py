@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Desglose de la ruta crítica de latencia por ruta del api-gateway
+E-Commerce Microservices Platform
+
+Para cada traza (Jaeger/Zipkin, ver trace_export.py) arma el árbol de spans
+y calcula la ruta crítica exclusiva: partiendo del final del span raíz se
+retrocede por el hijo que termina más tarde antes del cursor; el tiempo no
+cubierto por hijos es tiempo propio del span. Así cada microsegundo de la
+petición se atribuye a exactamente un salto:
+
+  - "<servicio> (self)"          tiempo propio del handler (span SERVER)
+  - "<origen>→<destino> (red)"   tiempo de un span CLIENT no cubierto por el SERVER remoto
+                                 (red, balanceo, búsqueda en Eureka, colas)
+  - "<servicio> <operación>"     spans internos (JPA/JDBC, RestTemplate, etc.)
+
+Los tiempos se agregan por ruta del gateway y por salto en histogramas
+logarítmicos de tamaño fijo, por lo que la memoria no crece con la cantidad
+de spans (exportaciones de millones de spans).
+
+Uso:
+  python3 analyze_critical_path.py traces.jsonl --gateway-service api-gateway --top 5
+"""
+import argparse
+import math
+import sys
+
+from trace_export import build_tree, endpoint_name, iter_traces
+
+PERCENTILES = (50, 95, 99)
+
+
+class LogHistogram:
+    """Histograma de buckets logarítmicos (~2% de error relativo), memoria acotada"""
+
+    BASE = math.log(1.02)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+
+    def add(self, value):
+        index = int(math.log(value) / self.BASE) if value >= 1 else -1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return 0.0 if index < 0 else math.exp((index + 0.5) * self.BASE)
+        return 0.0
+
+
+def hop_name(span):
+    if span.kind == 'server':
+        return f'{span.service} (self)'
+    if span.kind == 'client':
+        target = span.remote_service or 'remote'
+        return f'{span.service}→{target} (red)'
+    return f'{span.service} {span.name}'
+
+
+def critical_path(root, children):
+    """{salto: µs} de la ruta crítica exclusiva de una traza"""
+    contributions = {}
+    # (span, inicio y fin recortados a la ventana del padre)
+    stack = [(root, root.start, root.start + root.duration)]
+    while stack:
+        span, start, end = stack.pop()
+        cursor = end
+        kids = sorted(children.get(span.span_id, ()), key=lambda child: child.start + child.duration, reverse=True)
+        for child in kids:
+            child_start = max(child.start, start)
+            child_end = min(child.start + child.duration, cursor)
+            if child_end <= child_start or child_end <= start:
+                continue
+            if cursor - child_end > 0:
+                key = hop_name(span)
+                contributions[key] = contributions.get(key, 0) + cursor - child_end
+            stack.append((child, child_start, child_end))
+            cursor = child_start
+            if cursor <= start:
+                break
+        if cursor > start:
+            key = hop_name(span)
+            contributions[key] = contributions.get(key, 0) + cursor - start
+    return contributions
+
+
+class RouteBreakdown:
+    def __init__(self):
+        self.total = LogHistogram()
+        self.hops = {}
+
+    def add(self, duration, contributions):
+        self.total.add(duration)
+        for hop, value in contributions.items():
+            self.hops.setdefault(hop, LogHistogram()).add(value)
+
+
+def analyze(paths, gateway_service):
+    routes = {}
+    traces = spans = 0
+    for path in paths:
+        for trace in iter_traces(path):
+            traces += 1
+            spans += len(trace)
+            roots, children = build_tree(trace)
+            for root in roots:
+                if gateway_service and root.service != gateway_service:
+                    continue
+                routes.setdefault(endpoint_name(root), RouteBreakdown()).add(
+                    root.duration, critical_path(root, children))
+    return routes, traces, spans
+
+
+def _ms(value):
+    return f'{value / 1000:.1f}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ruta crítica de latencia por ruta del gateway (Jaeger/Zipkin)')
+    parser.add_argument('exports', nargs='+', help='archivos de exportación (.json, .jsonl, .gz)')
+    parser.add_argument('--gateway-service', default='api-gateway',
+                        help="servicio de los spans raíz ('' = todas las raíces)")
+    parser.add_argument('--top', type=int, default=10, help='rutas a mostrar (por cantidad de peticiones)')
+    parser.add_argument('--hops', type=int, default=6, help='saltos a mostrar por ruta')
+    args = parser.parse_args()
+
+    routes, traces, spans = analyze(args.exports, args.gateway_service)
+    if not routes:
+        print(f"❌ No se encontraron spans raíz de '{args.gateway_service}'")
+        sys.exit(1)
+
+    print(f'🔎 {traces} trazas, {spans} spans, {len(routes)} rutas')
+    for route, breakdown in sorted(routes.items(), key=lambda item: item[1].total.count, reverse=True)[:args.top]:
+        total = breakdown.total
+        percentiles = '  '.join(f'p{p} {_ms(total.percentile(p))} ms' for p in PERCENTILES)
+        print(f'\n🛣️  {route}  ({total.count} peticiones)  {percentiles}')
+        ranked = sorted(breakdown.hops.items(), key=lambda item: item[1].total, reverse=True)
+        for hop, histogram in ranked[:args.hops]:
+            share = histogram.total / total.total if total.total else 0.0
+            print(f'    {share:>5.0%}  {hop:<55} '
+                  + '  '.join(f'p{p} {_ms(histogram.percentile(p))} ms' for p in PERCENTILES))
+        if ranked:
+            print(f'    ➜ salto dominante: {ranked[0][0]}')
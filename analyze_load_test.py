@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Gate de regresión de rendimiento sobre los resultados de Locust
+E-Commerce Microservices Platform
+
+Compara <prefijo>_stats.csv y <prefijo>_stats_history.csv contra una línea
+base guardada y termina con código 1 si algún endpoint (método + nombre)
+empeora en RPS, tasa de fallos o p50/p95/p99. Los CSV se leen fila a fila (sin cargarlos
+completos), por lo que sirve para historiales de pruebas de varias horas.
+
+Tolerancia estadística: una diferencia es regresión solo si supera la
+tolerancia relativa (--tolerance) Y es significativa frente a la
+variabilidad observada en el historial (|Δ| > z · error estándar, con
+media y varianza por endpoint calculadas en streaming).
+
+Uso:
+  python3 analyze_load_test.py reports/locust-stats --save-baseline reports/locust-baseline.json
+  python3 analyze_load_test.py reports/locust-stats --baseline reports/locust-baseline.json
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from pathlib import Path
+
+AGGREGATED = 'Aggregated'
+
+# métrica -> (columna en _stats.csv, columna en _stats_history.csv, mayor es peor)
+METRICS = {
+    'rps': ('Requests/s', 'Requests/s', False),
+    'p50': ('50%', '50%', True),
+    'p95': ('95%', '95%', True),
+    'p99': ('99%', '99%', True),
+}
+
+
+class RunningStats:
+    """Media y varianza en una sola pasada (algoritmo de Welford)"""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+
+def iter_rows(path):
+    """Filas de un CSV de Locust como diccionarios, una a la vez"""
+    with open(path, newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def endpoint_key(row):
+    """
+    Clave de un endpoint: 'MÉTODO nombre' como las columnas Type y Name de
+    Locust, para no mezclar GET /x con POST /x ('Aggregated' queda igual)
+    """
+    return f"{row['Type']} {row['Name']}".strip()
+
+
+def to_float(value):
+    """Valor numérico de una celda; None para 'N/A' o vacío"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize(prefix, warmup=30):
+    """
+    Resumen por endpoint: valores finales de _stats.csv y media/varianza de
+    cada métrica en _stats_history.csv (descartando los primeros `warmup` s)
+    """
+    summary = {}
+    for row in iter_rows(f'{prefix}_stats.csv'):
+        name = endpoint_key(row)
+        requests = to_float(row['Request Count']) or 0.0
+        failures = to_float(row['Failure Count']) or 0.0
+        entry = {
+            'requests': requests,
+            'failure_rate': failures / requests if requests else 0.0,
+            'history': {},
+        }
+        for metric, (column, _, _) in METRICS.items():
+            entry[metric] = to_float(row[column])
+        summary[name] = entry
+
+    history_path = Path(f'{prefix}_stats_history.csv')
+    if history_path.exists():
+        start = None
+        history = {}
+        for row in iter_rows(history_path):
+            timestamp = to_float(row['Timestamp'])
+            if start is None:
+                start = timestamp
+            if timestamp - start < warmup or not to_float(row['User Count']):
+                continue
+            stats = history.setdefault(endpoint_key(row), {metric: RunningStats() for metric in METRICS})
+            for metric, (_, column, _) in METRICS.items():
+                value = to_float(row[column])
+                if value is not None:
+                    stats[metric].add(value)
+        for name, stats in history.items():
+            if name in summary:
+                summary[name]['history'] = {metric: s.to_dict() for metric, s in stats.items() if s.count}
+    return summary
+
+
+def compare_metric(metric, baseline, current, tolerance, z, latency_floor):
+    """Devuelve (delta relativo, es_regresión) para una métrica"""
+    base_value, value = baseline.get(metric), current.get(metric)
+    if base_value is None or value is None:
+        return None, False
+    higher_is_worse = METRICS[metric][2]
+    delta = value - base_value
+    relative = delta / base_value if base_value else (math.inf if delta else 0.0)
+    if higher_is_worse:
+        # Latencias: ignorar diferencias menores al piso absoluto (ms)
+        worse = relative > tolerance and delta > latency_floor
+    else:
+        worse = relative < -tolerance
+
+    base_hist = baseline['history'].get(metric)
+    hist = current['history'].get(metric)
+    if worse and base_hist and hist and base_hist['count'] > 1 and hist['count'] > 1:
+        base_stats, stats = RunningStats(**base_hist), RunningStats(**hist)
+        standard_error = math.sqrt(base_stats.variance / base_stats.count + stats.variance / stats.count)
+        worse = abs(stats.mean - base_stats.mean) > z * standard_error
+    return relative, worse
+
+
+def compare(baseline, current, tolerance, failure_tolerance, z, latency_floor):
+    """Filas de la tabla de diferencias y lista de regresiones"""
+    rows, regressions = [], []
+    names = sorted(set(baseline) | set(current), key=lambda name: (name == AGGREGATED, name))
+    for name in names:
+        if name not in current:
+            rows.append((name, 'ausente en la ejecución actual', True))
+            regressions.append(f'{name}: endpoint ausente')
+            continue
+        if name not in baseline:
+            rows.append((name, 'nuevo (sin línea base)', False))
+            continue
+
+        cells, regressed = [], False
+        base, cur = baseline[name], current[name]
+        failure_delta = cur['failure_rate'] - base['failure_rate']
+        failed = failure_delta > failure_tolerance
+        cells.append(f"fail {base['failure_rate']:.1%}→{cur['failure_rate']:.1%}{' ❌' if failed else ''}")
+        if failed:
+            regressions.append(f'{name}: failure rate +{failure_delta:.1%}')
+        regressed |= failed
+
+        for metric in METRICS:
+            relative, worse = compare_metric(metric, base, cur, tolerance, z, latency_floor)
+            if relative is None:
+                continue
+            cells.append(f"{metric} {base[metric]:.4g}→{cur[metric]:.4g} ({relative:+.0%}){' ❌' if worse else ''}")
+            if worse:
+                regressions.append(f'{name}: {metric} {relative:+.0%}')
+            regressed |= worse
+        rows.append((name, '  '.join(cells), regressed))
+    return rows, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gate de regresión de pruebas de carga (Locust)')
+    parser.add_argument('prefix', nargs='?', default='reports/locust-stats', help='prefijo --csv de Locust')
+    parser.add_argument('--baseline', default='reports/locust-baseline.json', help='línea base a comparar')
+    parser.add_argument('--save-baseline', metavar='PATH', help='guardar esta ejecución como línea base')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='tolerancia relativa (0.10 = 10%%)')
+    parser.add_argument('--failure-tolerance', type=float, default=0.01, help='aumento absoluto de tasa de fallos')
+    parser.add_argument('--z', type=float, default=3.0, help='desviaciones estándar para significancia')
+    parser.add_argument('--latency-floor', type=float, default=5, help='diferencia mínima de latencia (ms)')
+    parser.add_argument('--warmup', type=float, default=30, help='segundos iniciales ignorados del historial')
+    args = parser.parse_args()
+
+    if not Path(f'{args.prefix}_stats.csv').exists():
+        print(f'❌ No se encontró {args.prefix}_stats.csv')
+        sys.exit(2)
+    current = summarize(args.prefix, args.warmup)
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f'✅ Línea base guardada en {args.save_baseline} ({len(current)} endpoints)')
+        sys.exit(0)
+
+    if not Path(args.baseline).exists():
+        print(f'❌ No se encontró la línea base {args.baseline} (crear con --save-baseline)')
+        sys.exit(2)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows, regressions = compare(baseline, current, args.tolerance, args.failure_tolerance, args.z,
+                                  args.latency_floor)
+    width = max(len(name) for name, _, _ in rows)
+    print(f'📊 {args.prefix} vs {args.baseline} (tolerancia {args.tolerance:.0%}, z={args.z:g})')
+    for name, cells, regressed in rows:
+        print(f"  {'❌' if regressed else '✅'} {name:<{width}}  {cells}")
+
+    if regressions:
+        print(f'\n❌ {len(regressions)} regresión(es) de rendimiento:')
+        for regression in regressions:
+            print(f'  - {regression}')
+        sys.exit(1)
+    print('\n✅ Sin regresiones de rendimiento')
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Analizador de amplificación de llamadas (fan-out / N+1) en trazas
+E-Commerce Microservices Platform
+
+Recorre exportaciones Jaeger/Zipkin traza por traza (ver trace_export.py) y,
+para cada span SERVER (un endpoint atendido por un servicio), mide las
+llamadas remotas (spans CLIENT) que hace mientras atiende la petición:
+
+  - llamadas downstream por petición y por servicio destino
+  - profundidad serial (cadena más larga de llamadas que no se solapan) y
+    paralelismo máximo (llamadas simultáneas)
+  - fracción de la latencia del endpoint gastada en llamadas remotas
+  - patrón N+1: la misma operación remota repetida en una petición
+
+Caso típico: FavouriteServiceImpl.findAll() hace dos RestTemplate seriales
+(user-service y product-service) por favorito, con profundidad serial 2N.
+
+Uso:
+  python3 analyze_trace_fanout.py traces.json [otra-exportación.jsonl ...] --top 10
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+
+from trace_export import build_tree, endpoint_name, iter_traces
+
+# Repeticiones de la misma operación remota en una petición para marcar N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+
+class EndpointFanout:
+    """Acumulados por endpoint; no guarda spans individuales"""
+
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.max_calls = 0
+        self.serial_depth = 0
+        self.max_parallelism = 0
+        self.remote_us = 0
+        self.total_us = 0
+        self.targets = Counter()
+        self.repeated = Counter()
+
+    def add(self, duration, calls):
+        self.requests += 1
+        self.calls += len(calls)
+        self.max_calls = max(self.max_calls, len(calls))
+        self.serial_depth += serial_depth(calls)
+        self.max_parallelism = max(self.max_parallelism, parallelism(calls))
+        self.remote_us += min(covered_time(calls), duration)
+        self.total_us += duration
+        operations = Counter((target, operation) for target, operation, _ in calls)
+        self.targets.update(target for target, _, _ in calls)
+        for operation, count in operations.items():
+            if count >= N_PLUS_ONE_THRESHOLD:
+                self.repeated[operation] += 1
+
+    def summary(self, name):
+        requests = self.requests or 1
+        return {
+            'endpoint': name,
+            'requests': self.requests,
+            'calls_per_request': self.calls / requests,
+            'max_calls': self.max_calls,
+            'serial_depth': self.serial_depth / requests,
+            'max_parallelism': self.max_parallelism,
+            'remote_share': self.remote_us / self.total_us if self.total_us else 0.0,
+            'calls_by_service': {target: count / requests for target, count in self.targets.most_common()},
+            'n_plus_one': [f'{target} {operation}' for (target, operation), _ in self.repeated.most_common()],
+        }
+
+
+def remote_target(span, children):
+    """(servicio, operación) destino de un span CLIENT"""
+    for child in children.get(span.span_id, ()):
+        if child.kind == 'server':
+            return span.remote_service or child.service, child.name
+    return span.remote_service or span.name, span.name
+
+
+def remote_calls(server_span, children):
+    """Spans CLIENT emitidos por el servicio mientras atiende server_span"""
+    calls = []
+    stack = list(children.get(server_span.span_id, ()))
+    while stack:
+        span = stack.pop()
+        if span.kind == 'client':
+            target, operation = remote_target(span, children)
+            calls.append((target, operation, span))
+        elif span.kind != 'server' and span.service == server_span.service:
+            stack.extend(children.get(span.span_id, ()))
+    return calls
+
+
+def serial_depth(calls):
+    """Máximo de llamadas que no se solapan entre sí (esperas seriales)"""
+    depth, last_end = 0, float('-inf')
+    for _, _, span in sorted(calls, key=lambda call: call[2].start + call[2].duration):
+        if span.start >= last_end:
+            depth += 1
+            last_end = span.start + span.duration
+    return depth
+
+
+def parallelism(calls):
+    events = []
+    for _, _, span in calls:
+        events.append((span.start, 1))
+        events.append((span.start + span.duration, -1))
+    current = peak = 0
+    for _, delta in sorted(events):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def covered_time(calls):
+    """Tiempo cubierto por la unión de los intervalos de llamadas remotas (µs)"""
+    covered, end = 0, float('-inf')
+    for _, _, span in sorted(calls, key=lambda call: call[2].start):
+        span_end = span.start + span.duration
+        if span.start > end:
+            covered += span.duration
+            end = span_end
+        elif span_end > end:
+            covered += span_end - end
+            end = span_end
+    return covered
+
+
+def analyze(paths):
+    endpoints = {}
+    traces = spans = 0
+    for path in paths:
+        for trace in iter_traces(path):
+            traces += 1
+            spans += len(trace)
+            _, children = build_tree(trace)
+            for span in trace:
+                if span.kind == 'server':
+                    stats = endpoints.setdefault(endpoint_name(span), EndpointFanout())
+                    stats.add(span.duration, remote_calls(span, children))
+    return endpoints, traces, spans
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Amplificación de llamadas downstream en trazas Jaeger/Zipkin')
+    parser.add_argument('exports', nargs='+', help='archivos de exportación (.json, .jsonl, .gz)')
+    parser.add_argument('--top', type=int, default=10, help='endpoints a mostrar')
+    parser.add_argument('--json', metavar='PATH', help='guardar el ranking completo en JSON')
+    args = parser.parse_args()
+
+    endpoints, traces, spans = analyze(args.exports)
+    if not endpoints:
+        print('❌ No se encontraron spans SERVER en las exportaciones')
+        sys.exit(1)
+
+    ranking = sorted((stats.summary(name) for name, stats in endpoints.items()),
+                     key=lambda item: (item['calls_per_request'], item['serial_depth']), reverse=True)
+    print(f'🔎 {traces} trazas, {spans} spans, {len(endpoints)} endpoints')
+    print(f'\n📊 Peores amplificadores (top {args.top}):')
+    for item in ranking[:args.top]:
+        if not item['calls_per_request']:
+            continue
+        print(f"  - {item['endpoint']}  ({item['requests']} peticiones)")
+        print(f"      {item['calls_per_request']:.1f} llamadas/petición (máx {item['max_calls']}), "
+              f"profundidad serial {item['serial_depth']:.1f}, paralelismo máx {item['max_parallelism']}, "
+              f"{item['remote_share']:.0%} del tiempo en llamadas remotas")
+        targets = ', '.join(f'{target} x{count:.1f}' for target, count in item['calls_by_service'].items())
+        print(f'      destinos: {targets}')
+        if item['n_plus_one']:
+            print(f"      ⚠️  patrón N+1: {', '.join(item['n_plus_one'])}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(ranking, f, indent=2)
+        print(f'\n✅ Ranking guardado en {args.json}')
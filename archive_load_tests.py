@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Archivo histórico de pruebas de carga (SQLite)
+E-Commerce Microservices Platform
+
+Cada ejecución de run-load-test.sh sobrescribe reports/locust-*. Esta
+herramienta agrega cada ejecución (stats, stats_history, failures y
+exceptions, más git SHA, versión y tags de imagen) a una base SQLite
+indexada por endpoint, timestamp y versión, y responde consultas de
+tendencia sin recorrer los CSV originales.
+
+Uso:
+  python3 archive_load_tests.py ingest reports/locust-stats [--version 1.0.0] [--tag api-gateway=ebasg42/api-gateway:1.0.1]
+  python3 archive_load_tests.py runs [--last 20]
+  python3 archive_load_tests.py trend "GET Get Order by ID" --metric p95 --last 50
+  python3 archive_load_tests.py plot "GET Get Order by ID" --metric p95 --last 500 --output reports/trend.png
+"""
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import sqlite3
+import yaml
+
+from analyze_load_test import iter_rows, to_float
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_DB = BASE_DIR / 'reports' / 'load-tests.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at INTEGER NOT NULL,
+    ingested_at INTEGER NOT NULL,
+    git_sha TEXT,
+    version TEXT,
+    image_tags TEXT,
+    source TEXT,
+    content_hash TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS stats (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    type TEXT, name TEXT NOT NULL,
+    requests INTEGER, failures INTEGER,
+    median REAL, average REAL, min REAL, max REAL, content_size REAL,
+    rps REAL, fps REAL,
+    p50 REAL, p66 REAL, p75 REAL, p80 REAL, p90 REAL, p95 REAL, p98 REAL, p99 REAL, p999 REAL, p9999 REAL, p100 REAL
+);
+CREATE TABLE IF NOT EXISTS history (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    ts INTEGER NOT NULL, user_count INTEGER,
+    type TEXT, name TEXT NOT NULL,
+    rps REAL, fps REAL, p50 REAL, p95 REAL, p99 REAL,
+    total_requests INTEGER, total_failures INTEGER
+);
+CREATE TABLE IF NOT EXISTS failures (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    method TEXT, name TEXT, error TEXT, occurrences INTEGER
+);
+CREATE TABLE IF NOT EXISTS exceptions (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    count INTEGER, message TEXT, traceback TEXT, nodes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_version ON runs(version);
+CREATE INDEX IF NOT EXISTS idx_stats_name_run ON stats(name, run_id);
+CREATE INDEX IF NOT EXISTS idx_history_name_ts ON history(name, ts);
+CREATE INDEX IF NOT EXISTS idx_history_run ON history(run_id);
+CREATE INDEX IF NOT EXISTS idx_failures_name_run ON failures(name, run_id);
+'''
+
+# columna de la tabla stats -> columna de locust-stats_stats.csv
+STATS_COLUMNS = {
+    'type': 'Type', 'name': 'Name', 'requests': 'Request Count', 'failures': 'Failure Count',
+    'median': 'Median Response Time', 'average': 'Average Response Time', 'min': 'Min Response Time',
+    'max': 'Max Response Time', 'content_size': 'Average Content Size', 'rps': 'Requests/s',
+    'fps': 'Failures/s', 'p50': '50%', 'p66': '66%', 'p75': '75%', 'p80': '80%', 'p90': '90%',
+    'p95': '95%', 'p98': '98%', 'p99': '99%', 'p999': '99.9%', 'p9999': '99.99%', 'p100': '100%',
+}
+
+HISTORY_COLUMNS = {
+    'ts': 'Timestamp', 'user_count': 'User Count', 'type': 'Type', 'name': 'Name',
+    'rps': 'Requests/s', 'fps': 'Failures/s', 'p50': '50%', 'p95': '95%', 'p99': '99%',
+    'total_requests': 'Total Request Count', 'total_failures': 'Total Failure Count',
+}
+
+TEXT_COLUMNS = {'type', 'name'}
+TREND_METRICS = [column for column in STATS_COLUMNS if column not in TEXT_COLUMNS]
+
+
+def connect(path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL')
+    db.executescript(SCHEMA)
+    return db
+
+
+def git_sha():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def deployed_image_tags():
+    """Imágenes declaradas en los Deployments de k8s/services"""
+    tags = {}
+    for manifest in sorted((BASE_DIR / 'k8s' / 'services').glob('*/deployment*.yaml')):
+        with open(manifest) as f:
+            for doc in yaml.safe_load_all(f):
+                if doc and doc.get('kind') == 'Deployment':
+                    for container in doc['spec']['template']['spec'].get('containers', []):
+                        tags[doc['metadata']['name']] = container.get('image')
+    return tags
+
+
+def content_hash(prefix):
+    digest = hashlib.sha256()
+    for suffix in ('_stats.csv', '_stats_history.csv'):
+        path = Path(f'{prefix}{suffix}')
+        if path.exists():
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _values(row, columns):
+    return tuple(row.get(source) if column in TEXT_COLUMNS else to_float(row.get(source))
+                 for column, source in columns.items())
+
+
+def _insert(db, table, run_id, columns, rows):
+    placeholders = ', '.join('?' * (len(columns) + 1))
+    db.executemany(f'INSERT INTO {table} (run_id, {", ".join(columns)}) VALUES ({placeholders})',
+                   ((run_id, *values) for values in rows))
+
+
+def ingest(db, prefix, version=None, tags=None):
+    """Agregar una ejecución; devuelve run_id o None si ya estaba archivada"""
+    stats_path = Path(f'{prefix}_stats.csv')
+    digest = content_hash(prefix)
+    if db.execute('SELECT 1 FROM runs WHERE content_hash = ?', (digest,)).fetchone():
+        return None
+
+    history_path = Path(f'{prefix}_stats_history.csv')
+    started_at = int(stats_path.stat().st_mtime)
+    if history_path.exists():
+        first = next(iter_rows(history_path), None)
+        if first:
+            started_at = int(to_float(first['Timestamp']) or started_at)
+
+    image_tags = deployed_image_tags()
+    image_tags.update(tags or {})
+    with db:
+        run_id = db.execute(
+            'INSERT INTO runs (started_at, ingested_at, git_sha, version, image_tags, source, content_hash) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (started_at, int(time.time()), git_sha(), version, json.dumps(image_tags, sort_keys=True),
+             str(prefix), digest)
+        ).lastrowid
+        _insert(db, 'stats', run_id, STATS_COLUMNS,
+                (_values(row, STATS_COLUMNS) for row in iter_rows(stats_path)))
+        if history_path.exists():
+            _insert(db, 'history', run_id, HISTORY_COLUMNS,
+                    (_values(row, HISTORY_COLUMNS) for row in iter_rows(history_path)))
+        failures_path = Path(f'{prefix}_failures.csv')
+        if failures_path.exists():
+            _insert(db, 'failures', run_id, ['method', 'name', 'error', 'occurrences'],
+                    ((row['Method'], row['Name'], row['Error'], int(row['Occurrences']))
+                     for row in iter_rows(failures_path)))
+        exceptions_path = Path(f'{prefix}_exceptions.csv')
+        if exceptions_path.exists():
+            _insert(db, 'exceptions', run_id, ['count', 'message', 'traceback', 'nodes'],
+                    ((int(row['Count']), row['Message'], row['Traceback'], row['Nodes'])
+                     for row in iter_rows(exceptions_path)))
+    return run_id
+
+
+def trend(db, endpoint, metric, last, version=None):
+    """
+    [(run_id, started_at, version, git_sha, valor)] de las últimas `last`
+    ejecuciones. `endpoint` es la clave 'MÉTODO nombre' de analyze_load_test,
+    para no mezclar GET /x con POST /x ('Aggregated' queda igual)
+    """
+    if metric not in TREND_METRICS:
+        raise ValueError(f"Métrica desconocida: '{metric}' (opciones: {', '.join(TREND_METRICS)})")
+    query = (f'SELECT r.run_id, r.started_at, r.version, r.git_sha, s.{metric} '
+             'FROM stats s JOIN runs r ON r.run_id = s.run_id '
+             "WHERE TRIM(COALESCE(s.type, '') || ' ' || s.name) = ?")
+    params = [endpoint]
+    if version:
+        query += ' AND r.version = ?'
+        params.append(version)
+    query += ' ORDER BY r.started_at DESC LIMIT ?'
+    params.append(last)
+    return list(reversed(db.execute(query, params).fetchall()))
+
+
+def image_tag(value):
+    """(servicio, imagen) de un --tag SERVICIO=IMAGEN"""
+    service_name, separator, image = value.partition('=')
+    if not separator or not service_name or not image:
+        raise argparse.ArgumentTypeError(f"'{value}' no tiene la forma SERVICIO=IMAGEN")
+    return service_name, image
+
+
+def sparkline(values):
+    bars = '▁▂▃▄▅▆▇█'
+    present = [value for value in values if value is not None]
+    if not present:
+        return ''
+    low, high = min(present), max(present)
+    span = (high - low) or 1
+    return ''.join(' ' if value is None else bars[int((value - low) / span * (len(bars) - 1))] for value in values)
+
+
+def plot(points, endpoint, metric, output):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.plot([run_id for run_id, *_ in points], [value for *_, value in points], marker='.', linewidth=1)
+    ax.set_title(f'{endpoint} - {metric}')
+    ax.set_xlabel('run_id')
+    ax.set_ylabel(metric)
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(output, dpi=100)
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archivo histórico de pruebas de carga (SQLite)')
+    parser.add_argument('--db', default=str(DEFAULT_DB))
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = commands.add_parser('ingest', help='agregar una ejecución al archivo')
+    ingest_parser.add_argument('prefix', nargs='?', default='reports/locust-stats')
+    ingest_parser.add_argument('--version', help='versión desplegada probada')
+    ingest_parser.add_argument('--tag', action='append', default=[], type=image_tag, metavar='SERVICIO=IMAGEN')
+
+    runs_parser = commands.add_parser('runs', help='listar ejecuciones archivadas')
+    runs_parser.add_argument('--last', type=int, default=20)
+
+    for name in ('trend', 'plot'):
+        query_parser = commands.add_parser(name, help=f'{name} de una métrica por endpoint')
+        query_parser.add_argument('endpoint', help="clave 'MÉTODO nombre' (p. ej. 'GET Get Order by ID')")
+        query_parser.add_argument('--metric', default='p95', choices=TREND_METRICS)
+        query_parser.add_argument('--last', type=int, default=50)
+        query_parser.add_argument('--version')
+        if name == 'plot':
+            query_parser.add_argument('--output', default='reports/trend.png')
+    args = parser.parse_args()
+
+    db = connect(args.db)
+
+    if args.command == 'ingest':
+        if not Path(f'{args.prefix}_stats.csv').exists():
+            print(f'❌ No se encontró {args.prefix}_stats.csv')
+            sys.exit(2)
+        run_id = ingest(db, args.prefix, args.version, dict(args.tag))
+        if run_id is None:
+            print(f'ℹ️  {args.prefix} ya estaba archivado en {args.db}')
+        else:
+            print(f'✅ Ejecución {run_id} archivada en {args.db}')
+
+    elif args.command == 'runs':
+        rows = db.execute('SELECT run_id, started_at, version, git_sha, source FROM runs '
+                          'ORDER BY started_at DESC LIMIT ?', (args.last,)).fetchall()
+        for run_id, started_at, version, sha, source in rows:
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_at))
+            print(f'  {run_id:>5}  {started}  {version or "-":<10} {(sha or "-")[:10]}  {source}')
+
+    else:
+        points = trend(db, args.endpoint, args.metric, args.last, args.version)
+        if not points:
+            print(f"❌ Sin datos para '{args.endpoint}'")
+            sys.exit(1)
+        if args.command == 'trend':
+            for run_id, started_at, version, sha, value in points:
+                started = time.strftime('%Y-%m-%d %H:%M', time.localtime(started_at))
+                print(f'  {run_id:>5}  {started}  {version or "-":<10} {(sha or "-")[:10]}  {value}')
+            print(f'\n  {args.metric}: {sparkline([value for *_, value in points])}')
+        else:
+            plot(points, args.endpoint, args.metric, args.output)
+            print(f'📈 {len(points)} ejecuciones graficadas en {args.output}')
@@ -0,0 +1,142 @@
+"""
+Cliente HTTP/1.1 asíncrono con conexiones keep-alive
+E-Commerce Microservices Platform
+
+Pool mínimo sobre asyncio.open_connection (sin dependencias externas) para
+las herramientas que hablan con muchos servicios a la vez: mantiene por
+(host, puerto) las conexiones ociosas para reutilizarlas, limita las
+concurrentes y vuelve a abrir la conexión si el servidor cerró una ociosa.
+
+Solo cubre lo que necesitan los actuators de Spring Boot y un proxy:
+cuerpos con Content-Length, chunked o hasta EOF, sin TLS ni HTTP/2.
+"""
+import asyncio
+from collections import defaultdict, namedtuple
+
+Response = namedtuple('Response', 'status reason headers body')
+
+
+class ProtocolError(Exception):
+    """Mensaje HTTP mal formado"""
+
+
+def header(headers, name, default=None):
+    """Valor de una cabecera de [(nombre, valor)] sin distinguir mayúsculas"""
+    name = name.lower()
+    return next((value for key, value in headers if key.lower() == name), default)
+
+
+def is_chunked(headers):
+    return 'chunked' in (header(headers, 'Transfer-Encoding') or '').lower()
+
+
+async def read_head(reader):
+    """(primera línea, [(nombre, valor)]) de un mensaje; (None, []) si la conexión se cerró antes"""
+    line = await reader.readline()
+    if not line:
+        return None, []
+    headers = []
+    while True:
+        raw = await reader.readline()
+        if raw in (b'\r\n', b'\n'):
+            break
+        if not raw:
+            raise ProtocolError('cabeceras incompletas')
+        name, separator, value = raw.decode('latin-1').partition(':')
+        if not separator:
+            raise ProtocolError(f'cabecera inválida: {raw!r}')
+        headers.append((name.strip(), value.strip()))
+    return line.decode('latin-1').rstrip('\r\n'), headers
+
+
+async def read_body(reader, headers, until_eof=False):
+    """Cuerpo según Transfer-Encoding o Content-Length (o hasta EOF si until_eof)"""
+    if is_chunked(headers):
+        chunks = []
+        while True:
+            size_line = (await reader.readline()).split(b';')[0].strip()
+            if not size_line:
+                raise ProtocolError('chunk sin tamaño')
+            size = int(size_line, 16)
+            if size == 0:
+                while await reader.readline() not in (b'\r\n', b'\n', b''):
+                    pass   # trailers
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    length = header(headers, 'Content-Length')
+    if length is not None:
+        return await reader.readexactly(int(length))
+    return await reader.read() if until_eof else b''
+
+
+def encode_head(first_line, headers):
+    return ''.join([f'{first_line}\r\n'] + [f'{name}: {value}\r\n' for name, value in headers] + ['\r\n']).encode('latin-1')
+
+
+class ConnectionPool:
+    """Conexiones keep-alive por (host, puerto), con un máximo de peticiones concurrentes por destino"""
+
+    def __init__(self, limit=16, connect_timeout=2.0):
+        self.limit = limit
+        self.connect_timeout = connect_timeout
+        self.opened = 0
+        self._idle = defaultdict(list)
+        self._slots = {}
+
+    async def request(self, host, port, method, target, headers=(), body=b'', timeout=5.0):
+        """Response de la petición; timeout cubre la conexión, el envío y la lectura completa"""
+        key = (host, port)
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(self.limit)
+        async with self._slots[key]:
+            return await asyncio.wait_for(self._exchange(key, method, target, list(headers), body), timeout)
+
+    async def _exchange(self, key, method, target, headers, body):
+        while self._idle[key]:
+            reader, writer = self._idle[key].pop()
+            try:
+                return await self._send(key, reader, writer, method, target, headers, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                continue   # el servidor cerró la conexión ociosa: probar con otra
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*key), self.connect_timeout)
+        self.opened += 1
+        return await self._send(key, reader, writer, method, target, headers, body)
+
+    async def _send(self, key, reader, writer, method, target, headers, body):
+        try:
+            if header(headers, 'Host') is None:
+                headers = [('Host', f'{key[0]}:{key[1]}')] + headers
+            if body and header(headers, 'Content-Length') is None and not is_chunked(headers):
+                headers.append(('Content-Length', str(len(body))))
+            writer.write(encode_head(f'{method} {target} HTTP/1.1', headers) + body)
+            await writer.drain()
+
+            status_line, response_headers = await read_head(reader)
+            if status_line is None:
+                raise ConnectionResetError('el servidor cerró la conexión')
+            version, _, rest = status_line.partition(' ')
+            code, _, reason = rest.partition(' ')
+            if not code.isdigit():
+                raise ProtocolError(f'línea de estado inválida: {status_line!r}')
+            status = int(code)
+            empty = method == 'HEAD' or status in (204, 304) or 100 <= status < 200
+            framed = is_chunked(response_headers) or header(response_headers, 'Content-Length') is not None
+            payload = b'' if empty else await read_body(reader, response_headers, until_eof=not framed)
+            keep_alive = (version == 'HTTP/1.1' and (empty or framed)
+                          and (header(response_headers, 'Connection') or '').lower() != 'close')
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle[key].append((reader, writer))
+        else:
+            writer.close()
+        return Response(status, reason, response_headers, payload)
+
+    async def close(self):
+        writers = [writer for connections in self._idle.values() for _, writer in connections]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de la JVM por servicio y perfil
+E-Commerce Microservices Platform
+
+Arranca cada imagen ebasg42/<servicio>:<VERSION> con los JAVA_TOOL_OPTIONS
+de cada perfil de JVM_PROFILES (service_registry.py), con límites de CPU y
+memoria como los del Deployment, y mide el tiempo hasta que
+<context_path>/actuator/health responde 200. También registra el
+"Started ... in N seconds" que imprime Spring Boot.
+
+Los servicios se arrancan aislados (perfil dev con H2, sin Eureka, Config
+Server ni Zipkin), de modo que se mide la JVM y el contexto de Spring y no
+la red del clúster.
+
+Para el perfil appcds se hace primero una ejecución de entrenamiento con
+-XX:ArchiveClassesAtExit sobre un volumen montado en el directorio de
+CDS_ARCHIVE; en las imágenes desplegadas ese archivo debe generarse en el
+Dockerfile (con -Xshare:auto, si falta, la JVM arranca sin él), por eso
+appcds no es candidato mientras CDS_IN_IMAGE sea False.
+
+Con --write el resultado se guarda en reports/jvm-startup.yaml y
+generate_k8s_configs.py elige para cada servicio el perfil más rápido entre
+los candidatos del entorno (jvm_profiles_for: solo los que mantienen el
+rendimiento pico, salvo opt-in con non_peak_jvm).
+
+Uso:
+  python3 benchmark_jvm_startup.py --runs 3 --write
+  python3 benchmark_jvm_startup.py user-service --profile baseline --profile appcds
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import PurePosixPath
+
+import yaml
+
+from generate_k8s_configs import DEFAULT_RESOURCES, STARTUP_FILE
+from service_registry import BASE_DIR, CDS_ARCHIVE, DOCKER_USER, JVM_PROFILES, SERVICES, VERSION
+
+STARTED = re.compile(r'Started \S+ in ([\d.]+) seconds')
+HOST_PORT_BASE = 18000
+POLL_INTERVAL = 0.1
+
+
+def docker(*args, check=True):
+    return subprocess.run(['docker', *args], capture_output=True, text=True, check=check).stdout.strip()
+
+
+def start_container(image, port, host_port, options, cpus, memory, volume=None):
+    env = {
+        'SPRING_PROFILES_ACTIVE': 'dev',
+        'SERVER_PORT': str(port),
+        'EUREKA_CLIENT_ENABLED': 'false',
+        'SPRING_CLOUD_CONFIG_ENABLED': 'false',
+        'SPRING_ZIPKIN_ENABLED': 'false',
+    }
+    if options:
+        env['JAVA_TOOL_OPTIONS'] = ' '.join(options)
+    command = ['run', '-d', '--rm', '--cpus', str(cpus), '--memory', memory, '-p', f'{host_port}:{port}']
+    for key, value in env.items():
+        command += ['-e', f'{key}={value}']
+    if volume:
+        command += ['-v', f'{volume}:{PurePosixPath(CDS_ARCHIVE).parent}']
+    return docker(*command, image)
+
+
+def wait_ready(url, timeout):
+    """Segundos hasta que el health responde 200 (None si se agota el tiempo)"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+def measure(service_name, profile, runs, cpus, memory, timeout, host_port):
+    """{'runs': [s, ...], 'medianSeconds': s, 'startedSeconds': s} de un servicio con un perfil"""
+    config = SERVICES[service_name]
+    image = f'{DOCKER_USER}/{service_name}:{VERSION}'
+    url = f"http://127.0.0.1:{host_port}{config.get('context_path', '').rstrip('/')}/actuator/health"
+    options = JVM_PROFILES[profile]['options']
+    volume = None
+    if any(option.startswith('-XX:SharedArchiveFile=') for option in options):
+        # Entrenamiento: la JVM vuelca las clases cargadas al salir (docker stop → SIGTERM)
+        volume = f'cds-{service_name}'
+        docker('volume', 'create', volume)
+        training = [option for option in options if not option.startswith(('-XX:SharedArchiveFile=', '-Xshare'))]
+        container = start_container(image, config['port'], host_port,
+                                    training + [f'-XX:ArchiveClassesAtExit={CDS_ARCHIVE}'], cpus, memory, volume)
+        ready = wait_ready(url, timeout)
+        docker('stop', container, check=False)
+        if ready is None:
+            print(f'    ⚠️  {service_name}: el entrenamiento de AppCDS no llegó a ready')
+
+    times, started = [], []
+    for _ in range(runs):
+        container = start_container(image, config['port'], host_port, options, cpus, memory, volume)
+        try:
+            ready = wait_ready(url, timeout)
+            match = STARTED.search(docker('logs', container, check=False))
+        finally:
+            docker('rm', '-f', container, check=False)
+        if ready is None:
+            print(f'    ❌ {service_name} [{profile}]: sin respuesta en {timeout}s')
+            continue
+        times.append(round(ready, 2))
+        if match:
+            started.append(float(match.group(1)))
+    if volume:
+        docker('volume', 'rm', volume, check=False)
+    if not times:
+        return None
+    return {
+        'runs': times,
+        'medianSeconds': round(statistics.median(times), 2),
+        'startedSeconds': round(statistics.median(started), 2) if started else None,
+    }
+
+
+if __name__ == '__main__':
+    limits = DEFAULT_RESOURCES['limits']
+    parser = argparse.ArgumentParser(description='Tiempo hasta ready por servicio y perfil de JVM')
+    parser.add_argument('services', nargs='*', default=list(SERVICES), help='servicios (default: todos)')
+    parser.add_argument('--profile', action='append', choices=list(JVM_PROFILES), help='perfil (repetible; default: todos)')
+    parser.add_argument('--runs', type=int, default=3, help='arranques por servicio y perfil')
+    parser.add_argument('--cpus', type=float, default=int(limits['cpu'][:-1]) / 1000, help='límite de CPU del contenedor')
+    parser.add_argument('--memory', default=limits['memory'].replace('Gi', 'g').replace('Mi', 'm'),
+                        help='límite de memoria del contenedor')
+    parser.add_argument('--timeout', type=int, default=300, help='segundos máximos hasta ready')
+    parser.add_argument('--write', action='store_true', help=f'guardar en {STARTUP_FILE.relative_to(BASE_DIR)}')
+    args = parser.parse_args()
+
+    unknown = set(args.services) - set(SERVICES)
+    if unknown:
+        print(f"❌ Servicios desconocidos: {', '.join(sorted(unknown))}")
+        sys.exit(2)
+
+    results = {}
+    for index, service_name in enumerate(args.services):
+        print(f'\n⏱️  {service_name}')
+        results[service_name] = {}
+        for profile in args.profile or JVM_PROFILES:
+            try:
+                result = measure(service_name, profile, args.runs, args.cpus, args.memory, args.timeout,
+                                 HOST_PORT_BASE + index)
+            except (OSError, subprocess.CalledProcessError) as error:
+                print(f'❌ Error ejecutando docker: {error}')
+                sys.exit(1)
+            if result is None:
+                continue
+            results[service_name][profile] = result
+            print(f"  - {profile:<17} mediana {result['medianSeconds']:.2f}s  mín {min(result['runs']):.2f}s"
+                  + (f"  (Spring: {result['startedSeconds']:.2f}s)" if result['startedSeconds'] else ''))
+        if results[service_name]:
+            fastest = min(results[service_name], key=lambda name: results[service_name][name]['medianSeconds'])
+            print(f'  ➜ más rápido: {fastest}')
+
+    if args.write:
+        STARTUP_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(STARTUP_FILE, 'w') as f:
+            yaml.dump({name: value for name, value in results.items() if value}, f,
+                      default_flow_style=False, sort_keys=True)
+        print(f'\n✅ Resultados guardados en {STARTUP_FILE}')
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Modelo de capacidad (Universal Scalability Law + ley de Little)
+E-Commerce Microservices Platform
+
+Ajusta X(N) = λN / (1 + σ(N-1) + κN(N-1)) con N = usuarios concurrentes y
+X = RPS a partir de locust-stats_stats_history.csv, por endpoint (si el
+historial es completo, --csv-full-history), para el total y por servicio
+(suma de sus endpoints). Con la ley de Little (R = N/X - Z) sobre el modelo
+total predice la latencia media y, con la relación p95/media observada, el
+p95 para cada nivel de carga.
+
+Resultado por servicio, con su propio modelo: RPS de saturación (en la
+rodilla del servicio, sin pasar la concurrencia que cumple el p95 objetivo
+ni el rango medido), RPS por pod y réplicas necesarias para el RPS objetivo. Las cotas se guardan en
+reports/capacity-recommendations.yaml, que create_scaled_objects() y
+create_hpa() de generate_network_security_configs.py usan en lugar de los
+valores fijos (perPodRps es el umbral de RPS del ScaledObject de KEDA).
+
+Uso:
+  python3 capacity_model.py reports/locust-stats --target-rps 800 --target-p95 1000
+"""
+import argparse
+import math
+import sys
+from pathlib import Path
+
+import yaml
+
+from analyze_load_test import AGGREGATED, endpoint_key, iter_rows, to_float
+from service_registry import SERVICES
+
+BASE_DIR = Path(__file__).resolve().parent
+RECOMMENDATIONS_FILE = BASE_DIR / 'reports' / 'capacity-recommendations.yaml'
+MAX_REPLICAS = 20
+
+# Palabras clave de los nombres de endpoint del locustfile -> servicio
+ENDPOINT_SERVICES = [
+    ('favourite', 'favourite-service'),
+    ('shipping', 'shipping-service'),
+    ('payment', 'payment-service'),
+    ('order', 'order-service'),
+    ('cart', 'order-service'),
+    ('product', 'product-service'),
+    ('categor', 'product-service'),
+    ('user', 'user-service'),
+    ('login', 'proxy-client'),   # POST /app/api/authenticate
+]
+
+
+def endpoint_service(name):
+    lowered = name.lower()
+    for keyword, service in ENDPOINT_SERVICES:
+        if keyword in lowered:
+            return service
+    return None
+
+
+class USLModel:
+    """Parámetros λ (throughput de un usuario), σ (contención) y κ (coherencia)"""
+
+    def __init__(self, lam, sigma, kappa):
+        self.lam = lam
+        self.sigma = sigma
+        self.kappa = kappa
+
+    def throughput(self, n):
+        return self.lam * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+
+    @property
+    def knee(self):
+        """Concurrencia de máximo throughput (N* = sqrt((1 - σ) / κ))"""
+        if self.kappa <= 0:
+            return math.inf
+        return math.sqrt(max(1 - self.sigma, 0) / self.kappa)
+
+    @classmethod
+    def fit(cls, points):
+        """
+        Ajuste por mínimos cuadrados de N/X = a + bN + cN², de donde
+        λ = 1/(a+b+c), κ = cλ, σ = bλ + κ. points: [(N, X)]
+        """
+        points = [(n, x) for n, x in points if n > 0 and x > 0]
+        if len({n for n, _ in points}) < 3:
+            return None
+        sums = [[0.0] * 3 for _ in range(3)]
+        rhs = [0.0] * 3
+        for n, x in points:
+            powers = (1.0, n, n * n)
+            for i in range(3):
+                rhs[i] += powers[i] * n / x
+                for j in range(3):
+                    sums[i][j] += powers[i] * powers[j]
+        a, b, c = _solve3(sums, rhs)
+        if a + b + c <= 0:
+            return None
+        lam = 1.0 / (a + b + c)
+        kappa = max(c * lam, 0.0)
+        sigma = min(max(b * lam + kappa, 0.0), 1.0)
+        return cls(lam, sigma, kappa)
+
+
+def _solve3(matrix, rhs):
+    """Eliminación gaussiana con pivoteo para un sistema 3x3"""
+    m = [row[:] + [value] for row, value in zip(matrix, rhs)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        if abs(m[col][col]) < 1e-12:
+            return 0.0, 0.0, 0.0
+        for r in range(3):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                m[r] = [vr - factor * vc for vr, vc in zip(m[r], m[col])]
+    return tuple(m[i][3] / m[i][i] for i in range(3))
+
+
+def load_levels(history_path, warmup=0):
+    """
+    Promedios por endpoint y nivel de usuarios: {name: {N: [rps, p95, avg, muestras]}}
+    Se recorre el historial en streaming; solo se guardan acumulados por nivel.
+    """
+    levels = {}
+    start = None
+    for row in iter_rows(history_path):
+        timestamp = to_float(row['Timestamp'])
+        start = timestamp if start is None else start
+        users = to_float(row['User Count'])
+        rps = to_float(row['Requests/s'])
+        if timestamp - start < warmup or not users or not rps:
+            continue
+        level = levels.setdefault(endpoint_key(row), {}).setdefault(int(users), [0.0, 0.0, 0.0, 0])
+        level[0] += rps
+        level[1] += to_float(row['95%']) or 0.0
+        level[2] += to_float(row['Total Average Response Time']) or 0.0
+        level[3] += 1
+    return {
+        name: {n: (rps / count, p95 / count, avg / count) for n, (rps, p95, avg, count) in by_users.items()}
+        for name, by_users in levels.items()
+    }
+
+
+def service_levels(levels):
+    """RPS de cada servicio por nivel de usuarios (suma de sus endpoints): {servicio: {N: rps}}"""
+    services = {}
+    for name, by_users in levels.items():
+        service = endpoint_service(name) if name != AGGREGATED else None
+        if service:
+            by_n = services.setdefault(service, {})
+            for n, (rps, _, _) in by_users.items():
+                by_n[n] = by_n.get(n, 0.0) + rps
+    return services
+
+
+def p95_ratio(levels):
+    """Mediana de p95/media observada; convierte la latencia media predicha en p95"""
+    ratios = sorted(p95 / avg for _, p95, avg in levels.values() if p95 and avg)
+    return ratios[len(ratios) // 2] if ratios else 2.0
+
+
+def max_concurrency_for_p95(model, think_time, ratio, target_p95_ms, limit=10000):
+    """Mayor N cuya latencia p95 predicha (R = N/X - Z) cumple el objetivo"""
+    best = 1
+    for n in range(1, min(limit, int(model.knee * 2) + 2 if math.isfinite(model.knee) else limit)):
+        response_ms = max(n / model.throughput(n) - think_time, 0) * 1000
+        if response_ms * ratio > target_p95_ms:
+            break
+        best = n
+    return best
+
+
+def service_shares(stats_path):
+    """Fracción de peticiones de cada servicio según locust-stats_stats.csv"""
+    counts = {}
+    for row in iter_rows(stats_path):
+        service = endpoint_service(row['Name'])
+        if row['Name'] != AGGREGATED and service:
+            counts[service] = counts.get(service, 0.0) + (to_float(row['Request Count']) or 0.0)
+    total = sum(counts.values())
+    return {service: count / total for service, count in counts.items()} if total else {}
+
+
+def recommend(prefix, target_rps, target_p95_ms, think_time, min_rps, headroom, test_replicas,
+              max_replicas=MAX_REPLICAS):
+    """
+    Modelos por endpoint y por servicio, recomendaciones de HPA por servicio
+    y avisos de los servicios sin modelo o con cotas recortadas
+    """
+    levels = load_levels(f'{prefix}_stats_history.csv')
+    models = {}
+    for name, by_users in levels.items():
+        model = USLModel.fit([(n, rps) for n, (rps, _, _) in by_users.items()])
+        if model:
+            models[name] = model
+
+    aggregated = models.get(AGGREGATED)
+    if aggregated is None:
+        return models, {}, {}, []
+
+    ratio = p95_ratio(levels[AGGREGATED])
+    n_slo = max_concurrency_for_p95(aggregated, think_time, ratio, target_p95_ms)
+    shares = service_shares(f'{prefix}_stats.csv')
+
+    service_models, recommendations, warnings = {}, {}, []
+    for service, by_users in sorted(service_levels(levels).items()):
+        model = USLModel.fit(list(by_users.items()))
+        if model is None:
+            warnings.append(f'{service}: menos de 3 niveles de usuarios, sin modelo propio')
+            continue
+        service_models[service] = model
+        # Saturación del servicio: su rodilla, sin pasar el p95 objetivo ni extrapolar fuera de lo medido
+        n_saturation = min(model.knee, n_slo, max(by_users))
+        if n_saturation == max(by_users) < min(model.knee, n_slo):
+            warnings.append(f'{service}: sin saturación hasta N={n_saturation}; '
+                            f'perPodRps es una cota inferior de su capacidad')
+        replicas = test_replicas.get(service, SERVICES.get(service, {}).get('replicas', 1))
+        per_pod_rps = model.throughput(n_saturation) / replicas * headroom
+        if per_pod_rps <= 0:
+            warnings.append(f'{service}: capacidad por pod no positiva, se omite')
+            continue
+        share = shares.get(service, 0.0)
+        needed = math.ceil(target_rps * share / per_pod_rps)
+        if needed > max_replicas:
+            warnings.append(f'{service}: {target_rps * share:.0f} RPS requieren {needed} réplicas '
+                            f'({per_pod_rps:.1f} RPS/pod), recortado a {max_replicas}')
+        maximum = min(max(2, needed), max_replicas)
+        recommendations[service] = {
+            'minReplicas': min(max(2, math.ceil(min_rps * share / per_pod_rps)), maximum),
+            'maxReplicas': maximum,
+            'perPodRps': round(per_pod_rps, 2),
+            'kneeRps': round(model.throughput(model.knee), 2) if model.knee <= max(by_users) else None,
+            'targetRps': round(target_rps * share, 2),
+            'targetP95Ms': target_p95_ms,
+        }
+    return models, service_models, recommendations, warnings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modelo de capacidad USL a partir del historial de Locust')
+    parser.add_argument('prefix', nargs='?', default='reports/locust-stats')
+    parser.add_argument('--target-rps', type=float, required=True, help='RPS pico esperado en el api-gateway')
+    parser.add_argument('--min-rps', type=float, help='RPS base (default: 25%% del objetivo)')
+    parser.add_argument('--target-p95', type=float, default=1000, help='p95 objetivo en ms (alerta HighResponseTime)')
+    parser.add_argument('--think-time', type=float, default=2.0, help='espera media entre peticiones (between(1, 3) = 2s)')
+    parser.add_argument('--headroom', type=float, default=0.7, help='fracción de la capacidad por pod a usar')
+    parser.add_argument('--replicas', action='append', default=[], metavar='SERVICIO=N',
+                        help='réplicas desplegadas durante la prueba (default: SERVICES)')
+    parser.add_argument('--max-replicas', type=int, default=MAX_REPLICAS, help='tope de maxReplicas por servicio')
+    parser.add_argument('--output', default=str(RECOMMENDATIONS_FILE))
+    args = parser.parse_args()
+
+    if not Path(f'{args.prefix}_stats_history.csv').exists():
+        print(f'❌ No se encontró {args.prefix}_stats_history.csv')
+        sys.exit(2)
+
+    test_replicas = {service: int(n) for service, n in (item.split('=', 1) for item in args.replicas)}
+    models, service_models, recommendations, warnings = recommend(
+        args.prefix, args.target_rps, args.target_p95, args.think_time,
+        args.min_rps if args.min_rps is not None else args.target_rps / 4,
+        args.headroom, test_replicas, args.max_replicas)
+
+    for title, fitted in (('endpoint', models), ('servicio', service_models)):
+        print(f'📐 Modelos USL por {title}:')
+        for name, model in fitted.items():
+            knee = f'N*={model.knee:.0f} Xmax={model.throughput(model.knee):.1f} RPS' \
+                if math.isfinite(model.knee) else 'sin rodilla'
+            print(f'  - {name}: λ={model.lam:.3f} σ={model.sigma:.4f} κ={model.kappa:.6f}  {knee}')
+    for warning in warnings:
+        print(f'⚠️  {warning}')
+    if not recommendations:
+        print('❌ Niveles de usuarios insuficientes para ajustar los modelos (se necesitan >= 3)')
+        sys.exit(1)
+
+    print('\n📊 Recomendaciones de HPA:')
+    for service, bounds in recommendations.items():
+        print(f"  - {service}: {bounds['minReplicas']}-{bounds['maxReplicas']} réplicas "
+              f"({bounds['perPodRps']} RPS/pod para {bounds['targetRps']} RPS)")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        yaml.dump(recommendations, f, default_flow_style=False, sort_keys=True)
+    print(f'\n✅ Recomendaciones guardadas en {args.output}')
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de conexiones a PostgreSQL
+E-Commerce Microservices Platform
+
+Los seis servicios de negocio comparten el StatefulSet postgres. La demanda
+pico es Σ maxReplicas (ScaledObject/HPA) × maximum-pool-size (Hikari) por servicio; con
+los valores por defecto (10 réplicas × pool de 10 × 6 servicios) son 600
+conexiones contra el max_connections=100 de la imagen postgres.
+
+Este script calcula la demanda pico por entorno y recomienda:
+  - sin PgBouncer: un pool por servicio que reparte el presupuesto
+    (max_connections - reservadas) según la fracción de tráfico del servicio
+    (reports/capacity-recommendations.yaml) o a partes iguales
+  - con PgBouncer: un PgBouncer en modo transacción; los pods mantienen su
+    pool (conexiones cliente baratas) y el presupuesto se reparte entre los
+    pool_size por base de datos de cada réplica de PgBouncer
+
+Cada entorno usa por defecto las réplicas de PgBouncer de ENVIRONMENTS
+(qa y prod lo llevan); --pgbouncer lo fuerza y --pgbouncer 0 lo quita.
+
+El resultado se guarda en reports/connection-budget.yaml, que
+generate_k8s_configs.py usa para los pools de Hikari, el Deployment/Service
+de PgBouncer y el database.url de cada servicio. Sin ese archivo, los
+generadores usan default_budget() (el plan por defecto de los entornos con
+PgBouncer).
+
+Uso:
+  python3 connection_budget.py --env prod --max-connections 100
+  python3 connection_budget.py --env dev --pgbouncer --write
+"""
+import argparse
+import math
+import sys
+
+import yaml
+
+from generate_k8s_configs import BUDGET_FILE
+from generate_network_security_configs import create_hpa, create_scaled_objects, load_capacity_recommendations
+from service_registry import BASE_DIR, ENVIRONMENTS, SERVICES
+
+# Pool mínimo útil por pod (una conexión para la petición y otra para Flyway/health)
+MIN_POOL_SIZE = 2
+# max_connections de la imagen postgres y conexiones reservadas (superuser, backups, psql)
+MAX_CONNECTIONS = 100
+RESERVED = 10
+
+
+def max_replicas(env, recommendations):
+    """Réplicas máximas por servicio con base de datos (ScaledObject, HPA o réplicas fijas)"""
+    bounds = {hpa['spec']['scaleTargetRef']['name']: hpa['spec']['maxReplicas']
+              for hpa in create_hpa(recommendations, env)}
+    bounds.update({scaled['spec']['scaleTargetRef']['name']: scaled['spec']['maxReplicaCount']
+                   for scaled in create_scaled_objects(recommendations, env)})
+    return {name: bounds.get(name, config['replicas']) for name, config in SERVICES.items() if 'db' in config}
+
+
+def traffic_shares(services, recommendations):
+    """Fracción del presupuesto por servicio: RPS objetivo medido o reparto igual"""
+    weights = {name: (recommendations.get(name) or {}).get('targetRps') or 0 for name in services}
+    total = sum(weights.values())
+    if not total:
+        return {name: 1 / len(services) for name in services}
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def plan(env, max_connections, reserved, recommendations=None, pgbouncer_replicas=0):
+    """Demanda actual y recomendación de pools para un entorno"""
+    recommendations = recommendations or {}
+    hikari = ENVIRONMENTS[env]['hikari']
+    replicas = max_replicas(env, recommendations)
+    shares = traffic_shares(list(replicas), recommendations)
+    available = max_connections - reserved
+    current = sum(count * hikari['maximum_pool_size'] for count in replicas.values())
+
+    services = {}
+    for name, count in replicas.items():
+        if pgbouncer_replicas:
+            pool = hikari['maximum_pool_size']
+        else:
+            pool = min(hikari['maximum_pool_size'], max(MIN_POOL_SIZE, math.floor(available * shares[name] / count)))
+        services[name] = {
+            'maxReplicas': count,
+            'maximumPoolSize': pool,
+            'minimumIdle': min(hikari['minimum_idle'], pool),
+            'peakConnections': count * pool,
+        }
+
+    result = {
+        'maxConnections': max_connections,
+        'reserved': reserved,
+        'currentPeakDemand': current,
+        'services': services,
+        'pgbouncer': None,
+    }
+    client_demand = sum(service['peakConnections'] for service in services.values())
+    if pgbouncer_replicas:
+        # Cada réplica de PgBouncer abre sus propios pools contra postgres
+        per_replica = available // pgbouncer_replicas
+        databases = {SERVICES[name]['db']: max(1, math.floor(per_replica * shares[name])) for name in services}
+        result['pgbouncer'] = {
+            'replicas': pgbouncer_replicas,
+            'maxClientConn': math.ceil(client_demand / pgbouncer_replicas * 1.2),
+            'databases': databases,
+        }
+        result['serverPeakDemand'] = sum(databases.values()) * pgbouncer_replicas
+    else:
+        result['serverPeakDemand'] = client_demand
+    result['fits'] = result['serverPeakDemand'] <= available
+    return result
+
+
+def default_budget(recommendations=None):
+    """Plan por defecto de los entornos que llevan PgBouncer (sin reports/connection-budget.yaml)"""
+    return {env: plan(env, MAX_CONNECTIONS, RESERVED, recommendations, profile['pgbouncer'])
+            for env, profile in ENVIRONMENTS.items() if profile['pgbouncer']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Presupuesto de conexiones PostgreSQL por entorno')
+    parser.add_argument('--env', action='append', choices=list(ENVIRONMENTS), help='entorno (repetible; default: todos)')
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS,
+                        help=f'max_connections de postgres (default imagen: {MAX_CONNECTIONS})')
+    parser.add_argument('--reserved', type=int, default=RESERVED,
+                        help='conexiones reservadas (superuser, backups, psql de operación)')
+    parser.add_argument('--pgbouncer', type=int, nargs='?', const=2, metavar='RÉPLICAS',
+                        help='PgBouncer en modo transacción (sin valor: 2 réplicas; 0: sin PgBouncer; '
+                             'default: el del entorno)')
+    parser.add_argument('--write', action='store_true', help=f'guardar en {BUDGET_FILE.relative_to(BASE_DIR)}')
+    args = parser.parse_args()
+
+    recommendations = load_capacity_recommendations()
+    budget = {}
+    exhausted = False
+    for env in args.env or ENVIRONMENTS:
+        pgbouncer = ENVIRONMENTS[env]['pgbouncer'] if args.pgbouncer is None else args.pgbouncer
+        result = plan(env, args.max_connections, args.reserved, recommendations, pgbouncer)
+        budget[env] = result
+        available = result['maxConnections'] - result['reserved']
+        print(f"\n🗄️  {env}: demanda pico actual {result['currentPeakDemand']} conexiones "
+              f"(presupuesto {available} de {result['maxConnections']})")
+        for name, service in result['services'].items():
+            print(f"  - {name}: {service['maxReplicas']} réplicas × pool {service['maximumPoolSize']} "
+                  f"= {service['peakConnections']}")
+        if result['pgbouncer']:
+            bouncer = result['pgbouncer']
+            print(f"  🔀 PgBouncer x{bouncer['replicas']}: max_client_conn {bouncer['maxClientConn']}, "
+                  f"pool_size por base {bouncer['databases']}")
+        if result['fits']:
+            print(f"  ✅ Pico contra postgres: {result['serverPeakDemand']} <= {available}")
+        else:
+            exhausted = True
+            print(f"  ❌ Pico contra postgres: {result['serverPeakDemand']} > {available}; "
+                  'ni con pools mínimos alcanza, usar --pgbouncer')
+
+    if args.write:
+        BUDGET_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(BUDGET_FILE, 'w') as f:
+            yaml.dump(budget, f, default_flow_style=False, sort_keys=False)
+        print(f'\n✅ Presupuesto guardado en {BUDGET_FILE}')
+    sys.exit(1 if exhausted else 0)
@@ -3,29 +3,46 @@
 Script para generar todas las configuraciones de Kubernetes
 E-Commerce Microservices Platform
 """
-import os
-import yaml
+import math
 from pathlib import Path
 
-BASE_DIR = Path('/home/user/plataformas-ii/ecommerce-microservice-backend-app')
-K8S_DIR = BASE_DIR / 'k8s'
-DOCKER_USER = 'ebasg42'
-VERSION = '1.0.0'
-
-SERVICES = {
-    'service-discovery': {'port': 8761, 'replicas': 2, 'tier': 'infrastructure'},
-    'cloud-config-server': {'port': 8888, 'replicas': 1, 'tier': 'infrastructure'},
-    'api-gateway': {'port': 8080, 'replicas': 2, 'tier': 'infrastructure'},
-    'user-service': {'port': 8081, 'replicas': 2, 'tier': 'business', 'db': 'userdb'},
-    'product-service': {'port': 8082, 'replicas': 2, 'tier': 'business', 'db': 'productdb'},
-    'favourite-service': {'port': 8083, 'replicas': 2, 'tier': 'business', 'db': 'favouritedb'},
-    'order-service': {'port': 8084, 'replicas': 2, 'tier': 'business', 'db': 'orderdb'},
-    'shipping-service': {'port': 8085, 'replicas': 2, 'tier': 'business', 'db': 'shippingdb'},
-    'payment-service': {'port': 8086, 'replicas': 2, 'tier': 'business', 'db': 'paymentdb'},
-    'proxy-client': {'port': 4200, 'replicas': 1, 'tier': 'client'},
-}
+import yaml
+
+from generate_manifests import Output, generate
+from service_registry import (BASE_DIR, DOCKER_USER, ENVIRONMENTS, JVM_PROFILES, SERVICES, VERSION, environment_dir,
+                              jvm_profiles_for, probe_settings, service_dir, services_where)
+
+BUDGET_FILE = BASE_DIR / 'reports' / 'connection-budget.yaml'
+RESOURCES_FILE = BASE_DIR / 'reports' / 'resource-recommendations.yaml'
+STARTUP_FILE = BASE_DIR / 'reports' / 'jvm-startup.yaml'
+BOOT_TIMES_FILE = BASE_DIR / 'reports' / 'boot-times.yaml'
+DEFAULT_RESOURCES = {'requests': {'memory': '512Mi', 'cpu': '250m'}, 'limits': {'memory': '1Gi', 'cpu': '500m'}}
+
+def create_probes(service_name, config, boot_samples=None):
+    """startupProbe con umbral del arranque medido (o supuesto) y liveness/readiness de sondeo rápido"""
+    settings = probe_settings(service_name)
+    if boot_samples:
+        ordered = sorted(boot_samples)
+        boot = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * settings['boot_percentile'] / 100) - 1)]
+    else:
+        boot = settings['boot_seconds']
+        if isinstance(boot, dict):
+            boot = boot['db' if 'db' in config else 'default']
+    base = config.get('context_path', '').rstrip('/')
+    port = config['port']
+    startup = settings['startup']
+    return {
+        'startupProbe': {
+            'httpGet': {'path': f'{base}/actuator/health/liveness', 'port': port},
+            **startup,
+            'failureThreshold': max(1, math.ceil(boot * settings['boot_margin'] / startup['periodSeconds'])),
+        },
+        'livenessProbe': {'httpGet': {'path': f'{base}/actuator/health/liveness', 'port': port}, **settings['liveness']},
+        'readinessProbe': {'httpGet': {'path': f'{base}/actuator/health/readiness', 'port': port}, **settings['readiness']},
+    }
 
-def create_deployment(service_name, config):
+def create_deployment(service_name, config, env='dev', resources=None, jvm_profile=None, boot_samples=None):
+    namespace = ENVIRONMENTS[env]['namespace']
     port = config['port']
     replicas = config['replicas']
     tier = config['tier']
@@ -36,7 +53,7 @@ def create_deployment(service_name, config):
         'kind': 'Deployment',
         'metadata': {
             'name': service_name,
-            'namespace': 'dev',
+            'namespace': namespace,
             'labels': {'app': service_name, 'tier': tier, 'version': 'v1'}
         },
         'spec': {
@@ -55,15 +72,19 @@ def create_deployment(service_name, config):
                             {'name': 'EUREKA_CLIENT_SERVICEURL_DEFAULTZONE', 'value': 'http://service-discovery:8761/eureka/'},
                             {'name': 'SPRING_CLOUD_CONFIG_URI', 'value': 'http://cloud-config-server:8888'}
                         ],
-                        'resources': {'requests': {'memory': '512Mi', 'cpu': '250m'}, 'limits': {'memory': '1Gi', 'cpu': '500m'}},
-                        'livenessProbe': {'httpGet': {'path': '/actuator/health/liveness', 'port': port}, 'initialDelaySeconds': 90 if needs_db else 60, 'periodSeconds': 10},
-                        'readinessProbe': {'httpGet': {'path': '/actuator/health/readiness', 'port': port}, 'initialDelaySeconds': 60 if needs_db else 30, 'periodSeconds': 5}
+                        'resources': {key: dict(value) for key, value in (resources or DEFAULT_RESOURCES).items()},
+                        **create_probes(service_name, config, boot_samples)
                     }]
                 }
             }
         }
     }
     
+    jvm_options = JVM_PROFILES[jvm_profile or ENVIRONMENTS[env]['jvm_profile']]['options']
+    if jvm_options:
+        deployment['spec']['template']['spec']['containers'][0]['env'].append(
+            {'name': 'JAVA_TOOL_OPTIONS', 'value': ' '.join(jvm_options)})
+    
     if needs_db:
         db_name = config['db']
         deployment['spec']['template']['spec']['initContainers'] = [{
@@ -80,72 +101,136 @@ def create_deployment(service_name, config):
     service = {
         'apiVersion': 'v1',
         'kind': 'Service',
-        'metadata': {'name': service_name, 'namespace': 'dev', 'labels': {'app': service_name, 'metrics': 'enabled'}},
+        'metadata': {'name': service_name, 'namespace': namespace, 'labels': {'app': service_name, 'metrics': 'enabled'}},
         'spec': {'type': 'ClusterIP', 'ports': [{'port': port, 'targetPort': port, 'protocol': 'TCP', 'name': 'http'}], 'selector': {'app': service_name}}
     }
     
     return deployment, service
 
-def create_configmap(service_name, config):
-    port = config['port']
-    needs_db = 'db' in config
-    
-    app_yml = f'''server:
-  port: {port}
-spring:
-  application:
-    name: {service_name}
-  cloud:
-    config:
-      uri: http://cloud-config-server:8888
-eureka:
-  client:
-    service-url:
-      defaultZone: http://service-discovery:8761/eureka/
-  instance:
-    prefer-ip-address: true
-management:
-  endpoints:
-    web:
-      exposure:
-        include: health,info,metrics,prometheus
-  endpoint:
-    health:
-      show-details: always
-      probes:
-        enabled: true
-  metrics:
-    export:
-      prometheus:
-        enabled: true
-    tags:
-      application: {service_name}
-      environment: dev
-'''
-    
-    data = {'application.yml': app_yml}
+# Configuración propia de los servidores de infraestructura (Eureka en modo
+# servidor, backend git del Config Server), mezclada sobre la común
+APPLICATION_OVERRIDES = {
+    'service-discovery': {
+        'eureka': {'instance': {'hostname': 'service-discovery'},
+                   'client': {'register-with-eureka': False, 'fetch-registry': False}},
+    },
+    'cloud-config-server': {
+        'spring': {'cloud': {'config': {'server': {'git': {
+            'uri': 'https://github.com/SelimHorri/ecommerce-microservice-backend-app',
+            'search-paths': 'config-repo',
+            'clone-on-start': True,
+        }}}}},
+        'eureka': {'client': {'enabled': False}},
+    },
+}
+
+def merge_config(base, override):
+    """Mezcla recursiva de diccionarios (override gana)"""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge_config(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def gateway_routes():
+    """Rutas del gateway a los servicios de negocio por su context path (lb:// de Eureka)"""
+    return [{'id': name, 'uri': f'lb://{name.upper()}', 'predicates': [f"Path={SERVICES[name]['context_path']}/**"]}
+            for name in services_where(tier='business')]
+
+def application_config(service_name, config, env='dev', pool=None):
+    """application.yml del servicio según el perfil del entorno (pool: override de connection_budget.py)"""
+    profile = ENVIRONMENTS[env]
+    # Eureka y el Config Server no son clientes de sí mismos
+    client = service_name not in ('service-discovery', 'cloud-config-server')
+    app = {
+        'server': {'port': config['port']},
+        'spring': {
+            'application': {'name': service_name.upper() if client else service_name},
+            'profiles': {'active': 'kubernetes'},
+        },
+        'eureka': {
+            'client': {'service-url': {'defaultZone': 'http://service-discovery:8761/eureka/'}},
+            'instance': {'prefer-ip-address': True},
+        },
+        'management': {
+            'endpoints': {'web': {'exposure': {'include': 'health,info,metrics,prometheus'}}},
+            'endpoint': {'health': {'show-details': 'always', 'probes': {'enabled': True}}},
+            'metrics': {
+                'export': {'prometheus': {'enabled': True}},
+                'tags': {'application': service_name, 'environment': env},
+            },
+        },
+        'logging': {'level': {'root': profile['log_level']}},
+    }
+    if client:
+        app['spring']['cloud'] = {'config': {'uri': 'http://cloud-config-server:8888'}}
+        app['eureka']['client'].update({'enabled': True, 'register-with-eureka': True, 'fetch-registry': True})
+    if service_name == 'api-gateway':
+        app['spring'].setdefault('cloud', {})['gateway'] = {'routes': gateway_routes()}
+    merge_config(app, APPLICATION_OVERRIDES.get(service_name, {}))
+
+    tomcat = profile['tomcat']
+    if tomcat:
+        app['server']['tomcat'] = {
+            'threads': {'max': tomcat['max_threads'], 'min-spare': tomcat['min_spare']},
+            'accept-count': tomcat['accept_count'],
+        }
+
+    if 'db' in config:
+        hikari = profile['hikari']
+        if pool:
+            hikari = {'maximum_pool_size': pool['maximumPoolSize'], 'minimum_idle': pool['minimumIdle']}
+        datasource = {
+            'url': '${database.url}',
+            'driver-class-name': '${database.driver}',
+            'hikari': {
+                'maximum-pool-size': hikari['maximum_pool_size'],
+                'minimum-idle': hikari['minimum_idle'],
+            },
+        }
+        jpa = {
+            'hibernate': {'ddl-auto': profile['jpa']['ddl_auto']},
+            'show-sql': profile['jpa']['show_sql'],
+            'properties': {'hibernate': {'dialect': 'org.hibernate.dialect.PostgreSQLDialect'}},
+        }
+        jdbc = profile['jdbc']
+        if jdbc:
+            # Caché de sentencias preparadas del driver PostgreSQL (por conexión)
+            datasource['hikari']['data-source-properties'] = {
+                'prepareThreshold': 1,
+                'preparedStatementCacheQueries': jdbc['statement_cache_queries'],
+                'preparedStatementCacheSizeMiB': jdbc['statement_cache_mib'],
+                'reWriteBatchedInserts': True,
+            }
+            jpa['open-in-view'] = False
+            jpa['properties']['hibernate'].update({
+                'jdbc': {'batch_size': jdbc['batch_size'], 'fetch_size': jdbc['fetch_size'],
+                         'batch_versioned_data': True},
+                'order_inserts': True,
+                'order_updates': True,
+                'query': {'in_clause_parameter_padding': True},
+            })
+            app['logging']['level']['org.hibernate.SQL'] = 'WARN'
+        app['spring']['datasource'] = datasource
+        app['spring']['jpa'] = jpa
+
+    return yaml.dump(app, default_flow_style=False, sort_keys=False)
+
+def create_configmap(service_name, config, env='dev', budget=None):
+    budget = budget or {}
+    pool = (budget.get('services') or {}).get(service_name)
+    data = {'application.yml': application_config(service_name, config, env, pool)}
     
-    if needs_db:
+    if 'db' in config:
         db_name = config['db']
-        data['database.url'] = f'jdbc:postgresql://postgres:5432/{db_name}'
+        host = f'pgbouncer:{PGBOUNCER_PORT}' if budget.get('pgbouncer') else 'postgres:5432'
+        data['database.url'] = f'jdbc:postgresql://{host}/{db_name}'
         data['database.driver'] = 'org.postgresql.Driver'
-        data['application.yml'] += f'''
-spring:
-  datasource:
-    url: ${{database.url}}
-    driver-class-name: ${{database.driver}}
-    hikari:
-      maximum-pool-size: 10
-      minimum-idle: 5
-  jpa:
-    hibernate:
-      ddl-auto: update
-    show-sql: true
-'''
     
-    return {'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': f'{service_name}-config', 'namespace': 'dev'}, 'data': data}
+    return {'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': f'{service_name}-config', 'namespace': ENVIRONMENTS[env]['namespace'], 'labels': {'app': service_name}}, 'data': data}
 
-def create_secret(service_name, config):
+def create_secret(service_name, config, env='dev'):
     if 'db' not in config:
         return None
     db_name = config['db']
@@ -153,40 +238,201 @@ def create_secret(service_name, config):
     return {
         'apiVersion': 'v1',
         'kind': 'Secret',
-        'metadata': {'name': f'{service_name}-secret', 'namespace': 'dev'},
+        'metadata': {'name': f'{service_name}-secret', 'namespace': ENVIRONMENTS[env]['namespace']},
         'type': 'Opaque',
         'stringData': {'database.username': username, 'database.password': f'{username}pass123'}
     }
 
-if __name__ == '__main__':
-    print('🚀 Generando configuraciones de Kubernetes...')
-    
-    # Crear directorios
-    (K8S_DIR / 'config').mkdir(parents=True, exist_ok=True)
-    (K8S_DIR / 'secrets').mkdir(parents=True, exist_ok=True)
-    for service_name in SERVICES.keys():
-        (K8S_DIR / 'services' / service_name.replace('-', '_')).mkdir(parents=True, exist_ok=True)
-    
-    # Generar configuraciones
+PGBOUNCER_IMAGE = 'edoburu/pgbouncer:v1.22.1-p0'
+PGBOUNCER_PORT = 6432
+
+def load_jvm_startup(path=STARTUP_FILE):
+    """Tiempos de arranque por servicio y perfil medidos por benchmark_jvm_startup.py (vacío si no existe)"""
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def select_jvm_profile(service_name, env='dev', startup=None):
+    """Perfil con menor tiempo hasta ready entre los candidatos del entorno; sin mediciones, el del entorno"""
+    measured = (startup or {}).get(service_name) or {}
+    candidates = [name for name in jvm_profiles_for(env) if (measured.get(name) or {}).get('medianSeconds')]
+    if not candidates:
+        return ENVIRONMENTS[env]['jvm_profile']
+    return min(candidates, key=lambda name: measured[name]['medianSeconds'])
+
+def load_boot_times(path=BOOT_TIMES_FILE):
+    """Tiempos de arranque de pods reales registrados por measure_boot_times.py (vacío si no existe)"""
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def boot_samples_for(service_name, jvm_profile, boot_times=None, startup=None):
+    """Muestras de arranque del servicio: pods del clúster o, si no hay, el benchmark del perfil elegido"""
+    samples = ((boot_times or {}).get(service_name) or {}).get('samples')
+    if samples:
+        return samples
+    return (((startup or {}).get(service_name) or {}).get(jvm_profile) or {}).get('runs')
+
+def load_resource_recommendations(path=RESOURCES_FILE):
+    """requests/limits medidos por rightsize_resources.py (vacío si no existe)"""
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def load_connection_budget(path=BUDGET_FILE):
+    """Presupuesto de conexiones calculado por connection_budget.py (vacío si no existe)"""
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def create_pgbouncer(env, settings):
+    """ConfigMap, Secret, Deployment, Service y Network Policies de PgBouncer (modo transacción)"""
+    namespace = ENVIRONMENTS[env]['namespace']
+    databases = '\n'.join(f'{db} = host=postgres port=5432 dbname={db} pool_size={size}'
+                          for db, size in settings['databases'].items())
+    # max_prepared_statements: sentencias preparadas a nivel de protocolo en modo transacción (>= 1.21),
+    # así la caché de sentencias del driver sigue funcionando a través del pooler
+    ini = f'''[databases]
+{databases}
+
+[pgbouncer]
+listen_addr = 0.0.0.0
+listen_port = {PGBOUNCER_PORT}
+auth_type = scram-sha-256
+auth_file = /etc/pgbouncer/userlist.txt
+pool_mode = transaction
+max_client_conn = {settings['maxClientConn']}
+default_pool_size = {min(settings['databases'].values())}
+max_prepared_statements = 200
+server_reset_query =
+ignore_startup_parameters = extra_float_digits
+'''
+    users = []
     for service_name, config in SERVICES.items():
-        service_dir = K8S_DIR / 'services' / service_name.replace('-', '_')
-        deployment, service = create_deployment(service_name, config)
-        
-        with open(service_dir / 'deployment.yaml', 'w') as f:
-            yaml.dump(deployment, f, default_flow_style=False, sort_keys=False)
-            f.write('---\n')
-            yaml.dump(service, f, default_flow_style=False, sort_keys=False)
-        
-        configmap = create_configmap(service_name, config)
-        with open(K8S_DIR / 'config' / f'{service_name}-configmap.yaml', 'w') as f:
-            yaml.dump(configmap, f, default_flow_style=False, sort_keys=False)
-        
-        secret = create_secret(service_name, config)
+        secret = create_secret(service_name, config, env)
         if secret:
-            with open(K8S_DIR / 'secrets' / f'{service_name}-secret.yaml', 'w') as f:
-                yaml.dump(secret, f, default_flow_style=False, sort_keys=False)
-        
-        print(f'  ✅ {service_name}')
-    
-    print('✅ Configuraciones generadas exitosamente!')
+            credentials = secret['stringData']
+            users.append(f'"{credentials["database.username"]}" "{credentials["database.password"]}"')
 
+    labels = {'app': 'pgbouncer', 'tier': 'database'}
+    configmap = {'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'pgbouncer-config', 'namespace': namespace},
+                 'data': {'pgbouncer.ini': ini}}
+    secret = {'apiVersion': 'v1', 'kind': 'Secret', 'metadata': {'name': 'pgbouncer-userlist', 'namespace': namespace},
+              'type': 'Opaque', 'stringData': {'userlist.txt': '\n'.join(users) + '\n'}}
+    deployment = {
+        'apiVersion': 'apps/v1',
+        'kind': 'Deployment',
+        'metadata': {'name': 'pgbouncer', 'namespace': namespace, 'labels': labels},
+        'spec': {
+            'replicas': settings['replicas'],
+            'selector': {'matchLabels': {'app': 'pgbouncer'}},
+            'template': {
+                'metadata': {'labels': labels},
+                'spec': {
+                    'containers': [{
+                        'name': 'pgbouncer',
+                        'image': PGBOUNCER_IMAGE,
+                        'ports': [{'containerPort': PGBOUNCER_PORT, 'name': 'postgres'}],
+                        'volumeMounts': [
+                            {'name': 'config', 'mountPath': '/etc/pgbouncer/pgbouncer.ini', 'subPath': 'pgbouncer.ini'},
+                            {'name': 'userlist', 'mountPath': '/etc/pgbouncer/userlist.txt', 'subPath': 'userlist.txt'}
+                        ],
+                        'resources': {'requests': {'memory': '64Mi', 'cpu': '100m'}, 'limits': {'memory': '128Mi', 'cpu': '500m'}},
+                        'livenessProbe': {'tcpSocket': {'port': PGBOUNCER_PORT}, 'periodSeconds': 10},
+                        'readinessProbe': {'tcpSocket': {'port': PGBOUNCER_PORT}, 'periodSeconds': 5}
+                    }],
+                    'volumes': [
+                        {'name': 'config', 'configMap': {'name': 'pgbouncer-config'}},
+                        {'name': 'userlist', 'secret': {'secretName': 'pgbouncer-userlist'}}
+                    ]
+                }
+            }
+        }
+    }
+    service = {
+        'apiVersion': 'v1',
+        'kind': 'Service',
+        'metadata': {'name': 'pgbouncer', 'namespace': namespace, 'labels': {'app': 'pgbouncer'}},
+        'spec': {'type': 'ClusterIP', 'ports': [{'port': PGBOUNCER_PORT, 'targetPort': PGBOUNCER_PORT, 'protocol': 'TCP', 'name': 'postgres'}], 'selector': {'app': 'pgbouncer'}}
+    }
+
+    def policy(name, spec):
+        return {'apiVersion': 'networking.k8s.io/v1', 'kind': 'NetworkPolicy',
+                'metadata': {'name': name, 'namespace': namespace}, 'spec': spec}
+
+    dns = {'ports': [{'protocol': 'UDP', 'port': 53}, {'protocol': 'TCP', 'port': 53}]}
+    policies = [
+        policy('allow-pgbouncer', {
+            'podSelector': {'matchLabels': {'app': 'pgbouncer'}},
+            'policyTypes': ['Ingress', 'Egress'],
+            'ingress': [{'from': [{'podSelector': {'matchLabels': {'tier': 'business'}}}],
+                         'ports': [{'protocol': 'TCP', 'port': PGBOUNCER_PORT}]}],
+            'egress': [{'to': [{'podSelector': {'matchLabels': {'app': 'postgres'}}}],
+                        'ports': [{'protocol': 'TCP', 'port': 5432}]}, dns]
+        }),
+        policy('allow-business-to-pgbouncer', {
+            'podSelector': {'matchLabels': {'tier': 'business'}},
+            'policyTypes': ['Egress'],
+            'egress': [{'to': [{'podSelector': {'matchLabels': {'app': 'pgbouncer'}}}],
+                        'ports': [{'protocol': 'TCP', 'port': PGBOUNCER_PORT}]}]
+        }),
+        policy('allow-pgbouncer-to-postgres', {
+            'podSelector': {'matchLabels': {'app': 'postgres'}},
+            'policyTypes': ['Ingress'],
+            'ingress': [{'from': [{'podSelector': {'matchLabels': {'app': 'pgbouncer'}}}],
+                         'ports': [{'protocol': 'TCP', 'port': 5432}]}]
+        }),
+    ]
+    return [configmap, secret, deployment, service] + policies
+
+# postgres (StatefulSet, Service y scripts de init) se mantiene a mano en
+# k8s/databases/ para dev; los demás entornos reciben una copia en su namespace
+POSTGRES_MANIFESTS = ('postgres-init-scripts.yaml', 'postgres-statefulset.yaml')
+
+def create_postgres(env):
+    """Salidas con los manifiestos de postgres de dev en el namespace del entorno (ninguna para dev)"""
+    if env == 'dev':
+        return []
+    namespace = ENVIRONMENTS[env]['namespace']
+    outputs = []
+    for filename in POSTGRES_MANIFESTS:
+        with open(BASE_DIR / 'k8s' / 'databases' / filename) as f:
+            documents = [document for document in yaml.safe_load_all(f) if document]
+        for document in documents:
+            document['metadata']['namespace'] = namespace
+        outputs.append(Output(environment_dir(env) / 'databases' / filename, documents))
+    return outputs
+
+def manifests(env='dev', budget=None, resources=None, startup=None, boot_times=None):
+    """Deployment+Service, ConfigMap y Secret de cada servicio, postgres y PgBouncer si el presupuesto lo pide"""
+    budget = (budget or {}).get(env) or {}
+    resources = resources or {}
+    k8s = environment_dir(env)
+    outputs = []
+    for service_name, config in SERVICES.items():
+        sizing = resources.get(service_name)
+        jvm_profile = select_jvm_profile(service_name, env, startup)
+        deployment, service = create_deployment(service_name, config, env,
+                                                {key: sizing[key] for key in ('requests', 'limits')} if sizing else None,
+                                                jvm_profile, boot_samples_for(service_name, jvm_profile, boot_times, startup))
+        outputs.append(Output(service_dir(service_name, env) / 'deployment.yaml', [deployment, service]))
+        outputs.append(Output(k8s / 'config' / f'{service_name}-configmap.yaml',
+                              [create_configmap(service_name, config, env, budget)]))
+        secret = create_secret(service_name, config, env)
+        if secret:
+            outputs.append(Output(k8s / 'secrets' / f'{service_name}-secret.yaml', [secret]))
+    outputs += create_postgres(env)
+    if budget.get('pgbouncer'):
+        outputs.append(Output(k8s / 'databases' / 'pgbouncer.yaml', create_pgbouncer(env, budget['pgbouncer'])))
+    return outputs
+
+if __name__ == '__main__':
+    print('🚀 Generando configuraciones de Kubernetes...')
+    from generate_manifests import load_reports
+    reports = load_reports()
+    generate([output for env in ENVIRONMENTS
+              for output in manifests(env, reports['budget'], reports['resources'], reports['startup'], reports['boot'])])
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Motor único de generación de manifiestos
+E-Commerce Microservices Platform
+
+Los generadores (generate_k8s_configs.py, generate_network_security_configs.py
+y generate_monitoring_scripts.py) solo declaran sus salidas como Output
+(ruta relativa + documentos YAML o texto); este motor las renderiza en
+paralelo, calcula el SHA-256 del contenido y escribe únicamente los archivos
+cuyo contenido cambió (con los finales de línea CRLF del archivo existente,
+si los tiene). Al final imprime el resumen de archivos creados y
+actualizados; regenerar el árbol sin cambios no toca ningún archivo.
+
+k8s/.generated registra qué archivos produjo cada grupo y entorno. Los que
+un generador ya no produce se informan como obsoletos y, con --prune, se
+borran; los archivos escritos a mano nunca están en el índice.
+
+Uso:
+  python3 generate_manifests.py                     # todos los grupos
+  python3 generate_manifests.py k8s monitoring      # solo algunos grupos
+  python3 generate_manifests.py --env prod          # solo un entorno (k8s/environments/prod)
+  python3 generate_manifests.py --output /tmp/out --dry-run
+  python3 generate_manifests.py --prune             # borrar salidas obsoletas
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from service_registry import BASE_DIR, ENVIRONMENTS
+
+
+class Dumper(getattr(yaml, 'CSafeDumper', yaml.SafeDumper)):
+    """Emisor de libyaml si está disponible; los textos multilínea van en bloque literal (|)"""
+
+
+def _represent_str(dumper, value):
+    style = '|' if '\n' in value else None
+    return dumper.represent_scalar('tag:yaml.org,2002:str', value, style=style)
+
+
+Dumper.add_representer(str, _represent_str)
+
+Output = namedtuple('Output', 'path documents text mode', defaults=(None, None, None))
+
+# Por debajo de este número de salidas no compensa arrancar procesos
+PARALLEL_THRESHOLD = 64
+
+GROUPS = ('k8s', 'network-security', 'monitoring')
+INDEX_FILE = Path('k8s') / '.generated'
+
+
+def render(output):
+    """(ruta, bytes, modo) de una salida"""
+    if output.text is not None:
+        content = output.text
+    else:
+        content = '---\n'.join(yaml.dump(document, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+                               for document in output.documents)
+    return str(output.path), content.encode(), output.mode
+
+
+def _render_chunk(outputs):
+    return [render(output) for output in outputs]
+
+
+def render_all(outputs, jobs=None):
+    """Renderiza las salidas repartidas en procesos (secuencial si son pocas o hay 1 CPU)"""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(outputs) < PARALLEL_THRESHOLD:
+        return _render_chunk(outputs)
+    size = -(-len(outputs) // jobs)
+    chunks = [outputs[i:i + size] for i in range(0, len(outputs), size)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return [rendered for chunk in pool.map(_render_chunk, chunks) for rendered in chunk]
+
+
+def digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_changed(rendered, root=BASE_DIR, dry_run=False):
+    """Escribe solo lo que cambió; devuelve {'created': [...], 'updated': [...], 'unchanged': n}"""
+    summary = {'created': [], 'updated': [], 'unchanged': 0}
+    seen = set()
+    for path, content, mode in rendered:
+        if path in seen:
+            raise ValueError(f'Salida duplicada: {path}')
+        seen.add(path)
+        target = Path(root) / path
+        try:
+            existing = target.read_bytes()
+        except FileNotFoundError:
+            existing = None
+        if existing is not None and b'\r\n' in existing:
+            content = content.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+        if existing is not None and digest(existing) == digest(content):
+            summary['unchanged'] += 1
+            continue
+        summary['created' if existing is None else 'updated'].append(path)
+        if dry_run:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        if mode is not None:
+            os.chmod(target, mode)
+    return summary
+
+
+def read_index(root=BASE_DIR):
+    """{(grupo, entorno): {rutas}} de la última generación (entorno '*' para monitoring)"""
+    index = {}
+    try:
+        lines = (Path(root) / INDEX_FILE).read_text().splitlines()
+    except FileNotFoundError:
+        return index
+    for line in lines:
+        if line and not line.startswith('#'):
+            group, env, path = line.split(' ', 2)
+            index.setdefault((group, env), set()).add(path)
+    return index
+
+
+def write_index(index, root=BASE_DIR):
+    lines = ['# Salidas de generate_manifests.py por grupo y entorno (no editar)']
+    lines += [f'{group} {env} {path}' for (group, env), paths in sorted(index.items()) for path in sorted(paths)]
+    target = Path(root) / INDEX_FILE
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text('\n'.join(lines) + '\n')
+
+
+def stale_outputs(scopes, root=BASE_DIR):
+    """Rutas que el índice atribuye a los grupos/entornos generados, que ya no se producen y aún existen"""
+    index = read_index(root)
+    stale = set()
+    for scope, outputs in scopes.items():
+        produced = {str(output.path) for output in outputs}
+        stale |= {path for path in index.get(scope, set()) - produced if (Path(root) / path).exists()}
+    return sorted(stale)
+
+
+def update_index(scopes, kept, root=BASE_DIR):
+    """Reemplaza las entradas de los grupos/entornos generados; conserva las obsoletas que no se borraron"""
+    index = read_index(root)
+    for scope, outputs in scopes.items():
+        index[scope] = {str(output.path) for output in outputs} | (index.get(scope, set()) & set(kept))
+    write_index(index, root)
+
+
+def load_reports():
+    """
+    Resultados de las herramientas de medición que alimentan a los generadores
+    (vacíos si no existen; el presupuesto de conexiones cae al plan por defecto)
+    """
+    from connection_budget import default_budget
+    from generate_k8s_configs import (load_boot_times, load_connection_budget, load_jvm_startup,
+                                      load_resource_recommendations)
+    from generate_network_security_configs import load_capacity_recommendations
+
+    capacity = load_capacity_recommendations()
+    return {
+        'capacity': capacity,
+        'budget': {**default_budget(capacity), **load_connection_budget()},
+        'resources': load_resource_recommendations(),
+        'startup': load_jvm_startup(),
+        'boot': load_boot_times(),
+    }
+
+
+def group_outputs(groups, environments=tuple(ENVIRONMENTS), reports=None):
+    """
+    {(grupo, entorno): [Output]} declaradas por cada generador; k8s y
+    network-security se generan por entorno, monitoring una vez (entorno '*')
+    """
+    import generate_k8s_configs
+    import generate_monitoring_scripts
+    import generate_network_security_configs
+
+    reports = reports or {}
+    generators = {
+        'k8s': lambda env: generate_k8s_configs.manifests(env, reports.get('budget'), reports.get('resources'),
+                                                          reports.get('startup'), reports.get('boot')),
+        'network-security': lambda env: generate_network_security_configs.manifests(
+            reports.get('capacity'), env, reports.get('resources')),
+    }
+    unknown = set(groups) - set(generators) - {'monitoring'}
+    if unknown:
+        raise ValueError(f"Grupos desconocidos: {', '.join(sorted(unknown))} (disponibles: {', '.join(GROUPS)})")
+    unknown = set(environments) - set(ENVIRONMENTS)
+    if unknown:
+        raise ValueError(f"Entornos desconocidos: {', '.join(sorted(unknown))} (disponibles: {', '.join(ENVIRONMENTS)})")
+    scopes = {(group, env): generators[group](env) for group in groups if group in generators
+              for env in environments}
+    if 'monitoring' in groups:
+        # Los scripts de despliegue/health check reciben el namespace como argumento
+        scopes[('monitoring', '*')] = generate_monitoring_scripts.manifests()
+    return scopes
+
+
+def generate(outputs, root=BASE_DIR, jobs=None, dry_run=False, scopes=None, prune=False):
+    """
+    Renderiza y escribe; imprime el resumen de cambios. Con scopes
+    ({(grupo, entorno): [Output]} de group_outputs) informa las salidas
+    obsoletas, las borra si prune y actualiza k8s/.generated
+    """
+    started = time.perf_counter()
+    summary = write_changed(render_all(outputs, jobs), root, dry_run)
+    summary['stale'] = stale_outputs(scopes, root) if scopes else []
+    if prune and not dry_run:
+        for path in summary['stale']:
+            (Path(root) / path).unlink()
+    if scopes and not dry_run:
+        update_index(scopes, [] if prune else summary['stale'], root)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    verb = 'se crearían/actualizarían' if dry_run else 'creados/actualizados'
+    changed = len(summary['created']) + len(summary['updated'])
+    for path in summary['created']:
+        print(f'  ➕ {path}')
+    for path in summary['updated']:
+        print(f'  ✏️  {path}')
+    for path in summary['stale']:
+        print(f'  🗑️  {path}')
+    print(f"✅ {len(outputs)} archivos en {elapsed:.0f} ms: {changed} {verb}, {summary['unchanged']} sin cambios")
+    if summary['stale']:
+        action = 'se borrarían' if dry_run else 'borrados'
+        print(f"{'🗑️ ' if prune else '⚠️ '} {len(summary['stale'])} archivos ya no se generan: "
+              + (action if prune else 'borrar con --prune'))
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generación incremental de manifiestos desde SERVICES')
+    parser.add_argument('groups', nargs='*', default=list(GROUPS), help=f"grupos a generar ({', '.join(GROUPS)})")
+    parser.add_argument('--env', action='append', choices=list(ENVIRONMENTS),
+                        help='entorno a generar (repetible; default: todos)')
+    parser.add_argument('--output', default=str(BASE_DIR), help='raíz de salida (default: el repositorio)')
+    parser.add_argument('--jobs', type=int, help='procesos de renderizado (default: CPUs)')
+    parser.add_argument('--dry-run', action='store_true', help='solo mostrar qué cambiaría')
+    parser.add_argument('--prune', action='store_true', help='borrar las salidas que ya no se generan')
+    args = parser.parse_args()
+
+    print('🚀 Generando manifiestos...')
+    try:
+        scopes = group_outputs(args.groups, args.env or tuple(ENVIRONMENTS), load_reports())
+    except ValueError as error:
+        print(f'❌ {error}')
+        sys.exit(2)
+    generate([output for outputs in scopes.values() for output in outputs], args.output, args.jobs,
+             args.dry_run, scopes, args.prune)
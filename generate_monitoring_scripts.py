@@ -2,101 +2,10 @@
 """
 Script para generar configuraciones de Monitoreo y Scripts de Automatización
 """
-import os
-import yaml
 from pathlib import Path
 
-BASE_DIR = Path('/home/user/plataformas-ii/ecommerce-microservice-backend-app')
-K8S_DIR = BASE_DIR / 'k8s'
-SCRIPTS_DIR = BASE_DIR / 'scripts'
-
-def create_service_monitor():
-    """Crear ServiceMonitor para Prometheus"""
-    
-    service_monitor = {
-        'apiVersion': 'monitoring.coreos.com/v1',
-        'kind': 'ServiceMonitor',
-        'metadata': {
-            'name': 'microservices-metrics',
-            'namespace': 'monitoring',
-            'labels': {'release': 'prometheus'}
-        },
-        'spec': {
-            'selector': {'matchLabels': {'metrics': 'enabled'}},
-            'namespaceSelector': {'matchNames': ['dev', 'qa', 'prod']},
-            'endpoints': [{
-                'port': 'http',
-                'path': '/actuator/prometheus',
-                'interval': '30s',
-                'scrapeTimeout': '10s'
-            }]
-        }
-    }
-    
-    return service_monitor
-
-def create_prometheus_rules():
-    """Crear PrometheusRules para alertas"""
-    
-    rules = {
-        'apiVersion': 'monitoring.coreos.com/v1',
-        'kind': 'PrometheusRule',
-        'metadata': {
-            'name': 'microservices-alerts',
-            'namespace': 'monitoring',
-            'labels': {'release': 'prometheus'}
-        },
-        'spec': {
-            'groups': [{
-                'name': 'microservices',
-                'interval': '30s',
-                'rules': [
-                    {
-                        'alert': 'HighErrorRate',
-                        'expr': 'sum(rate(http_server_requests_seconds_count{status=~"5.."}[5m])) by (application) / sum(rate(http_server_requests_seconds_count[5m])) by (application) > 0.05',
-                        'for': '5m',
-                        'labels': {'severity': 'warning'},
-                        'annotations': {
-                            'summary': 'High error rate detected in {{ $labels.application }}',
-                            'description': 'Error rate is {{ $value | humanizePercentage }} for {{ $labels.application }}'
-                        }
-                    },
-                    {
-                        'alert': 'ServiceDown',
-                        'expr': 'up{job=~".*service.*"} == 0',
-                        'for': '2m',
-                        'labels': {'severity': 'critical'},
-                        'annotations': {
-                            'summary': 'Service {{ $labels.job }} is down',
-                            'description': '{{ $labels.job }} has been down for more than 2 minutes'
-                        }
-                    },
-                    {
-                        'alert': 'HighResponseTime',
-                        'expr': 'histogram_quantile(0.95, sum(rate(http_server_requests_seconds_bucket[5m])) by (application, le)) > 1',
-                        'for': '5m',
-                        'labels': {'severity': 'warning'},
-                        'annotations': {
-                            'summary': 'High response time in {{ $labels.application }}',
-                            'description': '95th percentile response time is {{ $value }}s'
-                        }
-                    },
-                    {
-                        'alert': 'HighMemoryUsage',
-                        'expr': '(sum(jvm_memory_used_bytes{area="heap"}) by (application) / sum(jvm_memory_max_bytes{area="heap"}) by (application)) > 0.9',
-                        'for': '5m',
-                        'labels': {'severity': 'warning'},
-                        'annotations': {
-                            'summary': 'High memory usage in {{ $labels.application }}',
-                            'description': 'Memory usage is {{ $value | humanizePercentage }}'
-                        }
-                    }
-                ]
-            }]
-        }
-    }
-    
-    return rules
+from generate_manifests import Output, generate
+from service_registry import services_where
 
 def create_deployment_script():
     """Crear script de despliegue"""
@@ -107,11 +16,21 @@ def create_deployment_script():
 
 set -e
 
-BASE_DIR="/home/user/plataformas-ii/ecommerce-microservice-backend-app"
+BASE_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 cd "$BASE_DIR"
 
 NAMESPACE=${1:-dev}
 
+# Manifiestos del entorno (generate_manifests.py): dev en k8s/, el resto en k8s/environments/<ns>/
+K8S_DIR="k8s"
+if [ "$NAMESPACE" != "dev" ]; then
+    K8S_DIR="k8s/environments/$NAMESPACE"
+fi
+if [ ! -d "$K8S_DIR" ]; then
+    echo "❌ No existe $K8S_DIR; generar con: python3 generate_manifests.py --env $NAMESPACE"
+    exit 1
+fi
+
 echo "🚀 Desplegando E-Commerce Microservices en namespace: $NAMESPACE"
 echo "================================================================"
 
@@ -126,62 +45,82 @@ kubectl apply -f k8s/storage/storage-class.yaml
 # 3. PostgreSQL
 echo "🗄️  Desplegando PostgreSQL..."
 kubectl apply -f k8s/databases/postgres-secret.yaml
-kubectl apply -f k8s/databases/postgres-init-scripts.yaml
-kubectl apply -f k8s/databases/postgres-statefulset.yaml
+kubectl apply -f $K8S_DIR/databases/postgres-init-scripts.yaml
+kubectl apply -f $K8S_DIR/databases/postgres-statefulset.yaml
 
 echo "⏳ Esperando a que PostgreSQL esté listo..."
 kubectl wait --for=condition=ready pod -l app=postgres -n $NAMESPACE --timeout=300s || true
 
+# PgBouncer (qa/prod por defecto; ver connection_budget.py)
+if [ -f $K8S_DIR/databases/pgbouncer.yaml ]; then
+    echo "🔀 Desplegando PgBouncer..."
+    kubectl apply -f $K8S_DIR/databases/pgbouncer.yaml
+fi
+
 # 4. ConfigMaps y Secrets
 echo "⚙️  Aplicando ConfigMaps..."
-kubectl apply -f k8s/config/
+kubectl apply -f $K8S_DIR/config/
 
 echo "🔐 Aplicando Secrets..."
-kubectl apply -f k8s/secrets/
+kubectl apply -f $K8S_DIR/secrets/
 
 # 5. RBAC
 echo "🔒 Aplicando RBAC..."
-kubectl apply -f k8s/rbac/
+kubectl apply -f $K8S_DIR/rbac/
 
 # 6. Network Policies
 echo "🌐 Aplicando Network Policies..."
-kubectl apply -f k8s/network-policies/
+kubectl apply -f $K8S_DIR/network-policies/
 
 # 7. Service Discovery
 echo "🔍 Desplegando Service Discovery..."
-kubectl apply -f k8s/services/discovery/deployment.yaml
+kubectl apply -f $K8S_DIR/services/service_discovery/deployment.yaml
 
 echo "⏳ Esperando a que Service Discovery esté listo..."
 sleep 10
 
 # 8. Cloud Config Server
 echo "📝 Desplegando Cloud Config Server..."
-kubectl apply -f k8s/services/config/deployment.yaml
+kubectl apply -f $K8S_DIR/services/cloud_config_server/deployment.yaml
 
 sleep 5
 
 # 9. Servicios de Negocio
 echo "🏢 Desplegando servicios de negocio..."
-for service in user product favourite order shipping payment; do
+for service in __BUSINESS_SERVICES__; do
     echo "  📦 Desplegando ${service}-service..."
-    kubectl apply -f k8s/services/${service}_service/deployment.yaml
+    kubectl apply -f $K8S_DIR/services/${service}_service/deployment.yaml
 done
 
 # 10. API Gateway
 echo "🚪 Desplegando API Gateway..."
-kubectl apply -f k8s/services/gateway/deployment.yaml
+kubectl apply -f $K8S_DIR/services/api_gateway/deployment.yaml
 
 # 11. Proxy Client
 echo "🖥️  Desplegando Proxy Client..."
-kubectl apply -f k8s/services/proxy/deployment.yaml
+kubectl apply -f $K8S_DIR/services/proxy_client/deployment.yaml
 
 # 12. Ingress
 echo "🌍 Aplicando Ingress..."
-kubectl apply -f k8s/ingress/ingress.yaml
-
-# 13. HPA
-echo "📊 Aplicando HPA..."
-kubectl apply -f k8s/autoscaling/
+kubectl apply -f $K8S_DIR/ingress/ingress.yaml
+
+# 13. Autoscaling (ScaledObjects de KEDA; sin KEDA, los HPA nativos de autoscaling/hpa-fallback)
+echo "📊 Aplicando autoscaling..."
+if kubectl get crd scaledobjects.keda.sh &> /dev/null; then
+    # Los HPA de respaldo de un despliegue anterior sin KEDA pelearían con los de KEDA
+    kubectl delete -f $K8S_DIR/autoscaling/hpa-fallback/ --ignore-not-found
+    kubectl apply -f $K8S_DIR/autoscaling/
+else
+    echo "⚠️  KEDA no está instalado (./keda-install.sh): se aplican HPA nativos (CPU/memoria) en lugar de los ScaledObjects"
+    for manifest in $K8S_DIR/autoscaling/hpa-*.yaml; do
+        [ -e "$manifest" ] && kubectl apply -f "$manifest"
+    done
+    if ! ls $K8S_DIR/autoscaling/hpa-fallback/*.yaml &> /dev/null; then
+        echo "❌ No hay HPA de respaldo en $K8S_DIR/autoscaling/hpa-fallback; generar con: python3 generate_manifests.py"
+        exit 1
+    fi
+    kubectl apply -f $K8S_DIR/autoscaling/hpa-fallback/
+fi
 
 echo ""
 echo "✅ Despliegue completado!"
@@ -193,8 +132,8 @@ echo ""
 echo "🔍 Ver logs:"
 echo "  kubectl logs -n $NAMESPACE -l app=service-discovery"
 '''
-    
-    return script
+    business = ' '.join(name.replace('-service', '') for name in services_where(tier='business'))
+    return script.replace('__BUSINESS_SERVICES__', business)
 
 def create_health_check_script():
     """Crear script de health check"""
@@ -232,6 +171,10 @@ echo "📊 Autoscaling Status:"
 kubectl get hpa -n $NAMESPACE --no-headers 2>/dev/null | awk '{
     print "  - "$1": "$3"/"$4" réplicas (CPU: "$5")"
 }' || echo "  No HPAs configurados"
+kubectl get scaledobjects -n $NAMESPACE --no-headers 2>/dev/null \\
+    -o custom-columns=NAME:.metadata.name,TARGET:.spec.scaleTargetRef.name,READY:.status.conditions[0].status | awk '{
+    print "  - "$1" → "$2" (KEDA, ready: "$3")"
+}'
 
 echo ""
 
@@ -245,36 +188,18 @@ echo "✅ Health check completado"
     
     return script
 
+def manifests():
+    """
+    Scripts de despliegue/health check. Los ServiceMonitor y PrometheusRule de
+    k8s/monitoring/ se mantienen a mano (alertas y monitores por servicio) y no
+    se generan
+    """
+    scripts = Path('scripts')
+    return [
+        Output(scripts / 'deploy-all.sh', text=create_deployment_script(), mode=0o755),
+        Output(scripts / 'health-check.sh', text=create_health_check_script(), mode=0o755),
+    ]
+
 if __name__ == '__main__':
     print('📊 Generando configuraciones de Monitoreo y Scripts...')
-    
-    # Monitoring
-    (K8S_DIR / 'monitoring').mkdir(parents=True, exist_ok=True)
-    
-    service_monitor = create_service_monitor()
-    with open(K8S_DIR / 'monitoring' / 'service-monitors.yaml', 'w') as f:
-        yaml.dump(service_monitor, f, default_flow_style=False, sort_keys=False)
-    print('  ✅ ServiceMonitor')
-    
-    prometheus_rules = create_prometheus_rules()
-    with open(K8S_DIR / 'monitoring' / 'prometheus-rules.yaml', 'w') as f:
-        yaml.dump(prometheus_rules, f, default_flow_style=False, sort_keys=False)
-    print('  ✅ PrometheusRules')
-    
-    # Scripts
-    SCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-    
-    deploy_script = create_deployment_script()
-    with open(SCRIPTS_DIR / 'deploy-all.sh', 'w') as f:
-        f.write(deploy_script)
-    os.chmod(SCRIPTS_DIR / 'deploy-all.sh', 0o755)
-    print('  ✅ deploy-all.sh')
-    
-    health_script = create_health_check_script()
-    with open(SCRIPTS_DIR / 'health-check.sh', 'w') as f:
-        f.write(health_script)
-    os.chmod(SCRIPTS_DIR / 'health-check.sh', 0o755)
-    print('  ✅ health-check.sh')
-    
-    print('✅ Configuraciones de Monitoreo y Scripts generadas!')
-
+    generate(manifests())
@@ -5,17 +5,21 @@ Script para generar configuraciones de Networking y Seguridad
 import yaml
 from pathlib import Path
 
-BASE_DIR = Path('/home/user/plataformas-ii/ecommerce-microservice-backend-app')
-K8S_DIR = BASE_DIR / 'k8s'
+from generate_manifests import Output, generate
+from service_registry import BASE_DIR, ENVIRONMENTS, KEDA, environment_dir, services_where
 
-def create_network_policies():
+CAPACITY_FILE = BASE_DIR / 'reports' / 'capacity-recommendations.yaml'
+KEDA_FALLBACK_ANNOTATION = 'ecommerce.local/keda-fallback'
+
+def create_network_policies(env='dev'):
     """Crear Network Policies"""
+    namespace = ENVIRONMENTS[env]['namespace']
     
     # Default Deny All
     default_deny = {
         'apiVersion': 'networking.k8s.io/v1',
         'kind': 'NetworkPolicy',
-        'metadata': {'name': 'default-deny-all', 'namespace': 'dev'},
+        'metadata': {'name': 'default-deny-all', 'namespace': namespace},
         'spec': {
             'podSelector': {},
             'policyTypes': ['Ingress', 'Egress']
@@ -26,7 +30,7 @@ def create_network_policies():
     allow_discovery = {
         'apiVersion': 'networking.k8s.io/v1',
         'kind': 'NetworkPolicy',
-        'metadata': {'name': 'allow-to-discovery', 'namespace': 'dev'},
+        'metadata': {'name': 'allow-discovery', 'namespace': namespace},
         'spec': {
             'podSelector': {'matchLabels': {'app': 'service-discovery'}},
             'policyTypes': ['Ingress'],
@@ -41,7 +45,7 @@ def create_network_policies():
     allow_business = {
         'apiVersion': 'networking.k8s.io/v1',
         'kind': 'NetworkPolicy',
-        'metadata': {'name': 'allow-business-services', 'namespace': 'dev'},
+        'metadata': {'name': 'allow-business-services', 'namespace': namespace},
         'spec': {
             'podSelector': {'matchLabels': {'tier': 'business'}},
             'policyTypes': ['Ingress', 'Egress'],
@@ -78,19 +82,20 @@ def create_network_policies():
     
     return [default_deny, allow_discovery, allow_business]
 
-def create_rbac():
+def create_rbac(env='dev'):
     """Crear RBAC configurations"""
+    namespace = ENVIRONMENTS[env]['namespace']
     
     service_account = {
         'apiVersion': 'v1',
         'kind': 'ServiceAccount',
-        'metadata': {'name': 'microservice-sa', 'namespace': 'dev'}
+        'metadata': {'name': 'microservice-sa', 'namespace': namespace}
     }
     
     role = {
         'apiVersion': 'rbac.authorization.k8s.io/v1',
         'kind': 'Role',
-        'metadata': {'name': 'microservice-role', 'namespace': 'dev'},
+        'metadata': {'name': 'microservice-role', 'namespace': namespace},
         'rules': [
             {
                 'apiGroups': [''],
@@ -108,22 +113,24 @@ def create_rbac():
     role_binding = {
         'apiVersion': 'rbac.authorization.k8s.io/v1',
         'kind': 'RoleBinding',
-        'metadata': {'name': 'microservice-rolebinding', 'namespace': 'dev'},
-        'subjects': [{'kind': 'ServiceAccount', 'name': 'microservice-sa', 'namespace': 'dev'}],
+        'metadata': {'name': 'microservice-rolebinding', 'namespace': namespace},
+        'subjects': [{'kind': 'ServiceAccount', 'name': 'microservice-sa', 'namespace': namespace}],
         'roleRef': {'kind': 'Role', 'name': 'microservice-role', 'apiGroup': 'rbac.authorization.k8s.io'}
     }
     
     return [service_account, role, role_binding]
 
-def create_ingress():
+def create_ingress(env='dev'):
     """Crear Ingress configuration"""
+    namespace = ENVIRONMENTS[env]['namespace']
+    domain = ENVIRONMENTS[env]['domain']
     
     ingress = {
         'apiVersion': 'networking.k8s.io/v1',
         'kind': 'Ingress',
         'metadata': {
             'name': 'ecommerce-ingress',
-            'namespace': 'dev',
+            'namespace': namespace,
             'annotations': {
                 'nginx.ingress.kubernetes.io/rewrite-target': '/',
                 'nginx.ingress.kubernetes.io/ssl-redirect': 'false'
@@ -133,7 +140,7 @@ def create_ingress():
             'ingressClassName': 'nginx',
             'rules': [
                 {
-                    'host': 'api.ecommerce.local',
+                    'host': f'api.{domain}',
                     'http': {
                         'paths': [{
                             'path': '/',
@@ -143,7 +150,7 @@ def create_ingress():
                     }
                 },
                 {
-                    'host': 'ecommerce.local',
+                    'host': domain,
                     'http': {
                         'paths': [{
                             'path': '/',
@@ -158,97 +165,167 @@ def create_ingress():
     
     return ingress
 
-def create_hpa():
-    """Crear Horizontal Pod Autoscalers"""
+def load_capacity_recommendations(path=CAPACITY_FILE):
+    """Cotas de réplicas medidas por capacity_model.py (vacío si no existe)"""
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def scaling_behavior():
+    """Política de escalado: subir rápido, bajar con 5 minutos de estabilización"""
+    return {
+        'scaleDown': {
+            'stabilizationWindowSeconds': 300,
+            'policies': [{'type': 'Percent', 'value': 50, 'periodSeconds': 60}]
+        },
+        'scaleUp': {
+            'stabilizationWindowSeconds': 0,
+            'policies': [
+                {'type': 'Percent', 'value': 100, 'periodSeconds': 30},
+                {'type': 'Pods', 'value': 2, 'periodSeconds': 30}
+            ],
+            'selectPolicy': 'Max'
+        }
+    }
+
+def create_hpa(recommendations=None, env='dev', resources=None, services=None):
+    """
+    Crear Horizontal Pod Autoscalers: los servicios con scaler: 'hpa' en el
+    registro o, con services, los de respaldo para clústeres sin KEDA
+    """
+    namespace = ENVIRONMENTS[env]['namespace']
     
-    services = ['user-service', 'product-service', 'order-service', 'payment-service', 'shipping-service', 'favourite-service']
+    recommendations = recommendations or {}
+    resources = resources or {}
+    native = set(services_where(autoscale=True, scaler='hpa'))
     hpas = []
     
-    for service in services:
+    for service in native if services is None else services:
+        bounds = recommendations.get(service, {})
+        targets = resources.get(service, {}).get('hpa', {})
+        metadata = {'name': f'{service}-hpa', 'namespace': namespace, 'labels': {'app': service}}
+        if service not in native:
+            # Alternativa al ScaledObject: deploy-all.sh solo la aplica si falta el CRD de KEDA
+            metadata['annotations'] = {KEDA_FALLBACK_ANNOTATION: 'true'}
         hpa = {
             'apiVersion': 'autoscaling/v2',
             'kind': 'HorizontalPodAutoscaler',
-            'metadata': {'name': f'{service}-hpa', 'namespace': 'dev'},
+            'metadata': metadata,
             'spec': {
                 'scaleTargetRef': {
                     'apiVersion': 'apps/v1',
                     'kind': 'Deployment',
                     'name': service
                 },
-                'minReplicas': 2,
-                'maxReplicas': 10,
+                'minReplicas': bounds.get('minReplicas', 2),
+                'maxReplicas': bounds.get('maxReplicas', 10),
                 'metrics': [
                     {
                         'type': 'Resource',
                         'resource': {
                             'name': 'cpu',
-                            'target': {'type': 'Utilization', 'averageUtilization': 70}
+                            'target': {'type': 'Utilization', 'averageUtilization': targets.get('cpu', 70)}
                         }
                     },
                     {
                         'type': 'Resource',
                         'resource': {
                             'name': 'memory',
-                            'target': {'type': 'Utilization', 'averageUtilization': 80}
+                            'target': {'type': 'Utilization', 'averageUtilization': targets.get('memory', 80)}
                         }
                     }
                 ],
-                'behavior': {
-                    'scaleDown': {
-                        'stabilizationWindowSeconds': 300,
-                        'policies': [{'type': 'Percent', 'value': 50, 'periodSeconds': 60}]
-                    },
-                    'scaleUp': {
-                        'stabilizationWindowSeconds': 0,
-                        'policies': [
-                            {'type': 'Percent', 'value': 100, 'periodSeconds': 30},
-                            {'type': 'Pods', 'value': 2, 'periodSeconds': 30}
-                        ],
-                        'selectPolicy': 'Max'
-                    }
-                }
+                'behavior': scaling_behavior()
             }
         }
         hpas.append(hpa)
     
     return hpas
 
-if __name__ == '__main__':
-    print('🔒 Generando configuraciones de Networking y Seguridad...')
+def create_scaled_objects(recommendations=None, env='dev', resources=None):
+    """ScaledObjects de KEDA: RPS por pod medido, CPU/memoria y, opcionalmente, latencia p95"""
+    namespace = ENVIRONMENTS[env]['namespace']
     
-    # Network Policies
-    (K8S_DIR / 'network-policies').mkdir(parents=True, exist_ok=True)
-    policies = create_network_policies()
-    for i, policy in enumerate(policies):
-        filename = ['default-deny.yaml', 'allow-discovery.yaml', 'allow-business-services.yaml'][i]
-        with open(K8S_DIR / 'network-policies' / filename, 'w') as f:
-            yaml.dump(policy, f, default_flow_style=False, sort_keys=False)
-    print('  ✅ Network Policies')
-    
-    # RBAC
-    (K8S_DIR / 'rbac').mkdir(parents=True, exist_ok=True)
-    rbac_configs = create_rbac()
-    with open(K8S_DIR / 'rbac' / 'service-accounts.yaml', 'w') as f:
-        for config in rbac_configs:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
-            f.write('---\n')
-    print('  ✅ RBAC')
-    
-    # Ingress
-    (K8S_DIR / 'ingress').mkdir(parents=True, exist_ok=True)
-    ingress = create_ingress()
-    with open(K8S_DIR / 'ingress' / 'ingress.yaml', 'w') as f:
-        yaml.dump(ingress, f, default_flow_style=False, sort_keys=False)
-    print('  ✅ Ingress')
-    
-    # HPA
-    (K8S_DIR / 'autoscaling').mkdir(parents=True, exist_ok=True)
-    hpas = create_hpa()
-    for hpa in hpas:
-        service_name = hpa['metadata']['name'].replace('-hpa', '')
-        with open(K8S_DIR / 'autoscaling' / f'hpa-{service_name}.yaml', 'w') as f:
-            yaml.dump(hpa, f, default_flow_style=False, sort_keys=False)
-    print('  ✅ HPA')
-    
-    print('✅ Configuraciones de Networking y Seguridad generadas!')
+    recommendations = recommendations or {}
+    resources = resources or {}
+    native = set(services_where(scaler='hpa'))
+    scaled_objects = []
+    
+    for service in services_where(autoscale=True):
+        if service in native:
+            continue
+        bounds = recommendations.get(service, {})
+        targets = resources.get(service, {}).get('hpa', {})
+        selector = f'namespace="{namespace}",service="{service}",uri!~"/actuator.*"'
+        triggers = [{
+            'type': 'prometheus',
+            'name': 'rps',
+            'metricType': 'AverageValue',
+            'metadata': {
+                'serverAddress': KEDA['prometheus'],
+                'query': f'sum(rate(http_server_requests_seconds_count{{{selector}}}[1m]))',
+                'threshold': f"{bounds.get('perPodRps') or KEDA['rps_per_pod']:g}"
+            }
+        }]
+        if KEDA['p95_trigger']:
+            # Latencia total del servicio (no por pod): réplicas × p95 / objetivo
+            triggers.append({
+                'type': 'prometheus',
+                'name': 'latency-p95',
+                'metricType': 'Value',
+                'metadata': {
+                    'serverAddress': KEDA['prometheus'],
+                    'query': f'1000 * histogram_quantile(0.95, sum(rate(http_server_requests_seconds_bucket{{{selector}}}[2m])) by (le))',
+                    'threshold': f"{bounds.get('targetP95Ms') or KEDA['p95_ms']:g}"
+                }
+            })
+        triggers.extend([
+            {'type': 'cpu', 'metricType': 'Utilization', 'metadata': {'value': str(targets.get('cpu', 70))}},
+            {'type': 'memory', 'metricType': 'Utilization', 'metadata': {'value': str(targets.get('memory', 80))}}
+        ])
+        scaled_objects.append({
+            'apiVersion': 'keda.sh/v1alpha1',
+            'kind': 'ScaledObject',
+            'metadata': {'name': f'{service}-scaler', 'namespace': namespace, 'labels': {'app': service}},
+            'spec': {
+                'scaleTargetRef': {'name': service},
+                'minReplicaCount': bounds.get('minReplicas', 2),
+                'maxReplicaCount': bounds.get('maxReplicas', 10),
+                'pollingInterval': KEDA['polling_interval'],
+                'cooldownPeriod': KEDA['cooldown_period'],
+                'advanced': {'horizontalPodAutoscalerConfig': {'behavior': scaling_behavior()}},
+                'triggers': triggers
+            }
+        })
+    
+    return scaled_objects
+
+def manifests(recommendations=None, env='dev', resources=None):
+    """
+    Network Policies, RBAC, Ingress y un ScaledObject (o HPA) por servicio con
+    autoscale en el registro; los HPA de respaldo sin KEDA van en autoscaling/hpa-fallback
+    """
+    k8s = environment_dir(env)
+    filenames = ['default-deny.yaml', 'allow-discovery.yaml', 'allow-business-services.yaml']
+    outputs = [Output(k8s / 'network-policies' / filename, [policy])
+               for filename, policy in zip(filenames, create_network_policies(env))]
+    outputs.append(Output(k8s / 'rbac' / 'service-accounts.yaml', create_rbac(env)))
+    outputs.append(Output(k8s / 'ingress' / 'ingress.yaml', [create_ingress(env)]))
+    for hpa in create_hpa(recommendations, env, resources, services_where(autoscale=True)):
+        service_name = hpa['spec']['scaleTargetRef']['name']
+        fallback = KEDA_FALLBACK_ANNOTATION in hpa['metadata'].get('annotations', {})
+        directory = k8s / 'autoscaling' / 'hpa-fallback' if fallback else k8s / 'autoscaling'
+        outputs.append(Output(directory / f'hpa-{service_name}.yaml', [hpa]))
+    for scaled_object in create_scaled_objects(recommendations, env, resources):
+        service_name = scaled_object['spec']['scaleTargetRef']['name']
+        outputs.append(Output(k8s / 'autoscaling' / f'scaledobject-{service_name}.yaml', [scaled_object]))
+    return outputs
 
+if __name__ == '__main__':
+    from generate_k8s_configs import load_resource_recommendations
+
+    print('🔒 Generando configuraciones de Networking y Seguridad...')
+    recommendations = load_capacity_recommendations()
+    resources = load_resource_recommendations()
+    generate([output for env in ENVIRONMENTS for output in manifests(recommendations, env, resources)])
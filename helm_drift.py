@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Deriva entre el chart de Helm y los manifiestos generados
+E-Commerce Microservices Platform
+
+Renderiza helm-charts/ecommerce-microservices en proceso (values.yaml más
+values-<entorno>.yaml, con la misma fusión que hace Helm) y lo compara campo
+a campo con lo que generan generate_k8s_configs.py y
+generate_network_security_configs.py para el mismo entorno, emparejando los
+objetos por el nombre del servicio en el registro.
+
+Ambos lados se normalizan antes de comparar, de modo que solo aparecen
+diferencias con efecto: cantidades de recursos canónicas (1000m == 1,
+1Gi == 1024Mi), valores por defecto de Kubernetes en las sondas, referencias
+a ConfigMap resueltas a su valor y la configuración efectiva de Spring
+(pool de Hikari y threads de Tomcat, con los defaults de Spring Boot cuando
+no hay application.yml). Se marcan con ⚡ los campos de rendimiento:
+réplicas, recursos, sondas, JAVA_TOOL_OPTIONS, pools y autoscaling.
+
+El renderizador cubre solo las construcciones que usan las plantillas del
+chart; si las plantillas cambian (se comprueba su hash) hay que actualizar
+render_chart() o usar --helm, que delega en `helm template`.
+
+Uso:
+  python3 helm_drift.py                   # todos los entornos con values-<env>.yaml
+  python3 helm_drift.py prod --all        # incluir campos que no son de rendimiento
+  python3 helm_drift.py qa --helm         # renderizar con el binario de helm
+"""
+import argparse
+import hashlib
+import re
+import subprocess
+import sys
+import time
+
+import yaml
+
+from generate_manifests import load_reports
+from service_registry import BASE_DIR, ENVIRONMENTS, SERVICES
+from validate_yaml import Loader
+
+CHART_DIR = BASE_DIR / 'helm-charts' / 'ecommerce-microservices'
+RELEASE = 'ecommerce'
+
+# sha256 de templates/*.yaml que reproduce render_chart()
+TEMPLATES_DIGEST = '4dc399fcacc95db9e18a381358880be17517fe3c2fa79ac44cf0cc7169d58cad'
+
+# Reemplazos del nombre del servicio en las plantillas (se aplican después de lower)
+RENAMES = (('Service', '-service'), ('Gateway', '-gateway'), ('Client', '-client'),
+           ('Discovery', '-discovery'), ('Server', '-server'))
+
+PERFORMANCE = ('replicas', 'resources.', 'startupProbe', 'livenessProbe', 'readinessProbe',
+               'env.JAVA_TOOL_OPTIONS', 'pool.', 'tomcat.', 'autoscaling.')
+ALWAYS = ('name',)
+
+# Defaults de Kubernetes para las sondas y de Spring Boot sin application.yml
+PROBE_DEFAULTS = {'initialDelaySeconds': 0, 'periodSeconds': 10, 'timeoutSeconds': 1,
+                  'successThreshold': 1, 'failureThreshold': 3}
+HIKARI_MAXIMUM_POOL_SIZE = 10
+TOMCAT_DEFAULTS = {'threads.max': 200, 'threads.min-spare': 10, 'accept-count': 100}
+
+CPU = re.compile(r'^([\d.]+)(m?)$')
+MEMORY = re.compile(r'^([\d.]+)([KMGT]i?|[kE]|Ei)?$')
+MEMORY_UNITS = {None: 1, 'k': 10 ** 3, 'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9, 'T': 10 ** 12,
+                'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40}
+
+
+def templates_digest():
+    digest = hashlib.sha256()
+    for path in sorted((CHART_DIR / 'templates').glob('*.yaml')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def duplicate_keys(node, found=None):
+    """(clave, línea, línea) de claves repetidas en un mismo mapa: PyYAML se queda con la última"""
+    found = [] if found is None else found
+    if isinstance(node, yaml.MappingNode):
+        seen = {}
+        for key, value in node.value:
+            if isinstance(key, yaml.ScalarNode):
+                if key.value in seen:
+                    found.append((key.value, seen[key.value], key.start_mark.line + 1))
+                seen[key.value] = key.start_mark.line + 1
+            duplicate_keys(value, found)
+    elif isinstance(node, yaml.SequenceNode):
+        for item in node.value:
+            duplicate_keys(item, found)
+    return found
+
+
+def load_values(path):
+    """(valores, claves duplicadas) de un archivo de values"""
+    text = path.read_text()
+    return yaml.load(text, Loader=Loader) or {}, duplicate_keys(yaml.compose(text, Loader=Loader))
+
+
+def merge_values(base, override):
+    """Fusión de Helm: los mapas se combinan recursivamente y null elimina la clave"""
+    merged = dict(base)
+    for key, value in override.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_values(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _default(value, fallback):
+    """Función default de sprig: nil, 0, false, "" y colecciones vacías toman el valor por defecto"""
+    return fallback if value in (None, 0, False, '') or value == {} or value == [] else value
+
+
+def chart_service_name(key):
+    name = key.lower()
+    for old, new in RENAMES:
+        name = name.replace(old, new)
+    return name
+
+
+def render_chart(values, release=RELEASE):
+    """{clave de values: (Deployment, Service)} como los renderiza templates/deployment.yaml y service.yaml"""
+    chart = yaml.load((CHART_DIR / 'Chart.yaml').read_text(), Loader=Loader)
+    glob = values.get('global') or {}
+    rendered = {}
+    for key, config in sorted(values.items()):
+        if not isinstance(config, dict) or config.get('enabled') is not True:
+            continue
+        name = chart_service_name(key)
+        metadata = {
+            'name': name,
+            'namespace': glob.get('namespace'),
+            'labels': {'app': name, 'chart': f"{chart['name']}-{chart['version']}", 'release': release, 'heritage': 'Helm'},
+        }
+        port = (config.get('service') or {}).get('port')
+        deployment = service = None
+        if 'image' in config:
+            env = [
+                {'name': 'SPRING_PROFILES_ACTIVE', 'value': 'kubernetes'},
+                {'name': 'EUREKA_CLIENT_SERVICEURL_DEFAULTZONE', 'value': str((glob.get('eureka') or {}).get('url'))},
+                {'name': 'SPRING_CLOUD_CONFIG_URI', 'value': str((glob.get('cloudConfig') or {}).get('url'))},
+            ]
+            if 'database' in config:
+                env += [
+                    {'name': 'SPRING_DATASOURCE_URL', 'value': f"jdbc:postgresql://postgres:5432/{config['database'].get('name')}"},
+                    {'name': 'SPRING_DATASOURCE_USERNAME',
+                     'valueFrom': {'secretKeyRef': {'name': f'{name}-secret', 'key': 'database.username'}}},
+                    {'name': 'SPRING_DATASOURCE_PASSWORD',
+                     'valueFrom': {'secretKeyRef': {'name': f'{name}-secret', 'key': 'database.password'}}},
+                ]
+            security = glob.get('securityContext') or {}
+            deployment = {
+                'apiVersion': 'apps/v1',
+                'kind': 'Deployment',
+                'metadata': metadata,
+                'spec': {
+                    'replicas': _default(config.get('replicas'), 1),
+                    'selector': {'matchLabels': {'app': name}},
+                    'template': {
+                        'metadata': {'labels': {'app': name, 'version': glob.get('imageTag')}},
+                        'spec': {
+                            'serviceAccountName': f'{name}-sa',
+                            'securityContext': {field: security.get(field) for field in ('runAsNonRoot', 'runAsUser', 'fsGroup')},
+                            'containers': [{
+                                'name': name,
+                                # Helm no evalúa plantillas dentro de values: "{{ ... }}" queda literal
+                                'image': f"{config['image'].get('repository')}:{config['image'].get('tag')}",
+                                'imagePullPolicy': glob.get('imagePullPolicy'),
+                                'ports': [{'containerPort': port, 'name': 'http', 'protocol': 'TCP'}],
+                                'env': env,
+                                'resources': _default(config.get('resources'), glob.get('resources')),
+                                'livenessProbe': {
+                                    'httpGet': {'path': '/actuator/health/liveness', 'port': port},
+                                    'initialDelaySeconds': 60, 'periodSeconds': 10, 'timeoutSeconds': 5, 'failureThreshold': 3,
+                                },
+                                'readinessProbe': {
+                                    'httpGet': {'path': '/actuator/health/readiness', 'port': port},
+                                    'initialDelaySeconds': 30, 'periodSeconds': 5, 'timeoutSeconds': 3, 'failureThreshold': 3,
+                                },
+                                'securityContext': {'allowPrivilegeEscalation': False, 'readOnlyRootFilesystem': True,
+                                                    'capabilities': {'drop': ['ALL']}},
+                            }],
+                        },
+                    },
+                },
+            }
+        if 'service' in config:
+            service = {
+                'apiVersion': 'v1',
+                'kind': 'Service',
+                'metadata': metadata,
+                'spec': {
+                    'type': _default(config['service'].get('type'), 'ClusterIP'),
+                    'ports': [{'port': port, 'targetPort': port, 'protocol': 'TCP', 'name': 'http'}],
+                    'selector': {'app': name},
+                },
+            }
+        if deployment or service:
+            rendered[key] = (deployment, service)
+    return rendered
+
+
+def helm_template(values_file, release=RELEASE):
+    """{clave de values: (Deployment, Service)} renderizado por `helm template`"""
+    output = subprocess.run(['helm', 'template', release, str(CHART_DIR), '-f', str(values_file)],
+                            capture_output=True, text=True, check=True).stdout
+    objects = {(document['kind'], document['metadata']['name']): document
+               for document in yaml.load_all(output, Loader=Loader) if isinstance(document, dict)}
+    values = merge_values(load_values(CHART_DIR / 'values.yaml')[0], load_values(values_file)[0])
+    return {key: (objects.get(('Deployment', chart_service_name(key))), objects.get(('Service', chart_service_name(key))))
+            for key, config in values.items() if isinstance(config, dict) and config.get('enabled') is True}
+
+
+def registry_name(key):
+    """serviceDiscovery → service-discovery (nombre del registro para una clave de values)"""
+    return re.sub(r'(?<!^)(?=[A-Z])', '-', key).lower()
+
+
+def cpu(value):
+    match = CPU.match(str(value))
+    if not match:
+        return value
+    millicores = float(match.group(1)) * (1 if match.group(2) else 1000)
+    return f'{millicores:g}m'
+
+
+def memory(value):
+    match = MEMORY.match(str(value))
+    if not match or match.group(2) not in MEMORY_UNITS:
+        return value
+    size = float(match.group(1)) * MEMORY_UNITS[match.group(2)]
+    for unit in ('Gi', 'Mi', 'Ki'):
+        if size % MEMORY_UNITS[unit] == 0:
+            return f'{size / MEMORY_UNITS[unit]:g}{unit}'
+    return f'{size:g}'
+
+
+def spring_config(configmap):
+    """application.yml efectivo del ConfigMap (vacío: defaults de Spring Boot)"""
+    text = ((configmap or {}).get('data') or {}).get('application.yml')
+    return yaml.load(text, Loader=Loader) or {} if text else {}
+
+
+def normalize(service_name, deployment, service=None, configmaps=None, autoscaler=None):
+    """Vista plana {campo: valor} con los valores por defecto explícitos y las unidades canónicas"""
+    configmaps = configmaps or {}
+    fields = {}
+    if deployment:
+        pod = deployment['spec']['template']['spec']
+        container = pod['containers'][0]
+        ports = {port.get('name'): port['containerPort'] for port in container.get('ports') or []}
+        fields.update({
+            'name': deployment['metadata']['name'],
+            'namespace': deployment['metadata'].get('namespace'),
+            'replicas': deployment['spec'].get('replicas', 1),
+            'image': container.get('image'),
+            'imagePullPolicy': container.get('imagePullPolicy', 'IfNotPresent'),
+            'serviceAccountName': pod.get('serviceAccountName', 'default'),
+            'initContainers': ', '.join(init['name'] for init in pod.get('initContainers') or []) or None,
+        })
+        for key, value in (pod.get('securityContext') or {}).items():
+            fields[f'securityContext.{key}'] = value
+        resources = container.get('resources') or {}
+        for bound in ('requests', 'limits'):
+            for resource, canonical in (('cpu', cpu), ('memory', memory)):
+                value = (resources.get(bound) or {}).get(resource)
+                fields[f'resources.{bound}.{resource}'] = canonical(value) if value is not None else None
+        for probe_kind in ('startupProbe', 'livenessProbe', 'readinessProbe'):
+            probe = container.get(probe_kind)
+            if not probe:
+                fields[probe_kind] = None
+                continue
+            http = probe.get('httpGet') or {}
+            port = http.get('port')
+            fields[f'{probe_kind}.path'] = http.get('path')
+            fields[f'{probe_kind}.port'] = ports.get(port, port)
+            for key, default in PROBE_DEFAULTS.items():
+                fields[f'{probe_kind}.{key}'] = probe.get(key, default)
+        for variable in container.get('env') or []:
+            source = variable.get('valueFrom') or {}
+            value = variable.get('value')
+            if 'configMapKeyRef' in source:
+                ref = source['configMapKeyRef']
+                data = (configmaps.get(ref['name']) or {}).get('data') or {}
+                value = data.get(ref['key'], f"configMap {ref['name']}/{ref['key']}")
+            elif 'secretKeyRef' in source:
+                ref = source['secretKeyRef']
+                value = f"secret {ref['name']}/{ref['key']}"
+            fields[f"env.{variable['name']}"] = value
+        fields.setdefault('env.JAVA_TOOL_OPTIONS', None)
+
+        spring = spring_config(configmaps.get(f'{service_name}-config'))
+        if 'db' in SERVICES[service_name]:
+            hikari = ((spring.get('spring') or {}).get('datasource') or {}).get('hikari') or {}
+            pool = hikari.get('maximum-pool-size', HIKARI_MAXIMUM_POOL_SIZE)
+            fields['pool.maximum-pool-size'] = pool
+            fields['pool.minimum-idle'] = hikari.get('minimum-idle', pool)
+        tomcat = (spring.get('server') or {}).get('tomcat') or {}
+        for key, default in TOMCAT_DEFAULTS.items():
+            section, _, leaf = key.rpartition('.')
+            fields[f'tomcat.{key}'] = ((tomcat.get(section) or {}) if section else tomcat).get(leaf, default)
+
+    if service:
+        spec = service['spec']
+        port = (spec.get('ports') or [{}])[0]
+        fields.update({
+            'service.name': service['metadata']['name'],
+            'service.type': spec.get('type', 'ClusterIP'),
+            'service.port': port.get('port'),
+            'service.targetPort': port.get('targetPort', port.get('port')),
+        })
+
+    spec = (autoscaler or {}).get('spec') or {}
+    fields['autoscaling.kind'] = (autoscaler or {}).get('kind')
+    fields['autoscaling.minReplicas'] = spec.get('minReplicaCount', spec.get('minReplicas'))
+    fields['autoscaling.maxReplicas'] = spec.get('maxReplicaCount', spec.get('maxReplicas'))
+    return fields
+
+
+def generated_objects(env, reports):
+    """{servicio: (Deployment, Service, autoscaler)} y {nombre: ConfigMap} de los generadores"""
+    import generate_k8s_configs
+    import generate_network_security_configs
+
+    documents = [document
+                 for output in generate_k8s_configs.manifests(env, reports['budget'], reports['resources'],
+                                                              reports['startup'], reports['boot'])
+                 + generate_network_security_configs.manifests(reports['capacity'], env, reports['resources'])
+                 for document in output.documents or []]
+    objects = {(document['kind'], document['metadata']['name']): document for document in documents}
+    autoscalers = {document['spec']['scaleTargetRef']['name']: document for document in documents
+                   if document['kind'] in ('HorizontalPodAutoscaler', 'ScaledObject')}
+    configmaps = {name: document for (kind, name), document in objects.items() if kind == 'ConfigMap'}
+    services = {name: (objects.get(('Deployment', name)), objects.get(('Service', name)), autoscalers.get(name))
+                for name in SERVICES}
+    return services, configmaps
+
+
+def diff(chart, generated):
+    """[(campo, chart, generado)] de los campos que difieren"""
+    return [(field, chart.get(field), generated.get(field))
+            for field in sorted(set(chart) | set(generated)) if chart.get(field) != generated.get(field)]
+
+
+def is_performance(field):
+    return field.startswith(PERFORMANCE)
+
+
+def _show(value):
+    return '—' if value is None else str(value)
+
+
+def compare(env, reports, use_helm=False, show_all=False):
+    """Imprime la deriva del entorno; devuelve cuántos campos de rendimiento difieren"""
+    values_file = CHART_DIR / f'values-{env}.yaml'
+    base, base_duplicates = load_values(CHART_DIR / 'values.yaml')
+    overrides, duplicates = load_values(values_file)
+    for path, found in ((CHART_DIR / 'values.yaml', base_duplicates), (values_file, duplicates)):
+        for key, first, second in found:
+            print(f'  ⚠️  {path.name}: clave {key!r} repetida (líneas {first} y {second}); '
+                  'PyYAML se queda con la última y helm puede rechazar el archivo')
+    rendered = helm_template(values_file) if use_helm else render_chart(merge_values(base, overrides))
+    generated, configmaps = generated_objects(env, reports)
+
+    performance = 0
+    report = []
+    for key, (deployment, service) in sorted(rendered.items()):
+        name = registry_name(key)
+        if name not in SERVICES:
+            report.append((key, [('servicio', 'en el chart', 'no existe en el registro')]))
+            continue
+        gen_deployment, gen_service, autoscaler = generated[name]
+        changes = diff(normalize(name, deployment, service),
+                       normalize(name, gen_deployment, gen_service, configmaps, autoscaler))
+        performance += sum(is_performance(field) for field, _, _ in changes)
+        shown = [change for change in changes if show_all or is_performance(change[0]) or change[0] in ALWAYS]
+        if shown:
+            report.append((name, shown))
+    missing = sorted(set(SERVICES) - {registry_name(key) for key in rendered})
+    for name in missing:
+        report.append((name, [('servicio', 'no está en el chart', 'generado')]))
+
+    print(f'\n🔍 {env}: chart ({values_file.name}) vs generadores — {performance} campos de rendimiento distintos')
+    for name, changes in report:
+        print(f'  {name}')
+        for field, chart_value, generated_value in changes:
+            marker = '⚡' if is_performance(field) else '·'
+            print(f'    {marker} {field}: chart {_show(chart_value)} ≠ generado {_show(generated_value)}')
+    return performance + len(missing)
+
+
+if __name__ == '__main__':
+    available = [env for env in ENVIRONMENTS if (CHART_DIR / f'values-{env}.yaml').exists()]
+    parser = argparse.ArgumentParser(description='Diferencias semánticas entre el chart de Helm y los manifiestos generados')
+    parser.add_argument('environments', nargs='*', default=available, help='entornos (default: los que tienen values-<env>.yaml)')
+    parser.add_argument('--all', action='store_true', help='mostrar también los campos que no son de rendimiento')
+    parser.add_argument('--helm', action='store_true', help='renderizar con `helm template` en lugar del renderizador interno')
+    args = parser.parse_args()
+
+    unknown = set(args.environments) - set(available)
+    if unknown:
+        print(f"❌ Entornos sin values-<env>.yaml: {', '.join(sorted(unknown))} (disponibles: {', '.join(available)})")
+        sys.exit(2)
+    if not args.helm and templates_digest() != TEMPLATES_DIGEST:
+        print('⚠️  Las plantillas del chart cambiaron: actualizar render_chart() o usar --helm')
+
+    started = time.perf_counter()
+    reports = load_reports()
+    try:
+        drift = sum(compare(env, reports, args.helm, args.all) for env in args.environments)
+    except (OSError, subprocess.CalledProcessError) as error:
+        print(f'❌ No se pudo renderizar el chart: {error}')
+        sys.exit(1)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f'\n⏱️  {len(args.environments)} entornos comparados en {elapsed:.0f} ms')
+    if drift:
+        print(f'❌ {drift} diferencias de rendimiento entre el chart y los generadores')
+        sys.exit(1)
+    print('✅ El chart y los generadores coinciden en los campos de rendimiento')
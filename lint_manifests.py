@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Linter de consistencia entre manifiestos
+E-Commerce Microservices Platform
+
+Carga una sola vez todo el árbol k8s/ en índices en memoria (por kind,
+namespace y nombre, y por etiqueta de pod) y resuelve cada referencia entre
+objetos con búsquedas en diccionario, en tiempo aproximadamente lineal:
+
+  - selectores de Service → etiquetas de pods de Deployments/StatefulSets,
+    y targetPort → containerPort (número o nombre) de esos pods
+  - env valueFrom / envFrom / volúmenes → ConfigMap, Secret y PVC (y la clave)
+  - serviceAccountName → ServiceAccount
+  - scaleTargetRef de HPA/ScaledObject → Deployment/StatefulSet, y más de un
+    autoscaler sobre el mismo workload (HPA y ScaledObject se pisan; los HPA
+    de respaldo sin KEDA de autoscaling/hpa-fallback no cuentan)
+  - backends del Ingress → Service y puerto
+  - roleRef y subjects de RoleBinding → Role y ServiceAccount
+  - podSelector de NetworkPolicy y selector de ServiceMonitor sin destinos
+  - objetos definidos más de una vez (mismo kind, namespace y nombre); las
+    comprobaciones usan el generado (k8s/.generated, el que aplica
+    deploy-all.sh) y, si ninguno o varios lo son, la definición es ambigua
+
+Los errores son referencias rotas que fallarían o dejarían el despliegue
+sin tráfico; las advertencias, selectores que no seleccionan nada.
+
+Uso:
+  python3 lint_manifests.py                          # k8s/
+  python3 lint_manifests.py k8s/environments/prod --external Secret
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import yaml
+
+from generate_manifests import read_index
+from generate_network_security_configs import KEDA_FALLBACK_ANNOTATION
+from service_registry import BASE_DIR
+from validate_yaml import Loader, discover
+
+WORKLOADS = ('Deployment', 'StatefulSet', 'DaemonSet')
+CLUSTER_SCOPED = {'Namespace', 'ClusterRole', 'ClusterRoleBinding', 'StorageClass', 'PersistentVolume'}
+
+
+class Index:
+    """
+    Objetos por (kind, namespace, nombre) y pods de los workloads por etiqueta.
+    Un objeto definido en varios archivos se indexa con la definición de
+    generated (rutas de k8s/.generated); si ninguna o más de una lo es, la
+    clave queda en ambiguous
+    """
+
+    def __init__(self, generated=()):
+        self.objects = {}
+        self.sources = defaultdict(list)
+        self.by_kind = defaultdict(list)
+        self.pod_labels = defaultdict(set)   # (namespace, clave, valor) -> {workload}
+        self.pods = {}                       # workload -> (etiquetas, spec del pod)
+        self.generated = set(generated)
+        self.ambiguous = set()
+
+    def add(self, document, path):
+        kind = document['kind']
+        metadata = document.get('metadata') or {}
+        namespace = None if kind in CLUSTER_SCOPED else metadata.get('namespace', 'default')
+        key = (kind, namespace, metadata.get('name'))
+        self.sources[key].append(path)
+        if key in self.objects:
+            preferred = [source for source in self.sources[key] if source in self.generated]
+            if len(preferred) != 1:
+                self.ambiguous.add(key)
+                return
+            self.ambiguous.discard(key)
+            if path != preferred[0]:
+                return
+            self._remove(key)
+        self.objects[key] = document
+        self.by_kind[kind].append(key)
+        if kind in WORKLOADS:
+            template = (document.get('spec') or {}).get('template') or {}
+            labels = (template.get('metadata') or {}).get('labels') or {}
+            self.pods[key] = (labels, template.get('spec') or {})
+            for label in labels.items():
+                self.pod_labels[(namespace, *label)].add(key)
+
+    def _remove(self, key):
+        del self.objects[key]
+        self.by_kind[key[0]].remove(key)
+        if key in self.pods:
+            labels, _ = self.pods.pop(key)
+            for label in labels.items():
+                self.pod_labels[(key[1], *label)].discard(key)
+
+    def get(self, kind, namespace, name):
+        return self.objects.get((kind, None if kind in CLUSTER_SCOPED else namespace, name))
+
+    def select_pods(self, namespace, selector):
+        """Workloads cuyos pods tienen todas las etiquetas del selector (None: selector vacío = todos)"""
+        if not selector:
+            return {key for key in self.pods if key[1] == namespace}
+        matches = None
+        for label in selector.items():
+            candidates = self.pod_labels.get((namespace, *label), set())
+            matches = candidates if matches is None else matches & candidates
+            if not matches:
+                return set()
+        return matches
+
+
+def load(paths):
+    index = Index(path for paths in read_index().values() for path in paths)
+    for path in paths:
+        with open(BASE_DIR / path, 'rb') as f:
+            try:
+                documents = list(yaml.load_all(f, Loader=Loader))
+            except yaml.YAMLError:
+                continue   # los errores de sintaxis los reporta validate_yaml.py
+        for document in documents:
+            if isinstance(document, dict) and 'kind' in document and 'apiVersion' in document:
+                index.add(document, path)
+    return index
+
+
+def _name(key):
+    kind, namespace, name = key
+    return f'{kind} {namespace}/{name}' if namespace else f'{kind} {name}'
+
+
+def check_references(index, external=()):
+    """(errores, advertencias) como listas de (objeto, mensaje)"""
+    errors, warnings = [], []
+
+    def require(owner, kind, namespace, name, what, key=None):
+        if kind in external:
+            return
+        target = index.get(kind, namespace, name)
+        if target is None:
+            errors.append((owner, f'{what} → {kind} {name} no existe'))
+        elif key is not None and key not in (target.get('data') or {}) and key not in (target.get('stringData') or {}):
+            errors.append((owner, f'{what} → clave {key!r} no existe en {kind} {name}'))
+
+    for key, paths in index.sources.items():
+        if len(paths) > 1:
+            used = ('ninguno generado, ambiguo' if key in index.ambiguous
+                    else f'se usa el generado {next(path for path in paths if path in index.generated)}')
+            errors.append((key, f"definido {len(paths)} veces: {', '.join(paths)} ({used})"))
+
+    for key, (labels, pod) in index.pods.items():
+        namespace = key[1]
+        containers = (pod.get('initContainers') or []) + (pod.get('containers') or [])
+        for container in containers:
+            for variable in container.get('env') or []:
+                source = variable.get('valueFrom') or {}
+                for field, kind in (('configMapKeyRef', 'ConfigMap'), ('secretKeyRef', 'Secret')):
+                    ref = source.get(field)
+                    if ref and not ref.get('optional'):
+                        require(key, kind, namespace, ref.get('name'), f"env {variable.get('name')}", ref.get('key'))
+            for source in container.get('envFrom') or []:
+                for field, kind in (('configMapRef', 'ConfigMap'), ('secretRef', 'Secret')):
+                    ref = source.get(field)
+                    if ref and not ref.get('optional'):
+                        require(key, kind, namespace, ref.get('name'), 'envFrom')
+        for volume in pod.get('volumes') or []:
+            if volume.get('configMap') and not volume['configMap'].get('optional'):
+                require(key, 'ConfigMap', namespace, volume['configMap'].get('name'), f"volumen {volume.get('name')}")
+            if volume.get('secret') and not volume['secret'].get('optional'):
+                require(key, 'Secret', namespace, volume['secret'].get('secretName'), f"volumen {volume.get('name')}")
+            if volume.get('persistentVolumeClaim'):
+                require(key, 'PersistentVolumeClaim', namespace, volume['persistentVolumeClaim'].get('claimName'),
+                        f"volumen {volume.get('name')}")
+        account = pod.get('serviceAccountName')
+        if account and account != 'default':
+            require(key, 'ServiceAccount', namespace, account, 'serviceAccountName')
+
+    service_ports = {}
+    for key in index.by_kind['Service']:
+        namespace = key[1]
+        spec = index.objects[key].get('spec') or {}
+        service_ports[key] = {port.get('port') for port in spec.get('ports') or []} | \
+            {port.get('name') for port in spec.get('ports') or [] if port.get('name')}
+        selector = spec.get('selector')
+        if not selector:
+            continue
+        targets = index.select_pods(namespace, selector)
+        if not targets:
+            errors.append((key, f'el selector {selector} no coincide con ningún pod'))
+            continue
+        exposed = set()
+        for workload in targets:
+            for container in index.pods[workload][1].get('containers') or []:
+                for port in container.get('ports') or []:
+                    exposed.update({port.get('containerPort'), port.get('name')})
+        for port in spec.get('ports') or []:
+            target = port.get('targetPort', port.get('port'))
+            if target not in exposed:
+                errors.append((key, f"targetPort {target} no es un containerPort de "
+                                    f"{', '.join(sorted(name for _, _, name in targets))}"))
+
+    autoscalers = defaultdict(list)
+    for kind in ('HorizontalPodAutoscaler', 'ScaledObject'):
+        for key in index.by_kind[kind]:
+            ref = (index.objects[key].get('spec') or {}).get('scaleTargetRef') or {}
+            target_kind = ref.get('kind', 'Deployment')
+            require(key, target_kind, key[1], ref.get('name'), 'scaleTargetRef')
+            annotations = (index.objects[key].get('metadata') or {}).get('annotations') or {}
+            if KEDA_FALLBACK_ANNOTATION not in annotations:   # alternativa al ScaledObject, no se aplican juntos
+                autoscalers[(target_kind, key[1], ref.get('name'))].append(key)
+    for target, owners in autoscalers.items():
+        if len(owners) > 1:
+            errors.append((target, f"lo escalan {len(owners)} autoscalers: {', '.join(_name(o) for o in owners)}"))
+
+    for key in index.by_kind['Ingress']:
+        spec = index.objects[key].get('spec') or {}
+        backends = [spec.get('defaultBackend')] + [path.get('backend') for rule in spec.get('rules') or []
+                                                    for path in (rule.get('http') or {}).get('paths') or []]
+        for backend in filter(None, backends):
+            service = backend.get('service') or {}
+            service_key = ('Service', key[1], service.get('name'))
+            if service_key not in index.objects:
+                errors.append((key, f"backend → Service {service.get('name')} no existe"))
+                continue
+            port = service.get('port') or {}
+            wanted = port.get('number', port.get('name'))
+            if wanted not in service_ports[service_key]:
+                errors.append((key, f"backend {service.get('name')}:{wanted} → el Service no expone ese puerto"))
+
+    for kind in ('RoleBinding', 'ClusterRoleBinding'):
+        for key in index.by_kind[kind]:
+            binding = index.objects[key]
+            role = binding.get('roleRef') or {}
+            require(key, role.get('kind', 'Role'), key[1], role.get('name'), 'roleRef')
+            for subject in binding.get('subjects') or []:
+                if subject.get('kind') == 'ServiceAccount':
+                    require(key, 'ServiceAccount', subject.get('namespace', key[1]), subject.get('name'), 'subject')
+
+    for key in index.by_kind['NetworkPolicy']:
+        selector = ((index.objects[key].get('spec') or {}).get('podSelector') or {}).get('matchLabels')
+        if selector and not index.select_pods(key[1], selector):
+            warnings.append((key, f'podSelector {selector} no selecciona ningún pod'))
+
+    service_labels = defaultdict(set)
+    for key in index.by_kind['Service']:
+        for label in ((index.objects[key].get('metadata') or {}).get('labels') or {}).items():
+            service_labels[label].add(key)
+    for key in index.by_kind['ServiceMonitor']:
+        spec = index.objects[key].get('spec') or {}
+        selector = (spec.get('selector') or {}).get('matchLabels') or {}
+        namespaces = (spec.get('namespaceSelector') or {}).get('matchNames') or [key[1]]
+        matches = set.intersection(*(service_labels[label] for label in selector.items())) if selector else set()
+        if selector and not any(service[1] in namespaces for service in matches):
+            warnings.append((key, f"selector {selector} no selecciona ningún Service en {', '.join(namespaces)}"))
+    return errors, warnings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Referencias colgantes o incoherentes entre manifiestos')
+    parser.add_argument('paths', nargs='*', default=[str(BASE_DIR / 'k8s')], help='archivos o directorios (default: k8s/)')
+    parser.add_argument('--external', action='append', default=[], metavar='KIND',
+                        help='kinds que se crean fuera del árbol (p. ej. Secret); no se exigen')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths, _ = discover([Path(path) for path in args.paths])
+    index = load(paths)
+    errors, warnings = check_references(index, set(args.external))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f'🔗 {len(index.objects)} objetos en {len(paths)} archivos, analizados en {elapsed:.0f} ms')
+    for owner, message in sorted(warnings, key=lambda item: str(item[0])):
+        print(f'  ⚠️  {_name(owner)}: {message}')
+    for owner, message in sorted(errors, key=lambda item: str(item[0])):
+        print(f'  ❌ {_name(owner)}: {message}')
+    if errors:
+        print(f'\n❌ {len(errors)} referencias rotas')
+        sys.exit(1)
+    print('✅ Todas las referencias resuelven')
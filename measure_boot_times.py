@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Registro de tiempos de arranque de pods reales
+E-Commerce Microservices Platform
+
+Calcula, para cada pod en ejecución, el tiempo entre el arranque del
+contenedor (state.running.startedAt) y la condición ContainersReady (Ready
+si no está), y lo acumula por servicio en reports/boot-times.yaml.
+generate_k8s_configs.py usa esa distribución (percentil y margen de PROBES
+en service_registry.py) para el failureThreshold del startupProbe.
+
+lastTransitionTime es la última transición de la condición: en un pod cuya
+readiness osciló mide la última recuperación, no el arranque. Solo cuenta
+como arranque si es la primera transición posible:
+  - el contenedor no se reinició (restartCount 0; si no, startedAt es el
+    del último reinicio)
+  - llegó dentro de la ventana de sus sondas: el startupProbe agotado
+    (initialDelaySeconds + periodSeconds × failureThreshold) reinicia el
+    contenedor, así que la primera vez que quedó listo fue antes de eso más
+    un periodo de readiness; una transición posterior es una oscilación
+Sin startupProbe en el spec la ventana es --max-boot (default 300 s). Los
+pods descartados se informan con el motivo.
+
+Las muestras se pueden tomar del clúster (kubectl get pods -o json) o de
+exportaciones guardadas; conviene registrar despliegues con el clúster
+cargado, porque el arranque bajo contención de CPU es el que define el
+umbral.
+
+Uso:
+  python3 measure_boot_times.py --namespace dev --write
+  python3 measure_boot_times.py pods-prod.json --write
+"""
+import argparse
+import json
+import math
+import subprocess
+import sys
+from datetime import datetime
+
+import yaml
+
+from generate_k8s_configs import BOOT_TIMES_FILE, load_boot_times
+from service_registry import BASE_DIR, SERVICES, probe_settings
+
+# Muestras conservadas por servicio (las más recientes)
+MAX_SAMPLES = 200
+# Arranque máximo creíble de pods sin startupProbe; por encima la condición es de una oscilación posterior
+MAX_BOOT_SECONDS = 300
+
+
+def _timestamp(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+
+
+def boot_window(container, max_seconds=MAX_BOOT_SECONDS):
+    """
+    Segundos máximos entre el arranque y la primera vez que el contenedor
+    queda listo según sus sondas (max_seconds sin startupProbe)
+    """
+    startup = container.get('startupProbe')
+    if not startup:
+        return max_seconds
+    readiness = container.get('readinessProbe') or {}
+    # Valores por defecto de Kubernetes: periodSeconds 10, timeoutSeconds 1, failureThreshold 3
+    startup_budget = (startup.get('initialDelaySeconds', 0)
+                      + startup.get('periodSeconds', 10) * startup.get('failureThreshold', 3)
+                      + startup.get('timeoutSeconds', 1))
+    return startup_budget + readiness.get('periodSeconds', 10) + readiness.get('timeoutSeconds', 1)
+
+
+def boot_times(pods, max_seconds=MAX_BOOT_SECONDS):
+    """
+    ({pod: (servicio, segundos)}, {pod: motivo del descarte}) de los pods
+    listos de servicios del registro
+    """
+    samples, discarded = {}, {}
+    for pod in pods.get('items', []):
+        service = pod['metadata'].get('labels', {}).get('app')
+        if service not in SERVICES:
+            continue
+        name = pod['metadata']['name']
+        conditions = {condition['type']: condition for condition in pod.get('status', {}).get('conditions', [])
+                      if condition['status'] == 'True'}
+        ready = conditions.get('ContainersReady') or conditions.get('Ready')
+        status = next((status for status in pod['status'].get('containerStatuses', [])
+                       if status['name'] == service), None)
+        running = ((status or {}).get('state') or {}).get('running')
+        if not ready or not running:
+            continue
+        if status.get('restartCount'):
+            discarded[name] = f"el contenedor se reinició {status['restartCount']} veces"
+            continue
+        spec = next((container for container in pod.get('spec', {}).get('containers', [])
+                     if container['name'] == service), {})
+        window = boot_window(spec, max_seconds)
+        seconds = (_timestamp(ready['lastTransitionTime']) - _timestamp(running['startedAt'])).total_seconds()
+        if seconds > window:
+            discarded[name] = (f"listo {seconds:.0f}s después del arranque, fuera de la ventana de sus sondas "
+                               f"({window:g}s): la readiness osciló")
+        elif seconds >= 0:
+            samples[name] = (service, seconds)
+    return samples, discarded
+
+
+def kubectl_pods(namespace):
+    output = subprocess.run(['kubectl', 'get', 'pods', '-n', namespace, '-o', 'json'],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def read_export(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def merge(existing, samples, max_seconds=MAX_BOOT_SECONDS):
+    """
+    Acumula las muestras nuevas (un pod se cuenta una sola vez), descarta
+    las acumuladas que superan max_seconds y recalcula los percentiles
+    """
+    merged = {}
+    for name, entry in existing.items():
+        kept = [(pod, seconds) for pod, seconds in zip(entry['pods'], entry['samples']) if seconds <= max_seconds]
+        if kept:
+            merged[name] = {'pods': [pod for pod, _ in kept], 'samples': [seconds for _, seconds in kept]}
+    for pod, (service, seconds) in samples.items():
+        entry = merged.setdefault(service, {'pods': [], 'samples': []})
+        if pod in entry['pods']:
+            continue
+        entry['pods'] = (entry['pods'] + [pod])[-MAX_SAMPLES:]
+        entry['samples'] = (entry['samples'] + [round(seconds, 1)])[-MAX_SAMPLES:]
+    for service, entry in merged.items():
+        ordered = sorted(entry['samples'])
+        percentile = probe_settings(service)['boot_percentile']
+        entry['p50'] = ordered[math.ceil(len(ordered) * 0.5) - 1]
+        entry[f'p{percentile}'] = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * percentile / 100) - 1)]
+        entry['max'] = ordered[-1]
+    return merged
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tiempos de arranque (contenedor → Ready) por servicio')
+    parser.add_argument('exports', nargs='*', help='salidas de kubectl get pods -o json (default: consultar el clúster)')
+    parser.add_argument('--namespace', action='append', help='namespace a consultar (repetible; default: dev)')
+    parser.add_argument('--max-boot', type=float, default=MAX_BOOT_SECONDS,
+                        help='segundos máximos creíbles de arranque de pods sin startupProbe')
+    parser.add_argument('--write', action='store_true', help=f'acumular en {BOOT_TIMES_FILE.relative_to(BASE_DIR)}')
+    args = parser.parse_args()
+
+    samples, discarded = {}, {}
+    try:
+        if args.exports:
+            sources = [read_export(path) for path in args.exports]
+        else:
+            sources = [kubectl_pods(namespace) for namespace in args.namespace or ['dev']]
+    except (OSError, subprocess.CalledProcessError, json.JSONDecodeError) as error:
+        print(f'❌ No se pudieron leer los pods: {error}')
+        sys.exit(1)
+    for pods in sources:
+        found, skipped = boot_times(pods, args.max_boot)
+        samples.update(found)
+        discarded.update(skipped)
+    for pod, reason in sorted(discarded.items()):
+        print(f'⚠️  {pod}: {reason}, se descarta')
+    if not samples:
+        print('❌ No hay pods listos de servicios del registro')
+        sys.exit(1)
+
+    report = merge(load_boot_times() if args.write else {}, samples, args.max_boot)
+    print('🥾 Tiempos de arranque (contenedor → Ready):')
+    for service, entry in sorted(report.items()):
+        percentile = probe_settings(service)['boot_percentile']
+        print(f"  - {service}: {len(entry['samples'])} muestras, p50 {entry['p50']}s, "
+              f"p{percentile} {entry[f'p{percentile}']}s, máx {entry['max']}s")
+
+    if args.write:
+        BOOT_TIMES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(BOOT_TIMES_FILE, 'w') as f:
+            yaml.dump(report, f, default_flow_style=False, sort_keys=True)
+        print(f'\n✅ Tiempos guardados en {BOOT_TIMES_FILE}')
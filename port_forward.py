@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Supervisor de port-forwards con gateway local opcional
+E-Commerce Microservices Platform
+
+Mantiene un `kubectl port-forward` por servicio del registro (puerto local =
+puerto del servicio + --offset) y lo vigila: si kubectl termina, informa un
+error fatal de reenvío ("lost connection to pod", "an error occurred
+forwarding") o el túnel deja de responder a
+<context_path>/actuator/health/liveness durante varias comprobaciones
+seguidas, lo reinicia con backoff exponencial. Los demás mensajes de stderr
+(p. ej. "error copying from local connection to remote stream" cuando un
+cliente corta) son de una sola conexión y no reinician el túnel.
+
+Con --gateway PUERTO expone además un único endpoint local (proxy inverso
+asyncio) que enruta por el primer segmento de la ruta:
+
+  /user-service/api/users      → user-service   /user-service/api/users
+  /api-gateway/app/api/...     → api-gateway    /app/api/...
+  /proxy-client/api/...        → proxy-client   /app/api/...
+
+es decir, el prefijo se sustituye por el context_path del servicio. Las
+conexiones hacia los túneles se reutilizan (async_http.py), de modo que
+locust y las herramientas locales tienen un solo destino estable que
+aguanta mucha concurrencia sin abrir un socket por petición.
+
+Uso:
+  python3 port_forward.py                              # todos, namespace dev
+  python3 port_forward.py --namespace qa --gateway 9000
+  python3 port_forward.py user-service order-service --offset 10000
+"""
+import argparse
+import asyncio
+import re
+import shutil
+import signal
+import sys
+import time
+from collections import Counter
+
+from async_http import ConnectionPool, ProtocolError, encode_head, header, read_body, read_head
+from service_registry import SERVICES
+
+CHECK_INTERVAL = 5.0
+CHECK_TIMEOUT = 2.0
+STARTUP_GRACE = 15.0
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+# Solo mensajes fatales: el resto de errores de kubectl afectan a una conexión
+FORWARD_ERRORS = ('lost connection to pod', 'an error occurred forwarding')
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'te', 'trailer',
+              'upgrade', 'content-length', 'host'}
+ROUTE = re.compile(r'^/([^/?]+)(.*)$')
+
+
+def log(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+
+class Tunnel:
+    """Un kubectl port-forward hacia svc/<servicio>"""
+
+    def __init__(self, service_name, namespace, offset, address):
+        config = SERVICES[service_name]
+        self.service_name = service_name
+        self.namespace = namespace
+        self.address = address
+        self.remote_port = config['port']
+        self.local_port = config['port'] + offset
+        self.context_path = config.get('context_path', '').rstrip('/')
+        self.process = None
+        self.healthy = False
+        self.restarts = 0
+
+    async def start(self):
+        # stdout a /dev/null: kubectl escribe una línea por conexión y llenaría la tubería
+        self.process = await asyncio.create_subprocess_exec(
+            'kubectl', 'port-forward', '-n', self.namespace, '--address', self.address,
+            f'svc/{self.service_name}', f'{self.local_port}:{self.remote_port}',
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+
+    async def stop(self):
+        self.healthy = False
+        if self.process is None or self.process.returncode is not None:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+
+async def forward_error(stream):
+    """Primera línea de stderr con un error fatal de reenvío (None si kubectl cierra stderr)"""
+    while True:
+        line = await stream.readline()
+        if not line:
+            return None
+        text = line.decode(errors='replace').strip()
+        if any(marker in text.lower() for marker in FORWARD_ERRORS):
+            return text
+
+
+async def alive(tunnel, pool):
+    """El túnel responde HTTP (cualquier código: un 503 del servicio no es un túnel caído)"""
+    try:
+        await pool.request(tunnel.address, tunnel.local_port, 'GET', f'{tunnel.context_path}/actuator/health/liveness',
+                           timeout=CHECK_TIMEOUT)
+        return True
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProtocolError, ValueError):
+        return False
+
+
+async def watch(tunnel, pool, interval, max_failures):
+    """Vigila el túnel hasta que hay que reiniciarlo; devuelve el motivo"""
+    loop = asyncio.get_running_loop()
+    exited = asyncio.ensure_future(tunnel.process.wait())
+    errors = asyncio.ensure_future(forward_error(tunnel.process.stderr))
+    started, failures = loop.time(), 0
+    try:
+        while True:
+            done, _ = await asyncio.wait({exited, errors}, timeout=interval if tunnel.healthy else 1.0)
+            if exited in done:
+                return f'kubectl terminó (código {tunnel.process.returncode})'
+            if errors in done:
+                if errors.result():
+                    return errors.result()
+                errors = loop.create_future()   # stderr cerrado: queda el chequeo de salud
+            if await alive(tunnel, pool):
+                if not tunnel.healthy:
+                    log(f'✅ {tunnel.service_name}: {tunnel.address}:{tunnel.local_port} → {tunnel.remote_port}')
+                tunnel.healthy, failures = True, 0
+            elif tunnel.healthy:
+                failures += 1
+                if failures >= max_failures:
+                    return f'sin respuesta en {failures} comprobaciones'
+            elif loop.time() - started > STARTUP_GRACE:
+                return f'no respondió en {STARTUP_GRACE:.0f}s'
+    finally:
+        exited.cancel()
+        errors.cancel()
+
+
+async def supervise(tunnel, pool, interval, max_failures):
+    """Arranca el túnel y lo reinicia cada vez que cae, con backoff exponencial"""
+    backoff = MIN_BACKOFF
+    try:
+        while True:
+            await tunnel.start()
+            reason = await watch(tunnel, pool, interval, max_failures)
+            backoff = MIN_BACKOFF if tunnel.healthy else min(backoff * 2, MAX_BACKOFF)
+            await tunnel.stop()
+            tunnel.restarts += 1
+            log(f'🔁 {tunnel.service_name}: {reason}; reinicio en {backoff:.0f}s')
+            await asyncio.sleep(backoff)
+    finally:
+        await tunnel.stop()
+
+
+class Gateway:
+    """Proxy inverso HTTP/1.1 que enruta /<servicio>/... al túnel del servicio"""
+
+    def __init__(self, tunnels, connections, timeout):
+        self.routes = {tunnel.service_name: tunnel for tunnel in tunnels}
+        self.pool = ConnectionPool(limit=connections)
+        self.timeout = timeout
+        self.requests = Counter()
+        self.errors = Counter()
+
+    async def handle(self, reader, writer):
+        peer = (writer.get_extra_info('peername') or ('-',))[0]
+        try:
+            while True:
+                request_line, headers = await read_head(reader)
+                if request_line is None:
+                    break
+                method, target, version = request_line.split(' ', 2)
+                body = await read_body(reader, headers)
+                status, reason, response_headers, payload = await self.forward(method, target, headers, body, peer)
+                keep_alive = version == 'HTTP/1.1' and (header(headers, 'Connection') or '').lower() != 'close'
+                # HEAD no trae cuerpo: se conserva el Content-Length del backend (el del GET)
+                length = header(response_headers, 'Content-Length') if method == 'HEAD' else str(len(payload))
+                response_headers = [(name, value) for name, value in response_headers if name.lower() not in HOP_BY_HOP]
+                if length is not None:
+                    response_headers.append(('Content-Length', length))
+                response_headers.append(('Connection', 'keep-alive' if keep_alive else 'close'))
+                writer.write(encode_head(f'HTTP/1.1 {status} {reason}', response_headers)
+                             + (b'' if method == 'HEAD' else payload))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ProtocolError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def forward(self, method, target, headers, body, peer):
+        match = ROUTE.match(target)
+        tunnel = self.routes.get(match.group(1)) if match else None
+        if tunnel is None:
+            return 404, 'Not Found', [], f"Prefijos disponibles: {', '.join(sorted(self.routes))}\n".encode()
+        self.requests[tunnel.service_name] += 1
+        rest = match.group(2)
+        path = tunnel.context_path + (rest if rest.startswith('/') else f'/{rest}')
+        upstream_headers = [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+        upstream_headers += [('X-Forwarded-For', peer), ('X-Forwarded-Host', header(headers, 'Host', ''))]
+        try:
+            response = await self.pool.request(tunnel.address, tunnel.local_port, method, path,
+                                               upstream_headers, body, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.errors[tunnel.service_name] += 1
+            return 504, 'Gateway Timeout', [], f'{tunnel.service_name} no respondió en {self.timeout:g}s\n'.encode()
+        except (OSError, asyncio.IncompleteReadError, ProtocolError) as error:
+            self.errors[tunnel.service_name] += 1
+            state = 'túnel caído' if not tunnel.healthy else str(error)
+            return 502, 'Bad Gateway', [], f'{tunnel.service_name}: {state}\n'.encode()
+        return response
+
+
+async def main(args):
+    tunnels = [Tunnel(service_name, args.namespace, args.offset, args.address) for service_name in args.services]
+    checks = ConnectionPool(limit=1, connect_timeout=CHECK_TIMEOUT)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    log(f'🚀 Port-forwarding de {len(tunnels)} servicios en el namespace {args.namespace} (Ctrl+C para detener)')
+    supervisors = [asyncio.create_task(supervise(tunnel, checks, args.check_interval, args.max_failures))
+                   for tunnel in tunnels]
+    gateway = server = None
+    if args.gateway:
+        gateway = Gateway(tunnels, args.connections, args.timeout)
+        server = await asyncio.start_server(gateway.handle, args.address, args.gateway, backlog=1024)
+        log(f'🌐 Gateway en http://{args.address}:{args.gateway}/<servicio>/...')
+
+    await stopping.wait()
+    log('🛑 Deteniendo túneles...')
+    if server:
+        server.close()
+        await server.wait_closed()
+    for task in supervisors:
+        task.cancel()
+    await asyncio.gather(*supervisors, return_exceptions=True)
+    await checks.close()
+
+    print('\n📊 Resumen:')
+    for tunnel in tunnels:
+        line = f'  - {tunnel.service_name:<20} :{tunnel.local_port}  reinicios {tunnel.restarts}'
+        if gateway:
+            line += f'  peticiones {gateway.requests[tunnel.service_name]}  errores {gateway.errors[tunnel.service_name]}'
+        print(line)
+    if gateway:
+        print(f'  Conexiones abiertas hacia los túneles: {gateway.pool.opened}')
+        await gateway.pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Port-forwards supervisados y gateway local por prefijo de ruta')
+    parser.add_argument('services', nargs='*', default=list(SERVICES), help='servicios (default: todos)')
+    parser.add_argument('--namespace', default='dev', help='namespace de los servicios')
+    parser.add_argument('--offset', type=int, default=0, help='puerto local = puerto del servicio + offset')
+    parser.add_argument('--address', default='127.0.0.1', help='dirección local de los túneles y del gateway')
+    parser.add_argument('--gateway', type=int, metavar='PUERTO', help='exponer un proxy inverso en este puerto')
+    parser.add_argument('--connections', type=int, default=64, help='conexiones máximas del gateway por servicio')
+    parser.add_argument('--timeout', type=float, default=30.0, help='segundos máximos por petición del gateway')
+    parser.add_argument('--check-interval', type=float, default=CHECK_INTERVAL, help='segundos entre chequeos de salud')
+    parser.add_argument('--max-failures', type=int, default=3, help='chequeos fallidos seguidos antes de reiniciar')
+    args = parser.parse_args()
+
+    unknown = set(args.services) - set(SERVICES)
+    if unknown:
+        print(f"❌ Servicios desconocidos: {', '.join(sorted(unknown))}")
+        sys.exit(2)
+    if not shutil.which('kubectl'):
+        print('❌ kubectl no está instalado o no está en el PATH')
+        sys.exit(1)
+    asyncio.run(main(args))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Sondeo concurrente de health, liveness y readiness
+E-Commerce Microservices Platform
+
+Consulta a la vez <context_path>/actuator/health, /health/liveness y
+/health/readiness de cada servicio del registro (puertos y context path de
+SERVICES) sobre conexiones keep-alive reutilizadas (async_http.py), con
+reintentos con backoff, timeout por intento y un plazo total. Un chequeo
+completo tarda aproximadamente un round-trip del servicio más lento.
+
+Cada endpoint acumula un histograma de latencias (buckets en ms, como los
+de Prometheus); con --rounds se repite el sondeo para que los percentiles
+tengan sentido y con --write se guarda en reports/health-probe.yaml.
+
+Los servicios se alcanzan por los port-forwards locales (scripts/
+port-forward-all.sh, o --port-offset si se mapearon a otro rango) o, desde
+dentro del clúster, con --host '{service}.{namespace}.svc.cluster.local'.
+
+Uso:
+  python3 probe_health.py
+  python3 probe_health.py user-service order-service --rounds 20 --write
+  python3 probe_health.py --port-offset 10000 --retries 5 --deadline 60
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import sys
+import time
+
+import yaml
+
+from async_http import ConnectionPool, ProtocolError
+from service_registry import BASE_DIR, SERVICES
+
+PROBE_FILE = BASE_DIR / 'reports' / 'health-probe.yaml'
+ENDPOINTS = {
+    'health': '/actuator/health',
+    'liveness': '/actuator/health/liveness',
+    'readiness': '/actuator/health/readiness',
+}
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)   # ms; el último bucket es +Inf
+
+
+class Histogram:
+    """Latencias de un endpoint en buckets acumulables"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples = []
+
+    def observe(self, milliseconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, milliseconds)] += 1
+        self.samples.append(milliseconds)
+
+    def percentile(self, percent):
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)] if ordered else None
+
+    def summary(self):
+        buckets = [{'le': bound, 'count': count} for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), self.counts)]
+        return {
+            'count': len(self.samples),
+            'p50': round(self.percentile(50), 1),
+            'p95': round(self.percentile(95), 1),
+            'max': round(max(self.samples), 1),
+            'buckets': buckets,
+        }
+
+
+def targets(services, host, namespace, port_offset):
+    """[(servicio, endpoint, host, puerto, ruta)] de los servicios pedidos"""
+    return [(service_name, endpoint,
+             host.format(service=service_name, namespace=namespace),
+             SERVICES[service_name]['port'] + port_offset,
+             SERVICES[service_name].get('context_path', '').rstrip('/') + path)
+            for service_name in services for endpoint, path in ENDPOINTS.items()]
+
+
+def health_status(response):
+    """Estado de Spring Boot del cuerpo JSON (o el código HTTP si no es JSON)"""
+    try:
+        return json.loads(response.body).get('status') or str(response.status)
+    except (ValueError, AttributeError):
+        return str(response.status)
+
+
+async def probe(pool, target, histogram, retries, timeout, backoff, deadline):
+    """{'ok', 'status', 'attempts', 'error'} del endpoint; reintenta hasta estar UP o agotar el plazo"""
+    _, _, host, port, path = target
+    loop = asyncio.get_running_loop()
+    result = {'ok': False, 'status': None, 'attempts': 0, 'error': None}
+    for attempt in range(retries + 1):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            result['error'] = result['error'] or 'plazo agotado'
+            break
+        result['attempts'] += 1
+        started = time.perf_counter()
+        try:
+            response = await pool.request(host, port, 'GET', path, [('Accept', 'application/json')],
+                                          timeout=min(timeout, remaining))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProtocolError, ValueError) as error:
+            result['error'] = str(error) or type(error).__name__
+        else:
+            histogram.observe((time.perf_counter() - started) * 1000)
+            result['status'] = health_status(response)
+            result['error'] = None
+            if response.status == 200 and result['status'] == 'UP':
+                result['ok'] = True
+                break
+        if attempt < retries:
+            await asyncio.sleep(min(backoff * 2 ** attempt, max(0.0, deadline - loop.time())))
+    return result
+
+
+async def run(probe_targets, rounds, retries, timeout, backoff, deadline, connections):
+    """(resultados de la última ronda, histogramas, conexiones abiertas)"""
+    pool = ConnectionPool(limit=connections)
+    histograms = {target: Histogram() for target in probe_targets}
+    results = {}
+    try:
+        loop = asyncio.get_running_loop()
+        for _ in range(rounds):
+            ends = loop.time() + deadline
+            outcomes = await asyncio.gather(*(probe(pool, target, histograms[target], retries, timeout, backoff, ends)
+                                              for target in probe_targets))
+            results = dict(zip(probe_targets, outcomes))
+    finally:
+        await pool.close()
+    return results, histograms, pool.opened
+
+
+def report(results, histograms):
+    """{servicio: {endpoint: resumen}} para reports/health-probe.yaml"""
+    data = {}
+    for target, result in results.items():
+        service_name, endpoint = target[:2]
+        entry = {'status': result['status'] or result['error'], 'ok': result['ok']}
+        if histograms[target].samples:
+            entry.update(histograms[target].summary())
+        data.setdefault(service_name, {})[endpoint] = entry
+    return data
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Health, liveness y readiness de todos los servicios en paralelo')
+    parser.add_argument('services', nargs='*', default=list(SERVICES), help='servicios (default: todos)')
+    parser.add_argument('--host', default='127.0.0.1', help='host o plantilla con {service} y {namespace}')
+    parser.add_argument('--namespace', default='dev', help='namespace para la plantilla de --host')
+    parser.add_argument('--port-offset', type=int, default=0, help='desplazamiento de los puertos locales')
+    parser.add_argument('--rounds', type=int, default=1, help='rondas de sondeo (para los histogramas)')
+    parser.add_argument('--retries', type=int, default=2, help='reintentos por endpoint hasta estar UP')
+    parser.add_argument('--timeout', type=float, default=2.0, help='segundos por intento')
+    parser.add_argument('--backoff', type=float, default=0.2, help='espera inicial entre reintentos (se duplica)')
+    parser.add_argument('--deadline', type=float, default=10.0, help='segundos máximos por ronda')
+    parser.add_argument('--connections', type=int, default=4, help='conexiones máximas por servicio')
+    parser.add_argument('--write', action='store_true', help=f'guardar en {PROBE_FILE.relative_to(BASE_DIR)}')
+    args = parser.parse_args()
+
+    unknown = set(args.services) - set(SERVICES)
+    if unknown:
+        print(f"❌ Servicios desconocidos: {', '.join(sorted(unknown))}")
+        sys.exit(2)
+
+    probe_targets = targets(args.services, args.host, args.namespace, args.port_offset)
+    started = time.perf_counter()
+    results, histograms, opened = asyncio.run(run(probe_targets, args.rounds, args.retries, args.timeout,
+                                                  args.backoff, args.deadline, args.connections))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f'🩺 {len(probe_targets)} endpoints de {len(args.services)} servicios, {args.rounds} ronda(s) '
+          f'en {elapsed:.0f} ms con {opened} conexiones')
+    width = max(len(target[4]) for target in probe_targets)
+    for target, result in results.items():
+        service_name, _, host, port, path = target
+        histogram = histograms[target]
+        latency = (f'p50 {histogram.percentile(50):6.1f} ms  p95 {histogram.percentile(95):6.1f} ms'
+                   if histogram.samples else '')
+        status = result['status'] or result['error']
+        retried = f"  ({result['attempts']} intentos)" if result['attempts'] > 1 else ''
+        print(f"  {'✅' if result['ok'] else '❌'} {service_name:<20} {path:<{width}}  {status:<14} {latency}{retried}")
+
+    if args.write:
+        PROBE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(PROBE_FILE, 'w') as f:
+            yaml.dump(report(results, histograms), f, default_flow_style=False, sort_keys=True)
+        print(f'\n✅ Histogramas guardados en {PROBE_FILE}')
+
+    failed = sum(not result['ok'] for result in results.values())
+    if failed:
+        print(f'\n❌ {failed} endpoints no están UP')
+        sys.exit(1)
+    print('\n✅ Todos los endpoints están UP')
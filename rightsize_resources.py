@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Right-sizing de requests/limits a partir de métricas exportadas
+E-Commerce Microservices Platform
+
+Lee exportaciones offline de Prometheus (JSON de /api/v1/query o
+/api/v1/query_range, o CSV timestamp,metric,value,<labels...>) con:
+
+  - container_cpu_usage_seconds_total (contador; se convierte a cores) o
+    una serie ya en cores llamada container_cpu_usage; rate() quita
+    __name__ y sus series se ignoran (se informan), así que hay que
+    nombrarla: label_replace(rate(container_cpu_usage_seconds_total[1m]),
+    "__name__", "container_cpu_usage", "", "")
+  - container_memory_working_set_bytes y/o jvm_memory_used_bytes
+    (suma de áreas por pod; se le suma un margen para memoria nativa)
+  - container_cpu_cfs_throttled_periods_total y container_cpu_cfs_periods_total
+
+Las series de cAdvisor (container_*) se toman por pod y contenedor, solo
+del contenedor del servicio: se descartan container="" (agregado del pod),
+"POD" (contenedor pause) y los sidecars.
+
+y calcula por servicio:
+  - CPU request = p90 de uso por pod, limit = p99 × 1.5 (× 1.5 extra si hubo
+    más de un 5% de periodos con throttling)
+  - memoria request = p99, limit = máximo × 1.2
+  - objetivos de HPA: CPU = mediana/request (50-85%) y memoria por encima del
+    uso máximo de la JVM, para que el heap (que no baja al escalar) no
+    dispare réplicas
+
+El resultado se guarda en reports/resource-recommendations.yaml, que
+generate_k8s_configs.py (Deployments) y generate_network_security_configs.py
+(HPA) usan en lugar de los valores fijos.
+
+Consultas sugeridas para exportar (ventana de la prueba de carga):
+  container_cpu_usage_seconds_total{namespace="dev",container!=""}
+  container_memory_working_set_bytes{namespace="dev",container!=""}
+  jvm_memory_used_bytes{namespace="dev"}
+  container_cpu_cfs_throttled_periods_total{namespace="dev"}
+  container_cpu_cfs_periods_total{namespace="dev"}
+
+Uso:
+  python3 rightsize_resources.py exports/*.json --write
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+
+import yaml
+
+from generate_k8s_configs import RESOURCES_FILE
+from service_registry import BASE_DIR, SERVICES
+
+CPU_METRICS = ('container_cpu_usage_seconds_total', 'container_cpu_usage')
+WORKING_SET = 'container_memory_working_set_bytes'
+JVM_MEMORY = 'jvm_memory_used_bytes'
+THROTTLED = 'container_cpu_cfs_throttled_periods_total'
+PERIODS = 'container_cpu_cfs_periods_total'
+
+# Memoria fuera de jvm_memory_used_bytes (stacks de hilos, buffers directos, GC)
+JVM_NATIVE_OVERHEAD = 1.25
+THROTTLING_THRESHOLD = 0.05
+MIN_CPU_MILLICORES = 50
+MIN_MEMORY_MIB = 128
+LABEL_KEYS = ('container', 'application', 'app', 'service', 'job')
+
+
+def iter_samples(path):
+    """(métrica, etiquetas, timestamp, valor) de una exportación JSON o CSV de Prometheus"""
+    if str(path).endswith('.csv'):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                name = row.pop('metric', None) or row.pop('__name__', '')
+                timestamp, value = float(row.pop('timestamp')), float(row.pop('value'))
+                yield name, row, timestamp, value
+        return
+    with open(path) as f:
+        document = json.load(f)
+    for series in document.get('data', {}).get('result', []):
+        labels = dict(series.get('metric', {}))
+        name = labels.pop('__name__', '')
+        points = series.get('values') or ([series['value']] if 'value' in series else [])
+        for timestamp, value in points:
+            yield name, labels, float(timestamp), float(value)
+
+
+def service_of(labels):
+    """Servicio del registro al que pertenece una serie (contenedor, tag application o prefijo del pod)"""
+    for key in LABEL_KEYS:
+        value = (labels.get(key) or '').lower()
+        if value in SERVICES:
+            return value
+    pod = labels.get('pod', '')
+    return next((name for name in SERVICES if pod.startswith(f'{name}-')), None)
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+def collect(paths):
+    """
+    (muestras por servicio {'cpu': [cores], 'memory': [bytes], 'throttled': x,
+    'periods': y}, número de series sin nombre de métrica ignoradas)
+    """
+    counters = {}   # (métrica, servicio, (pod, contenedor)) -> [(ts, valor)]
+    memory = {}     # (origen, servicio, (pod, contenedor), ts) -> bytes
+    gauges_cpu = {}
+    unnamed = set()
+    for path in paths:
+        for name, labels, timestamp, value in iter_samples(path):
+            if not name:
+                unnamed.add((str(path), tuple(sorted(labels.items()))))
+                continue
+            service = service_of(labels)
+            if service is None or math.isnan(value):
+                continue
+            container = labels.get('container')
+            if name.startswith('container_') and container is not None and container != service:
+                continue   # agregado del pod (""), contenedor pause ("POD") o sidecar
+            series = (labels.get('pod') or labels.get('instance', ''), container or '')
+            if name in (CPU_METRICS[0], THROTTLED, PERIODS):
+                counters.setdefault((name, service, series), []).append((timestamp, value))
+            elif name in CPU_METRICS:
+                gauges_cpu.setdefault(service, []).append(value)
+            elif name in (WORKING_SET, JVM_MEMORY):
+                key = (name, service, series, timestamp)
+                memory[key] = memory.get(key, 0.0) + value
+
+    samples = {}
+    for service, values in gauges_cpu.items():
+        samples.setdefault(service, {'cpu': [], 'memory': [], 'throttled': 0.0, 'periods': 0.0})['cpu'].extend(values)
+    for (name, service, _), points in counters.items():
+        entry = samples.setdefault(service, {'cpu': [], 'memory': [], 'throttled': 0.0, 'periods': 0.0})
+        points.sort()
+        deltas = [(t2 - t1, v2 - v1) for (t1, v1), (t2, v2) in zip(points, points[1:]) if t2 > t1 and v2 >= v1]
+        if name == CPU_METRICS[0]:
+            entry['cpu'].extend(dv / dt for dt, dv in deltas)
+        else:
+            entry['throttled' if name == THROTTLED else 'periods'] += sum(dv for _, dv in deltas)
+
+    # El working set del contenedor es la medida directa; jvm_memory_used_bytes solo si no hay otra
+    with_working_set = {service for name, service, _, _ in memory if name == WORKING_SET}
+    for (name, service, _, _), value in memory.items():
+        entry = samples.setdefault(service, {'cpu': [], 'memory': [], 'throttled': 0.0, 'periods': 0.0})
+        if name == WORKING_SET:
+            entry['memory'].append(value)
+        elif service not in with_working_set:
+            entry['memory'].append(value * JVM_NATIVE_OVERHEAD)
+    return samples, len(unnamed)
+
+
+def _cpu(cores):
+    return f'{max(MIN_CPU_MILLICORES, math.ceil(cores * 100) * 10)}m'
+
+
+def _memory(size):
+    return f'{max(MIN_MEMORY_MIB, math.ceil(size / 2 ** 20 / 16) * 16)}Mi'
+
+
+def recommend(samples):
+    """requests/limits y objetivos de HPA por servicio"""
+    recommendations = {}
+    for service, entry in sorted(samples.items()):
+        if not entry['cpu'] or not entry['memory']:
+            continue
+        throttled = entry['throttled'] / entry['periods'] if entry['periods'] else 0.0
+        cpu_request = percentile(entry['cpu'], 90)
+        cpu_limit = percentile(entry['cpu'], 99) * 1.5 * (1.5 if throttled > THROTTLING_THRESHOLD else 1.0)
+        memory_request = percentile(entry['memory'], 99)
+        memory_limit = max(entry['memory']) * 1.2
+
+        requests = {'cpu': _cpu(cpu_request), 'memory': _memory(memory_request)}
+        request_cores = int(requests['cpu'][:-1]) / 1000
+        # Al menos el doble del request: margen para JIT/GC y picos de arranque
+        limits = {'cpu': _cpu(max(cpu_limit, request_cores * 2)), 'memory': _memory(memory_limit)}
+        request_bytes = int(requests['memory'][:-2]) * 2 ** 20
+        recommendations[service] = {
+            'requests': requests,
+            'limits': limits,
+            'hpa': {
+                'cpu': min(85, max(50, round(100 * percentile(entry['cpu'], 50) / request_cores))),
+                'memory': min(150, math.ceil(100 * max(entry['memory']) / request_bytes) + 5),
+            },
+            'throttledRatio': round(throttled, 4),
+            'samples': len(entry['cpu']),
+        }
+    return recommendations
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Right-sizing de recursos desde métricas exportadas de Prometheus')
+    parser.add_argument('exports', nargs='+', help='exportaciones .json (API de Prometheus) o .csv')
+    parser.add_argument('--write', action='store_true', help=f'guardar en {RESOURCES_FILE.relative_to(BASE_DIR)}')
+    args = parser.parse_args()
+
+    samples, unnamed = collect(args.exports)
+    if unnamed:
+        print(f'⚠️  {unnamed} series sin __name__ ignoradas (resultado de rate()/sum()); '
+              'nombrarlas con label_replace(..., "__name__", "<métrica>", "", "")')
+    recommendations = recommend(samples)
+    if not recommendations:
+        print('❌ No hay muestras de CPU y memoria asociables a servicios del registro')
+        sys.exit(1)
+
+    print('📏 Recursos recomendados:')
+    for service, item in recommendations.items():
+        warning = '  ⚠️  throttling' if item['throttledRatio'] > THROTTLING_THRESHOLD else ''
+        print(f"  - {service}: requests {item['requests']['cpu']}/{item['requests']['memory']}, "
+              f"limits {item['limits']['cpu']}/{item['limits']['memory']}, "
+              f"HPA cpu {item['hpa']['cpu']}% mem {item['hpa']['memory']}%{warning}")
+    missing = sorted(set(SERVICES) - set(recommendations))
+    if missing:
+        print(f"  ⚠️  Sin datos (se mantienen los valores por defecto): {', '.join(missing)}")
+
+    if args.write:
+        RESOURCES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESOURCES_FILE, 'w') as f:
+            yaml.dump(recommendations, f, default_flow_style=False, sort_keys=True)
+        print(f'\n✅ Recomendaciones guardadas en {RESOURCES_FILE}')
@@ -4,11 +4,21 @@
 
 set -e
 
-BASE_DIR="/home/user/plataformas-ii/ecommerce-microservice-backend-app"
+BASE_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 cd "$BASE_DIR"
 
 NAMESPACE=${1:-dev}
 
+# Manifiestos del entorno (generate_manifests.py): dev en k8s/, el resto en k8s/environments/<ns>/
+K8S_DIR="k8s"
+if [ "$NAMESPACE" != "dev" ]; then
+    K8S_DIR="k8s/environments/$NAMESPACE"
+fi
+if [ ! -d "$K8S_DIR" ]; then
+    echo "❌ No existe $K8S_DIR; generar con: python3 generate_manifests.py --env $NAMESPACE"
+    exit 1
+fi
+
 echo "🚀 Desplegando E-Commerce Microservices en namespace: $NAMESPACE"
 echo "================================================================"
 
@@ -23,37 +33,43 @@ kubectl apply -f k8s/storage/storage-class.yaml
 # 3. PostgreSQL
 echo "🗄️  Desplegando PostgreSQL..."
 kubectl apply -f k8s/databases/postgres-secret.yaml
-kubectl apply -f k8s/databases/postgres-init-scripts.yaml
-kubectl apply -f k8s/databases/postgres-statefulset.yaml
+kubectl apply -f $K8S_DIR/databases/postgres-init-scripts.yaml
+kubectl apply -f $K8S_DIR/databases/postgres-statefulset.yaml
 
 echo "⏳ Esperando a que PostgreSQL esté listo..."
 kubectl wait --for=condition=ready pod -l app=postgres -n $NAMESPACE --timeout=300s || true
 
+# PgBouncer (qa/prod por defecto; ver connection_budget.py)
+if [ -f $K8S_DIR/databases/pgbouncer.yaml ]; then
+    echo "🔀 Desplegando PgBouncer..."
+    kubectl apply -f $K8S_DIR/databases/pgbouncer.yaml
+fi
+
 # 4. ConfigMaps y Secrets
 echo "⚙️  Aplicando ConfigMaps..."
-kubectl apply -f k8s/config/
+kubectl apply -f $K8S_DIR/config/
 
 echo "🔐 Aplicando Secrets..."
-kubectl apply -f k8s/secrets/
+kubectl apply -f $K8S_DIR/secrets/
 
 # 5. RBAC
 echo "🔒 Aplicando RBAC..."
-kubectl apply -f k8s/rbac/
+kubectl apply -f $K8S_DIR/rbac/
 
 # 6. Network Policies
 echo "🌐 Aplicando Network Policies..."
-kubectl apply -f k8s/network-policies/
+kubectl apply -f $K8S_DIR/network-policies/
 
 # 7. Service Discovery
 echo "🔍 Desplegando Service Discovery..."
-kubectl apply -f k8s/services/service_discovery/deployment.yaml
+kubectl apply -f $K8S_DIR/services/service_discovery/deployment.yaml
 
 echo "⏳ Esperando a que Service Discovery esté listo..."
 sleep 10
 
 # 8. Cloud Config Server
 echo "📝 Desplegando Cloud Config Server..."
-kubectl apply -f k8s/services/cloud_config_server/deployment.yaml
+kubectl apply -f $K8S_DIR/services/cloud_config_server/deployment.yaml
 
 sleep 5
 
@@ -61,24 +77,38 @@ sleep 5
 echo "🏢 Desplegando servicios de negocio..."
 for service in user product favourite order shipping payment; do
     echo "  📦 Desplegando ${service}-service..."
-    kubectl apply -f k8s/services/${service}_service/deployment.yaml
+    kubectl apply -f $K8S_DIR/services/${service}_service/deployment.yaml
 done
 
 # 10. API Gateway
 echo "🚪 Desplegando API Gateway..."
-kubectl apply -f k8s/services/api_gateway/deployment.yaml
+kubectl apply -f $K8S_DIR/services/api_gateway/deployment.yaml
 
 # 11. Proxy Client
 echo "🖥️  Desplegando Proxy Client..."
-kubectl apply -f k8s/services/proxy_client/deployment.yaml
+kubectl apply -f $K8S_DIR/services/proxy_client/deployment.yaml
 
 # 12. Ingress
 echo "🌍 Aplicando Ingress..."
-kubectl apply -f k8s/ingress/ingress.yaml
-
-# 13. HPA
-echo "📊 Aplicando HPA..."
-kubectl apply -f k8s/autoscaling/
+kubectl apply -f $K8S_DIR/ingress/ingress.yaml
+
+# 13. Autoscaling (ScaledObjects de KEDA; sin KEDA, los HPA nativos de autoscaling/hpa-fallback)
+echo "📊 Aplicando autoscaling..."
+if kubectl get crd scaledobjects.keda.sh &> /dev/null; then
+    # Los HPA de respaldo de un despliegue anterior sin KEDA pelearían con los de KEDA
+    kubectl delete -f $K8S_DIR/autoscaling/hpa-fallback/ --ignore-not-found
+    kubectl apply -f $K8S_DIR/autoscaling/
+else
+    echo "⚠️  KEDA no está instalado (./keda-install.sh): se aplican HPA nativos (CPU/memoria) en lugar de los ScaledObjects"
+    for manifest in $K8S_DIR/autoscaling/hpa-*.yaml; do
+        [ -e "$manifest" ] && kubectl apply -f "$manifest"
+    done
+    if ! ls $K8S_DIR/autoscaling/hpa-fallback/*.yaml &> /dev/null; then
+        echo "❌ No hay HPA de respaldo en $K8S_DIR/autoscaling/hpa-fallback; generar con: python3 generate_manifests.py"
+        exit 1
+    fi
+    kubectl apply -f $K8S_DIR/autoscaling/hpa-fallback/
+fi
 
 echo ""
 echo "✅ Despliegue completado!"
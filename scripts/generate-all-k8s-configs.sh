@@ -4,5 +4,8 @@
 
 set -e
 
-BASE_DIR=" /home/user/plataformas-ii/ecommerce-microservice-backend-app\
-cd
+BASE_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+cd "$BASE_DIR"
+
+echo "🚀 Generando todas las configuraciones desde el registro de servicios..."
+python3 generate_manifests.py "$@"
@@ -31,6 +31,10 @@ echo "📊 Autoscaling Status:"
 kubectl get hpa -n $NAMESPACE --no-headers 2>/dev/null | awk '{
     print "  - "$1": "$3"/"$4" réplicas (CPU: "$5")"
 }' || echo "  No HPAs configurados"
+kubectl get scaledobjects -n $NAMESPACE --no-headers 2>/dev/null \
+    -o custom-columns=NAME:.metadata.name,TARGET:.spec.scaleTargetRef.name,READY:.status.conditions[0].status | awk '{
+    print "  - "$1" → "$2" (KEDA, ready: "$3")"
+}'
 
 echo ""
 
@@ -2,11 +2,31 @@
 
 # Script para ejecutar pruebas de carga con Locust
 # Uso: ./scripts/run-load-test.sh [host] [users] [spawn-rate] [duration]
+#
+# Variables de entorno opcionales:
+#   MODE=standalone|distributed  distributed: master + WORKERS workers locales
+#   WORKERS=<n>                  workers en modo distribuido (default: núcleos)
+#   USER_CLASSES="<clases>"      clases de usuario del locustfile a ejecutar
+#   ARCHIVE=0                    no agregar la ejecución a reports/load-tests.db
+#   VERSION=<versión>            versión probada, registrada en el archivo histórico
+#   LOAD_SHAPE=step|spike|soak|diurnal
+#                                modelo abierto: el perfil fija la tasa de llegada
+#                                (users, spawn-rate y duration se ignoran; ver
+#                                tests/load_shapes.py para los parámetros SHAPE_*)
 
 HOST=${1:-"http://localhost:8080"}
 USERS=${2:-10}
 SPAWN_RATE=${3:-2}
 DURATION=${4:-"5m"}
+MODE=${MODE:-standalone}
+export LOAD_SHAPE=${LOAD_SHAPE:-}
+WORKERS=${WORKERS:-$(nproc 2>/dev/null || getconf _NPROCESSORS_ONLN)}
+
+if [ "$MODE" = "distributed" ]; then
+    USER_CLASSES=${USER_CLASSES:-"FastEcommerceUser"}
+else
+    USER_CLASSES=${USER_CLASSES:-"EcommerceUser CheckoutJourneyUser"}
+fi
 
 echo "=========================================="
 echo "PRUEBA DE CARGA - E-COMMERCE"
@@ -16,12 +36,20 @@ echo "Host: $HOST"
 echo "Usuarios: $USERS"
 echo "Spawn Rate: $SPAWN_RATE usuarios/segundo"
 echo "Duración: $DURATION"
+echo "Modo: $MODE"
+echo "Clases de usuario: $USER_CLASSES"
+if [ "$MODE" = "distributed" ]; then
+    echo "Workers: $WORKERS"
+fi
+if [ -n "$LOAD_SHAPE" ]; then
+    echo "Perfil de carga: $LOAD_SHAPE (tasa de llegada)"
+fi
 echo ""
 
 # Verificar que Locust esté instalado
 if ! command -v locust &> /dev/null; then
     echo "❌ Locust no está instalado"
-    echo "Instalar con: pip install locust"
+    echo "Instalar con: pip install locust hdrhistogram"
     exit 1
 fi
 
@@ -31,6 +59,8 @@ if [ ! -f "tests/locustfile.py" ]; then
     exit 1
 fi
 
+mkdir -p reports
+
 echo "🚀 Iniciando prueba de carga..."
 echo ""
 echo "Abre tu navegador en: http://localhost:8089"
@@ -38,17 +68,54 @@ echo ""
 echo "Presiona Ctrl+C para detener la prueba"
 echo ""
 
+WORKER_PIDS=()
+if [ "$MODE" = "distributed" ]; then
+    # Un worker por núcleo; el master agrega las estadísticas de todos
+    for i in $(seq 1 "$WORKERS"); do
+        locust -f tests/locustfile.py \
+            --worker \
+            --master-host=127.0.0.1 \
+            $USER_CLASSES > "reports/locust-worker-$i.log" 2>&1 &
+        WORKER_PIDS+=($!)
+    done
+    trap 'kill "${WORKER_PIDS[@]}" 2>/dev/null' EXIT
+    MODE_ARGS=(--master --expect-workers="$WORKERS")
+else
+    MODE_ARGS=()
+fi
+
+if [ -n "$LOAD_SHAPE" ]; then
+    # El perfil controla usuarios, spawn rate y duración
+    LOAD_ARGS=()
+else
+    LOAD_ARGS=(--users="$USERS" --spawn-rate="$SPAWN_RATE" --run-time="$DURATION")
+fi
+
 # Ejecutar Locust
 locust -f tests/locustfile.py \
+    "${MODE_ARGS[@]}" \
     --host="$HOST" \
-    --users="$USERS" \
-    --spawn-rate="$SPAWN_RATE" \
-    --run-time="$DURATION" \
+    "${LOAD_ARGS[@]}" \
     --headless \
     --html=reports/locust-report.html \
-    --csv=reports/locust-stats
+    --csv=reports/locust-stats \
+    --csv-full-history \
+    $USER_CLASSES
+
+if [ ${#WORKER_PIDS[@]} -gt 0 ]; then
+    wait "${WORKER_PIDS[@]}" 2>/dev/null
+fi
 
 echo ""
 echo "✅ Prueba de carga completada"
 echo "📊 Reporte generado en: reports/locust-report.html"
+echo "🖥️  CPU del generador en: reports/locust-stats_generator.csv"
+echo "📐 Latencias HDR corregidas en: reports/locust-stats_hdr.csv"
+if [ -n "$LOAD_SHAPE" ]; then
+    echo "📈 Ofrecido vs logrado en: reports/locust-stats_shape.csv"
+fi
 
+# Archivar la ejecución antes de que la próxima sobrescriba los CSV
+if [ "${ARCHIVE:-1}" = "1" ] && [ -f reports/locust-stats_stats.csv ]; then
+    python3 archive_load_tests.py ingest reports/locust-stats ${VERSION:+--version "$VERSION"}
+fi
@@ -24,122 +24,65 @@ fi
 
 echo "🧪 Ejecutando smoke tests en namespace ${NAMESPACE}..."
 
-# Función para verificar health endpoint
-check_health() {
-    local SERVICE=$1
-    local PORT=${2:-8080}
-    local HEALTH_PATH=${3:-/actuator/health}
-    
-    echo "🔍 Verificando health de ${SERVICE}..."
-    
-    # Verificar que al menos un pod esté en estado Running
-    READY_PODS=$(kubectl get pods -l app="${SERVICE}" -n "${NAMESPACE}" -o jsonpath='{.items[?(@.status.phase=="Running")].metadata.name}' 2>/dev/null || echo "")
-    
-    if [ -z "$READY_PODS" ]; then
-        # Intentar esperar a que al menos un pod esté listo
-        kubectl wait --for=condition=ready pod \
-            -l app="${SERVICE}" \
-            -n "${NAMESPACE}" \
-            --timeout=30s 2>/dev/null || {
-            echo "❌ Pod de ${SERVICE} no está listo"
-            return 1
-        }
-    fi
-    
-    # Verificar health endpoint usando port-forward al servicio
-    # Usar un puerto local único basado en el puerto del servicio + offset
-    # Esto evita conflictos cuando múltiples servicios usan el mismo puerto
-    LOCAL_PORT=$((10000 + PORT))
-    
-    # Limpiar cualquier port-forward anterior en el mismo puerto
-    pkill -f "port-forward.*${LOCAL_PORT}" 2>/dev/null || true
-    sleep 1
-    
-    # Iniciar port-forward al servicio (más confiable que al pod)
-    kubectl port-forward -n "${NAMESPACE}" "svc/${SERVICE}" "${LOCAL_PORT}:${PORT}" > /dev/null 2>&1 &
-    PF_PID=$!
-    
-    # Esperar a que el port-forward esté listo
-    # Algunos servicios necesitan más tiempo para iniciar
-    sleep 8
-    
-    # Verificar health endpoint con múltiples intentos
-    HEALTH_CHECK_RESULT=1
-    for i in {1..5}; do
-        if curl -sf --max-time 5 "http://localhost:${LOCAL_PORT}${HEALTH_PATH}" > /dev/null 2>&1; then
-            HEALTH_CHECK_RESULT=0
-            break
-        fi
-        sleep 2
-    done
-    
-    # Limpiar port-forward
-    kill $PF_PID 2>/dev/null || true
-    wait $PF_PID 2>/dev/null || true
-    sleep 1
-    
-    if [ $HEALTH_CHECK_RESULT -eq 0 ]; then
-        echo "✅ Health check de ${SERVICE} exitoso"
-        return 0
-    else
-        echo "❌ Health check de ${SERVICE} falló"
-        return 1
-    fi
-}
-
-# Lista de servicios a verificar con sus context paths
-# Formato: "service-name:port:context-path"
-# Si no se especifica context-path, se usa /actuator/health
+# Lista de servicios a verificar
+# Formato: "service-name:port" (los context paths salen de service_registry.py)
 SERVICES=(
-    "service-discovery:8761:/actuator/health"
-    "cloud-config-server:8888:/actuator/health"
-    "api-gateway:8080:/actuator/health"
-    "user-service:8081:/user-service/actuator/health"
-    "product-service:8082:/product-service/actuator/health"
-    "favourite-service:8083:/favourite-service/actuator/health"
-    "order-service:8084:/order-service/actuator/health"
-    "shipping-service:8085:/shipping-service/actuator/health"
-    "payment-service:8086:/payment-service/actuator/health"
+    "service-discovery:8761"
+    "cloud-config-server:8888"
+    "api-gateway:8080"
+    "user-service:8081"
+    "product-service:8082"
+    "favourite-service:8083"
+    "order-service:8084"
+    "shipping-service:8085"
+    "payment-service:8086"
 )
+SERVICE_NAMES=("${SERVICES[@]%%:*}")
+
+# Puertos locales = puerto del servicio + offset, para no chocar con otros port-forwards
+PORT_OFFSET=10000
+ROOT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 
 FAILED_TESTS=0
 
-for SERVICE_PORT_PATH in "${SERVICES[@]}"; do
-    SERVICE=$(echo "$SERVICE_PORT_PATH" | cut -d: -f1)
-    PORT=$(echo "$SERVICE_PORT_PATH" | cut -d: -f2)
-    HEALTH_PATH=$(echo "$SERVICE_PORT_PATH" | cut -d: -f3)
-    # Si no se especificó HEALTH_PATH, usar el default
-    HEALTH_PATH=${HEALTH_PATH:-/actuator/health}
-    
-    if ! check_health "$SERVICE" "$PORT" "$HEALTH_PATH"; then
-        FAILED_TESTS=$((FAILED_TESTS + 1))
-    fi
+# Esperar a todos los pods a la vez en lugar de servicio por servicio
+echo "⏳ Esperando a que los pods estén listos..."
+SELECTOR="app in ($(IFS=,; echo "${SERVICE_NAMES[*]}"))"
+if ! kubectl wait --for=condition=ready pod -l "${SELECTOR}" -n "${NAMESPACE}" --timeout=60s > /dev/null 2>&1; then
+    echo "❌ Hay pods que no están listos"
+    kubectl get pods -l "${SELECTOR}" -n "${NAMESPACE}" --no-headers 2>/dev/null | awk '{split($2, r, "/"); if (r[1] != r[2]) print "  - "$1" ("$2", "$3")"}'
+    FAILED_TESTS=$((FAILED_TESTS + 1))
+fi
+
+# Abrir todos los port-forwards simultáneamente
+PF_PIDS=()
+for SERVICE_PORT in "${SERVICES[@]}"; do
+    SERVICE=${SERVICE_PORT%%:*}
+    PORT=${SERVICE_PORT##*:}
+    pkill -f "port-forward.*$((PORT_OFFSET + PORT)):" 2>/dev/null || true
+    kubectl port-forward -n "${NAMESPACE}" "svc/${SERVICE}" "$((PORT_OFFSET + PORT)):${PORT}" > /dev/null 2>&1 &
+    PF_PIDS+=($!)
 done
+trap 'kill "${PF_PIDS[@]}" 2>/dev/null || true' EXIT
 
-# Verificar registro en Eureka
+# Un único sondeo concurrente de health, liveness y readiness; los reintentos
+# con backoff cubren el tiempo que tardan los túneles en aceptar conexiones
+echo ""
+echo "🔍 Verificando health, liveness y readiness..."
+if ! python3 "${ROOT_DIR}/probe_health.py" "${SERVICE_NAMES[@]}" \
+        --port-offset "${PORT_OFFSET}" --retries 6 --backoff 1 --timeout 5 --deadline 60; then
+    FAILED_TESTS=$((FAILED_TESTS + 1))
+fi
+
+# Verificar registro en Eureka (por el port-forward ya abierto)
 echo ""
 echo "🔍 Verificando registro en Eureka..."
-EUREKA_POD=$(kubectl get pod -l app=service-discovery -n "${NAMESPACE}" -o jsonpath='{.items[0].metadata.name}' 2>/dev/null || echo "")
-
-if [ -n "$EUREKA_POD" ]; then
-    # Port-forward temporal a Eureka
-    kubectl port-forward -n "${NAMESPACE}" "pod/${EUREKA_POD}" 8761:8761 > /dev/null 2>&1 &
-    PF_PID=$!
-    sleep 5
-    
-    # Verificar servicios registrados
-    REGISTERED_SERVICES=$(curl -s http://localhost:8761/eureka/apps 2>/dev/null | grep -o '<name>[^<]*</name>' | wc -l || echo "0")
-    
-    kill $PF_PID 2>/dev/null || true
-    
-    if [ "$REGISTERED_SERVICES" -gt "1" ]; then
-        echo "✅ Eureka tiene ${REGISTERED_SERVICES} servicios registrados"
-    else
-        echo "⚠️  Eureka tiene pocos servicios registrados (${REGISTERED_SERVICES})"
-        FAILED_TESTS=$((FAILED_TESTS + 1))
-    fi
+REGISTERED_SERVICES=$(curl -s --max-time 5 "http://localhost:$((PORT_OFFSET + 8761))/eureka/apps" 2>/dev/null | grep -o '<name>[^<]*</name>' | wc -l || echo "0")
+
+if [ "$REGISTERED_SERVICES" -gt "1" ]; then
+    echo "✅ Eureka tiene ${REGISTERED_SERVICES} servicios registrados"
 else
-    echo "⚠️  No se pudo verificar Eureka"
+    echo "⚠️  Eureka tiene pocos servicios registrados (${REGISTERED_SERVICES})"
     FAILED_TESTS=$((FAILED_TESTS + 1))
 fi
 
@@ -0,0 +1,179 @@
+"""
+Registro de servicios compartido por los generadores de manifiestos
+E-Commerce Microservices Platform
+
+Única fuente de la lista de servicios, puertos, réplicas y tiers. Los
+generadores (generate_*.py), el motor de generate_manifests.py y las
+herramientas de carga/capacidad importan SERVICES desde aquí.
+"""
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+K8S_DIR = BASE_DIR / 'k8s'
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+DOCKER_USER = 'ebasg42'
+VERSION = '1.0.0'
+
+# autoscale: el servicio escala en k8s/autoscaling (ScaledObject de KEDA; scaler: 'hpa' para un HPA nativo)
+# context_path: server.servlet.context-path de la aplicación (prefijo de /actuator)
+# probes: override de PROBES para el servicio (p. ej. {'boot_seconds': 120})
+# calls: servicios a los que llama (rutas del gateway, Feign y RestTemplate); Eureka, Config Server
+#   y postgres se suponen para todos los que los usan
+SERVICES = {
+    'service-discovery': {'port': 8761, 'replicas': 2, 'tier': 'infrastructure'},
+    'cloud-config-server': {'port': 8888, 'replicas': 1, 'tier': 'infrastructure'},
+    'api-gateway': {'port': 8080, 'replicas': 2, 'tier': 'infrastructure', 'autoscale': True,
+                    'calls': ['user-service', 'product-service', 'favourite-service', 'order-service',
+                              'shipping-service', 'payment-service', 'proxy-client']},
+    'user-service': {'port': 8081, 'replicas': 1, 'tier': 'business', 'db': 'userdb', 'autoscale': True,
+                     'context_path': '/user-service'},
+    'product-service': {'port': 8082, 'replicas': 2, 'tier': 'business', 'db': 'productdb', 'autoscale': True,
+                        'context_path': '/product-service'},
+    'favourite-service': {'port': 8083, 'replicas': 2, 'tier': 'business', 'db': 'favouritedb', 'autoscale': True,
+                          'context_path': '/favourite-service', 'calls': ['user-service', 'product-service']},
+    'order-service': {'port': 8084, 'replicas': 2, 'tier': 'business', 'db': 'orderdb', 'autoscale': True,
+                      'context_path': '/order-service', 'calls': ['user-service']},
+    'shipping-service': {'port': 8085, 'replicas': 2, 'tier': 'business', 'db': 'shippingdb', 'autoscale': True,
+                         'context_path': '/shipping-service', 'calls': ['order-service', 'product-service']},
+    'payment-service': {'port': 8086, 'replicas': 2, 'tier': 'business', 'db': 'paymentdb', 'autoscale': True,
+                        'context_path': '/payment-service', 'calls': ['order-service']},
+    'proxy-client': {'port': 4200, 'replicas': 1, 'tier': 'client', 'context_path': '/app',
+                     'calls': ['user-service', 'product-service', 'favourite-service', 'order-service',
+                               'shipping-service', 'payment-service']},
+}
+
+# Sondas. El startupProbe cubre el arranque con un umbral calculado del tiempo
+# de arranque medido (reports/boot-times.yaml de pods reales o, si no hay,
+# reports/jvm-startup.yaml); liveness y readiness solo empiezan cuando el
+# startupProbe pasa, así que sondean rápido y sin initialDelaySeconds.
+#   boot_seconds: arranque supuesto sin mediciones (servicios con y sin base de datos)
+#   boot_percentile/boot_margin: umbral = percentil de las muestras × margen
+PROBES = {
+    'boot_seconds': {'db': 90, 'default': 60},
+    'boot_percentile': 99,
+    'boot_margin': 1.5,
+    'startup': {'periodSeconds': 5, 'timeoutSeconds': 2},
+    'liveness': {'periodSeconds': 5, 'timeoutSeconds': 2, 'failureThreshold': 3},
+    'readiness': {'periodSeconds': 2, 'timeoutSeconds': 2, 'failureThreshold': 2},
+}
+
+# ScaledObjects de KEDA. KEDA crea y gestiona su propio HPA para el Deployment,
+# por eso a un servicio con ScaledObject no se le genera además un HPA nativo.
+#   rps_per_pod: umbral de RPS por pod si no hay perPodRps medido
+#     (reports/capacity-recommendations.yaml de capacity_model.py)
+#   p95_trigger: disparador adicional por latencia p95 (targetP95Ms medido o p95_ms);
+#     requiere percentiles-histogram de http.server.requests en Micrometer
+KEDA = {
+    'prometheus': 'http://prometheus-kube-prometheus-prometheus.monitoring.svc.cluster.local:9090',
+    'polling_interval': 15,
+    'cooldown_period': 300,
+    'rps_per_pod': 50,
+    'p95_trigger': False,
+    'p95_ms': 1000,
+}
+
+# Perfiles por entorno. dev conserva el comportamiento histórico (k8s/);
+# qa y prod se generan en k8s/environments/<entorno>/ con su namespace.
+#   jpa.ddl_auto: Flyway (db/migration) ya gestiona el esquema fuera de dev
+#   hikari: pool fijo en prod (minimum_idle == maximum_pool_size)
+#   pgbouncer: réplicas de PgBouncer por defecto (0: conexión directa a postgres); con
+#     maxReplicas × pool de los seis servicios, qa y prod no caben en max_connections
+#     sin él (connection_budget.py)
+#   jdbc: batching de Hibernate, fetch size y caché de sentencias del driver PostgreSQL
+#   tomcat: hilos y cola de aceptación del servidor embebido
+#   jvm_profile: perfil de JVM_PROFILES si no hay mediciones de arranque (reports/jvm-startup.yaml)
+#   non_peak_jvm: permitir perfiles con peak: False (opt-in explícito; dev mide el rendimiento sostenido)
+ENVIRONMENTS = {
+    'dev': {
+        'namespace': 'dev',
+        'k8s_dir': 'k8s',
+        'domain': 'ecommerce.local',
+        'jpa': {'show_sql': False, 'ddl_auto': 'update'},
+        'hikari': {'maximum_pool_size': 10, 'minimum_idle': 5},
+        'pgbouncer': 0,
+        'jdbc': None,
+        'tomcat': None,
+        'log_level': 'INFO',
+        'jvm_profile': 'baseline',
+        'non_peak_jvm': False,
+    },
+    'qa': {
+        'namespace': 'qa',
+        'k8s_dir': 'k8s/environments/qa',
+        'domain': 'qa.ecommerce.local',
+        'jpa': {'show_sql': False, 'ddl_auto': 'validate'},
+        'hikari': {'maximum_pool_size': 10, 'minimum_idle': 5},
+        'pgbouncer': 2,
+        'jdbc': {'batch_size': 25, 'fetch_size': 100, 'statement_cache_queries': 256, 'statement_cache_mib': 5},
+        'tomcat': {'max_threads': 100, 'min_spare': 10, 'accept_count': 100},
+        'log_level': 'INFO',
+        'jvm_profile': 'container-g1',
+        'non_peak_jvm': False,
+    },
+    'prod': {
+        'namespace': 'prod',
+        'k8s_dir': 'k8s/environments/prod',
+        'domain': 'prod.ecommerce.local',
+        'jpa': {'show_sql': False, 'ddl_auto': 'none'},
+        'hikari': {'maximum_pool_size': 20, 'minimum_idle': 20},
+        'pgbouncer': 2,
+        'jdbc': {'batch_size': 50, 'fetch_size': 200, 'statement_cache_queries': 512, 'statement_cache_mib': 16},
+        'tomcat': {'max_threads': 200, 'min_spare': 20, 'accept_count': 200},
+        'log_level': 'WARN',
+        'jvm_profile': 'container-g1',
+        'non_peak_jvm': False,
+    },
+}
+
+# Perfiles de JVM para JAVA_TOOL_OPTIONS (JDK 17 de eclipse-temurin). La heap
+# se dimensiona como porcentaje del límite de memoria del contenedor.
+# peak: False si sacrifica rendimiento sostenido por arranque (no apto para prod).
+# AppCDS: el archivo debe existir en la imagen en CDS_ARCHIVE (con -Xshare:auto,
+# si falta, la JVM arranca sin él); benchmark_jvm_startup.py lo entrena y mide
+# en un volumen, así que appcds solo es elegible con CDS_IN_IMAGE.
+CDS_ARCHIVE = '/app/cds/app.jsa'
+CDS_IN_IMAGE = False   # los Dockerfile de los servicios aún no generan CDS_ARCHIVE
+_CONTAINER_HEAP = ['-XX:InitialRAMPercentage=50.0', '-XX:MaxRAMPercentage=75.0', '-XX:+ExitOnOutOfMemoryError']
+JVM_PROFILES = {
+    'baseline': {'options': [], 'peak': True},
+    'container-g1': {'options': _CONTAINER_HEAP + ['-XX:+UseG1GC'], 'peak': True},
+    'container-serial': {'options': _CONTAINER_HEAP + ['-XX:+UseSerialGC', '-Xss512k'], 'peak': True},
+    'appcds': {'options': _CONTAINER_HEAP + ['-XX:+UseSerialGC', '-Xss512k',
+                                             f'-XX:SharedArchiveFile={CDS_ARCHIVE}', '-Xshare:auto'], 'peak': True,
+               'archive': True},
+    'fast-start': {'options': _CONTAINER_HEAP + ['-XX:+UseSerialGC', '-Xss512k', '-XX:TieredStopAtLevel=1'],
+                   'peak': False},
+}
+
+
+def jvm_profiles_for(env):
+    """
+    Perfiles candidatos de un entorno: los que mantienen el rendimiento pico
+    (el resto solo con non_peak_jvm) y appcds solo si la imagen trae el archivo
+    """
+    return [name for name, profile in JVM_PROFILES.items()
+            if (profile['peak'] or ENVIRONMENTS[env].get('non_peak_jvm'))
+            and (CDS_IN_IMAGE or not profile.get('archive'))]
+
+
+def probe_settings(service_name):
+    """PROBES con los overrides del servicio aplicados"""
+    settings = dict(PROBES)
+    settings.update(SERVICES[service_name].get('probes') or {})
+    return settings
+
+
+def services_where(**filters):
+    """Servicios cuya configuración coincide con todos los filtros (p. ej. tier='business')"""
+    return [name for name, config in SERVICES.items()
+            if all(config.get(key) == value for key, value in filters.items())]
+
+
+def environment_dir(env='dev'):
+    """Raíz relativa de los manifiestos de un entorno"""
+    return Path(ENVIRONMENTS[env]['k8s_dir'])
+
+
+def service_dir(service_name, env='dev'):
+    """Directorio de manifiestos del servicio (<k8s del entorno>/services/<servicio_con_guiones_bajos>)"""
+    return environment_dir(env) / 'services' / service_name.replace('-', '_')
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Servidor sustituto (stand-in) de los microservicios de negocio
+E-Commerce Microservices Platform
+
+Imita la superficie REST de user, product, favourite, order, payment y
+shipping service (más /app/api/authenticate y /actuator/health) sin
+Spring, Eureka ni Postgres, para ejecutar la suite de Locust, los health
+checks y las herramientas de análisis en una laptop.
+
+- Escucha en el puerto del api-gateway y en el de cada servicio (SERVICES);
+  todas las rutas llevan el context-path del servicio (/product-service/...)
+- Latencia, tasa de error y tamaño de respuesta configurables por ruta
+- GET /favourite-service/api/favourites emula el fan-out N+1 de
+  FavouriteServiceImpl: una llamada serial a user-service y otra a
+  product-service por cada favorito
+- --workers N levanta N procesos con SO_REUSEPORT (decenas de miles de RPS)
+
+Uso:
+  python3 service_standin.py
+  python3 service_standin.py --config standin.yaml --workers 4
+
+Configuración (YAML, todas las claves opcionales):
+  defaults:
+    latency: {dist: lognormal, median_ms: 5, sigma: 0.5}
+    error_rate: 0.0
+  services:
+    order-service: {latency: {dist: normal, mean_ms: 40, stddev_ms: 10}}
+  routes:
+    "GET /product-service/api/products": {items: 500, item_bytes: 256, error_rate: 0.01}
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import re
+import signal
+from datetime import datetime
+
+import yaml
+
+from service_registry import SERVICES
+
+DEFAULT_ROUTE = {
+    'latency': {'dist': 'lognormal', 'median_ms': 5, 'sigma': 0.5},
+    'error_rate': 0.0,
+    'error_status': 500,
+    'items': 20,
+    'item_bytes': 0,
+}
+
+WRITE_LATENCY = {'dist': 'lognormal', 'median_ms': 15, 'sigma': 0.5}
+HEALTH_LATENCY = {'dist': 'constant', 'ms': 0}
+
+# Formato de fechas de los DTOs (AppConstant.LOCAL_DATE_TIME_FORMAT)
+DATE_FORMAT = '%d-%m-%Y__%H:%M:%S:%f'
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def _now():
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+def _user(i):
+    return {'userId': i, 'firstName': f'User{i}', 'lastName': 'Standin', 'imageUrl': f'https://picsum.photos/id/{i}',
+            'email': f'user{i}@ecommerce.local', 'phone': f'+57{3000000000 + i}',
+            'credential': {'credentialId': i, 'username': f'user{i}', 'roleBasedAuthority': 'ROLE_USER', 'isEnabled': True}}
+
+
+def _address(i):
+    return {'addressId': i, 'fullAddress': f'Calle {i} # {i}-{i}', 'postalCode': f'{10000 + i}', 'city': 'Cali'}
+
+
+def _credential(i):
+    return {'credentialId': i, 'username': f'user{i}', 'roleBasedAuthority': 'ROLE_USER', 'isEnabled': True,
+            'isAccountNonExpired': True, 'isAccountNonLocked': True, 'isCredentialsNonExpired': True}
+
+
+def _category(i):
+    return {'categoryId': i, 'categoryTitle': f'Category {i}', 'imageUrl': None}
+
+
+def _product(i):
+    return {'productId': i, 'productTitle': f'Product {i}', 'imageUrl': f'https://picsum.photos/id/{i}',
+            'sku': f'SKU-{i:08d}', 'priceUnit': round(10 + (i * 7.3) % 990, 2), 'quantity': 50 + i % 100,
+            'category': _category(1 + i % 10)}
+
+
+def _favourite(i):
+    return {'userId': 1 + i % 100, 'productId': i, 'likeDate': _now()}
+
+
+def _cart(i):
+    return {'cartId': i, 'userId': 1 + i % 100}
+
+
+def _order(i):
+    return {'orderId': i, 'orderDate': _now(), 'orderDesc': f'Order {i}', 'orderFee': round(5 + (i * 3.1) % 500, 2),
+            'cart': _cart(i)}
+
+
+def _payment(i):
+    return {'paymentId': i, 'isPayed': True, 'paymentStatus': 'COMPLETED', 'order': {'orderId': i}}
+
+
+def _shipping(i):
+    return {'productId': i, 'orderId': i, 'orderedQuantity': 1 + i % 3}
+
+
+# servicio -> recurso -> (campo ID, fábrica de DTO)
+RESOURCES = {
+    'user-service': {'users': ('userId', _user), 'address': ('addressId', _address),
+                     'credentials': ('credentialId', _credential)},
+    'product-service': {'products': ('productId', _product), 'categories': ('categoryId', _category)},
+    'favourite-service': {'favourites': ('productId', _favourite)},
+    'order-service': {'carts': ('cartId', _cart), 'orders': ('orderId', _order)},
+    'payment-service': {'payments': ('paymentId', _payment)},
+    'shipping-service': {'shippings': ('orderId', _shipping)},
+}
+
+
+def sample_latency(latency):
+    """Latencia en segundos según la distribución configurada"""
+    dist = latency.get('dist', 'constant')
+    if dist == 'constant':
+        ms = latency.get('ms', 0)
+    elif dist == 'uniform':
+        ms = random.uniform(latency['min_ms'], latency['max_ms'])
+    elif dist == 'normal':
+        ms = max(0.0, random.gauss(latency['mean_ms'], latency['stddev_ms']))
+    elif dist == 'exponential':
+        ms = random.expovariate(1.0 / latency['mean_ms'])
+    elif dist == 'lognormal':
+        ms = random.lognormvariate(math.log(latency['median_ms']), latency.get('sigma', 0.5))
+    else:
+        raise ValueError(f'Distribución de latencia desconocida: {dist}')
+    return ms / 1000.0
+
+
+class Route:
+    """Ruta HTTP con su patrón, configuración y manejador"""
+
+    def __init__(self, method, pattern, handler, config):
+        self.method = method
+        self.pattern = pattern
+        self.regex = re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', pattern) + '$')
+        self.handler = handler
+        self.config = config
+        self.body = None
+
+    async def delay(self):
+        seconds = sample_latency(self.config['latency'])
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+class StandinApp:
+    """Tabla de rutas de los seis servicios de negocio"""
+
+    def __init__(self, config):
+        self.config = config or {}
+        self.routes = {}
+        self.counters = {}
+        self._build_routes()
+
+    def _route_config(self, service, key, base=None):
+        config = dict(DEFAULT_ROUTE)
+        config.update(base or {})
+        config.update(self.config.get('defaults', {}))
+        config.update(self.config.get('services', {}).get(service, {}))
+        config.update(self.config.get('routes', {}).get(key, {}))
+        return config
+
+    def _add(self, service, method, pattern, handler, base=None):
+        key = f'{method} {pattern}'
+        route = Route(method, pattern, handler, self._route_config(service, key, base))
+        self.routes.setdefault(method, []).append(route)
+        return route
+
+    def _build_routes(self):
+        for service, resources in RESOURCES.items():
+            prefix = f'/{service}'
+            self._add_health(service, prefix)
+            for resource, (id_field, factory) in resources.items():
+                base = f'{prefix}/api/{resource}'
+                self.counters[base] = itertools.count(10_000_000)
+                self._add_resource(service, base, id_field, factory)
+
+        users = self._find('GET', '/user-service/api/users/{id}')
+        self._add('user-service', 'GET', '/user-service/api/users/username/{username}',
+                  lambda route, params, body: self._item(users, 1 + sum(params['username'].encode()) % users.config['items'], _user))
+        shippings = self._find('GET', '/shipping-service/api/shippings/{id}')
+        self._add('shipping-service', 'GET', '/shipping-service/api/shippings/{orderId}/{productId}',
+                  lambda route, params, body: self._item(shippings, int(params['orderId']), _shipping))
+        self._add('favourite-service', 'GET', '/favourite-service/api/favourites/{userId}/{productId}/{likeDate}',
+                  self._favourite_by_id)
+        self._find('GET', '/favourite-service/api/favourites').handler = self._favourites_with_fanout
+
+        self._add('proxy-client', 'POST', '/app/api/authenticate',
+                  lambda route, params, body: (200, {'jwtToken': 'standin.jwt.token'}), {'latency': WRITE_LATENCY})
+        self._add_health('api-gateway', '')
+
+    def _add_health(self, service, prefix):
+        health = {'latency': HEALTH_LATENCY}
+        up = lambda route, params, body: (200, {'status': 'UP'})
+        for path in ('/actuator/health', '/actuator/health/liveness', '/actuator/health/readiness'):
+            self._add(service, 'GET', prefix + path, up, health)
+
+    def _add_resource(self, service, base, id_field, factory):
+        write = {'latency': WRITE_LATENCY}
+        self._add(service, 'GET', base, lambda route, params, body: self._collection(route, factory))
+        self._add(service, 'GET', base + '/{id}',
+                  lambda route, params, body: self._item(route, int(params['id']), factory))
+        self._add(service, 'POST', base, lambda route, params, body: self._save(base, id_field, body), write)
+        self._add(service, 'PUT', base, lambda route, params, body: (200, body or {}), write)
+        self._add(service, 'PUT', base + '/{id}', lambda route, params, body: (200, body or {}), write)
+        self._add(service, 'DELETE', base + '/{id}', lambda route, params, body: (200, True), write)
+
+    def _find(self, method, pattern):
+        return next(route for route in self.routes[method] if route.pattern == pattern)
+
+    @staticmethod
+    def _pad(dto, config):
+        if config['item_bytes']:
+            dto['description'] = 'x' * config['item_bytes']
+        return dto
+
+    def _collection(self, route, factory):
+        # El listado es estático: se serializa una sola vez por ruta
+        if route.body is None:
+            items = [self._pad(factory(i), route.config) for i in range(1, route.config['items'] + 1)]
+            route.body = json.dumps({'collection': items}, separators=(',', ':')).encode()
+        return 200, route.body
+
+    def _item(self, route, item_id, factory):
+        if not 1 <= item_id <= route.config['items']:
+            return 400, {'msg': f'Entity with id: {item_id} not found!', 'httpStatus': 'BAD_REQUEST'}
+        return 200, self._pad(factory(item_id), route.config)
+
+    def _save(self, base, id_field, body):
+        dto = dict(body or {})
+        dto[id_field] = next(self.counters[base])
+        return 200, dto
+
+    async def _enrich_favourite(self, favourite):
+        """Fan-out de FavouriteServiceImpl: user-service y luego product-service"""
+        users = self._find('GET', '/user-service/api/users/{id}')
+        products = self._find('GET', '/product-service/api/products/{id}')
+        await users.delay()
+        favourite['user'] = _user(favourite['userId'])
+        await products.delay()
+        favourite['product'] = _product(favourite['productId'])
+        return favourite
+
+    async def _favourites_with_fanout(self, route, params, body):
+        favourites = []
+        for i in range(1, route.config['items'] + 1):
+            favourites.append(await self._enrich_favourite(_favourite(i)))
+        return 200, {'collection': favourites}
+
+    async def _favourite_by_id(self, route, params, body):
+        favourite = {'userId': int(params['userId']), 'productId': int(params['productId']),
+                     'likeDate': params['likeDate']}
+        return 200, await self._enrich_favourite(favourite)
+
+    def match(self, method, path):
+        for route in self.routes.get(method, ()):
+            found = route.regex.match(path)
+            if found:
+                return route, found.groupdict()
+        return None, None
+
+    async def dispatch(self, method, path, body):
+        route, params = self.match(method, path)
+        if route is None:
+            return 404, {'status': 404, 'error': 'Not Found', 'path': path}
+
+        await route.delay()
+        if route.config['error_rate'] and random.random() < route.config['error_rate']:
+            return route.config['error_status'], {'status': route.config['error_status'], 'path': path}
+
+        try:
+            result = route.handler(route, params, body)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except ValueError:
+            # Variable de ruta no numérica: Spring responde 400 (MethodArgumentTypeMismatchException)
+            return 400, {'status': 400, 'error': 'Bad Request', 'path': path}
+        return result
+
+
+async def handle_connection(app, reader, writer):
+    """HTTP/1.1 mínimo con keep-alive y pipelining"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                break
+
+            content_length = 0
+            keep_alive = version == 'HTTP/1.1'
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = header.decode('latin-1').partition(':')
+                name = name.strip().lower()
+                if name == 'content-length':
+                    content_length = int(value)
+                elif name == 'connection':
+                    keep_alive = value.strip().lower() == 'keep-alive'
+
+            body = None
+            if content_length:
+                raw = await reader.readexactly(content_length)
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    body = None
+
+            status, payload = await app.dispatch(method, target.split('?', 1)[0], body)
+            data = payload if isinstance(payload, bytes) else json.dumps(payload, separators=(',', ':')).encode()
+            writer.write(
+                f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {len(data)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def listen_ports():
+    """Puerto del api-gateway y de cada servicio de negocio"""
+    ports = [SERVICES['api-gateway']['port']]
+    ports += [SERVICES[service]['port'] for service in RESOURCES]
+    return ports
+
+
+async def serve(config, host, ports, reuse_port):
+    app = StandinApp(config)
+    servers = [
+        await asyncio.start_server(lambda r, w: handle_connection(app, r, w), host, port,
+                                   reuse_port=reuse_port, backlog=4096)
+        for port in ports
+    ]
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    for server in servers:
+        server.close()
+
+
+def run_worker(config, host, ports, reuse_port):
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(serve(config, host, ports, reuse_port))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stand-in asyncio de los microservicios del e-commerce')
+    parser.add_argument('--config', help='YAML con latencias, errores y tamaños por ruta')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--workers', type=int, default=1, help='procesos con SO_REUSEPORT')
+    args = parser.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config) as f:
+            config = yaml.safe_load(f) or {}
+
+    ports = listen_ports()
+    print('🧪 Stand-in de microservicios')
+    print(f'  Puertos: {", ".join(str(port) for port in ports)} en {args.host}')
+    print(f'  Workers: {args.workers}')
+    print('  Presiona Ctrl+C para detener')
+
+    if args.workers == 1:
+        run_worker(config, args.host, ports, False)
+    else:
+        workers = [multiprocessing.Process(target=run_worker, args=(config, args.host, ports, True))
+                   for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
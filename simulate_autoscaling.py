@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Simulador de eventos discretos del lazo de control HPA / KEDA
+E-Commerce Microservices Platform
+
+Reproduce una curva de tráfico (grabada en locust-stats_stats_history.csv
+o sintética) a través del algoritmo del HorizontalPodAutoscaler
+(tolerancia, ventanas de estabilización, políticas Percent/Pods y
+selectPolicy) y de un ScaledObject de KEDA (pollingInterval, trigger de RPS
+por pod y de CPU), con un modelo de capacidad por pod y demora de arranque.
+
+Métricas reportadas por configuración:
+  - tiempo hasta escalar: desde que la demanda supera la capacidad lista
+    hasta que vuelve a cubrirse
+  - pod-minutos sobre y sub aprovisionados respecto a ceil(RPS / capacidad)
+  - latencia de cola predicha (M/M/c con Erlang C; modelo de fluido con
+    backlog cuando la demanda supera la capacidad) y segundos sobre el SLO
+
+Los parámetros se leen del HPA nativo de respaldo
+(k8s/autoscaling/hpa-fallback/hpa-<servicio>.yaml, el que se aplica sin
+KEDA) y de k8s/autoscaling/scaledobject-<servicio>.yaml, y se pueden
+sobrescribir con --set/--keda-set.
+
+Uso:
+  python3 simulate_autoscaling.py product-service --synthetic spike --base-rps 40 --peak-rps 400
+  python3 simulate_autoscaling.py api-gateway --traffic reports/locust-stats --traffic-scale 20 \\
+      --set behavior.scaleDown.stabilizationWindowSeconds=60 --keda-set pollingInterval=15
+"""
+import argparse
+import math
+import sys
+from collections import deque
+from pathlib import Path
+
+import yaml
+
+from analyze_load_test import AGGREGATED, iter_rows, to_float
+
+BASE_DIR = Path(__file__).resolve().parent
+AUTOSCALING_DIR = BASE_DIR / 'k8s' / 'autoscaling'
+HPA_DIR = AUTOSCALING_DIR / 'hpa-fallback'
+
+HPA_SYNC_PERIOD = 15
+HPA_TOLERANCE = 0.1
+
+# Comportamiento por defecto de autoscaling/v2 cuando no se define behavior
+DEFAULT_BEHAVIOR = {
+    'scaleUp': {
+        'stabilizationWindowSeconds': 0,
+        'policies': [{'type': 'Percent', 'value': 100, 'periodSeconds': 15},
+                     {'type': 'Pods', 'value': 4, 'periodSeconds': 15}],
+        'selectPolicy': 'Max',
+    },
+    'scaleDown': {
+        'stabilizationWindowSeconds': 300,
+        'policies': [{'type': 'Percent', 'value': 100, 'periodSeconds': 15}],
+        'selectPolicy': 'Max',
+    },
+}
+
+
+def set_path(document, assignment):
+    """Aplicar 'a.b.0.c=valor' sobre un diccionario de manifiesto"""
+    path, _, raw = assignment.partition('=')
+    keys = path.split('.')
+    target = document
+    for key in keys[:-1]:
+        target = target[int(key)] if isinstance(target, list) else target.setdefault(key, {})
+    last = keys[-1]
+    value = yaml.safe_load(raw)
+    if isinstance(target, list):
+        target[int(last)] = value
+    else:
+        target[last] = value
+
+
+def load_manifest(path):
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+# --- Tráfico -----------------------------------------------------------------
+
+def recorded_traffic(prefix, scale):
+    """RPS por segundo de la fila Aggregated del historial de Locust"""
+    traffic = []
+    for row in iter_rows(f'{prefix}_stats_history.csv'):
+        if row['Name'] == AGGREGATED:
+            traffic.append((to_float(row['Requests/s']) or 0.0) * scale)
+    return traffic
+
+
+def synthetic_traffic(kind, base, peak, duration):
+    traffic = []
+    for t in range(int(duration)):
+        if kind == 'step':
+            rps = base + (peak - base) * min(1.0, (t // (duration / 10)) / 9)
+        elif kind == 'spike':
+            rps = peak if duration * 0.3 <= t < duration * 0.45 else base
+        elif kind == 'diurnal':
+            rps = base + (peak - base) * (1 - math.cos(2 * math.pi * t / duration)) / 2
+        else:
+            rps = base
+        traffic.append(rps)
+    return traffic
+
+
+# --- Modelo de cola ----------------------------------------------------------
+
+def erlang_c_wait(arrival, service_rate, servers):
+    """Tiempo medio de espera en cola M/M/c (segundos); inf si ρ >= 1"""
+    if servers <= 0:
+        return math.inf
+    offered = arrival / service_rate
+    rho = offered / servers
+    if rho >= 1:
+        return math.inf
+    term, total = 1.0, 1.0
+    for k in range(1, servers):
+        term *= offered / k
+        total += term
+    term *= offered / servers
+    tail = term / (1 - rho)
+    probability_wait = tail / (total + tail)
+    return probability_wait / (servers * service_rate - arrival)
+
+
+# --- Controladores -----------------------------------------------------------
+
+class HPAController:
+    """Algoritmo de replica calculation + behavior de autoscaling/v2"""
+
+    def __init__(self, spec):
+        self.min_replicas = spec.get('minReplicas', 1)
+        self.max_replicas = spec['maxReplicas']
+        self.metrics = spec.get('metrics', [])
+        behavior = spec.get('behavior') or {}
+        self.behavior = {
+            direction: {**DEFAULT_BEHAVIOR[direction], **(behavior.get(direction) or {})}
+            for direction in ('scaleUp', 'scaleDown')
+        }
+        self.recommendations = deque()
+        self.events = deque()
+
+    def _metric_replicas(self, metric, ready, observed):
+        if metric['type'] == 'Resource' and metric['resource']['name'] == 'cpu':
+            target = metric['resource']['target']['averageUtilization']
+            ratio = observed['cpu'] / target
+        elif metric['type'] == 'External':
+            target = float(metric['external']['target']['averageValue'])
+            return math.ceil(observed['external'] / target)
+        else:
+            # memoria y otras métricas no se modelan
+            return None
+        if abs(ratio - 1.0) <= HPA_TOLERANCE:
+            return ready
+        return math.ceil(ready * ratio)
+
+    def _stabilized(self, now, desired, current):
+        self.recommendations.append((now, desired))
+        up_window = self.behavior['scaleUp']['stabilizationWindowSeconds']
+        down_window = self.behavior['scaleDown']['stabilizationWindowSeconds']
+        longest = max(up_window, down_window)
+        while self.recommendations and self.recommendations[0][0] < now - longest:
+            self.recommendations.popleft()
+        up_candidates = [r for t, r in self.recommendations if t >= now - up_window]
+        down_candidates = [r for t, r in self.recommendations if t >= now - down_window]
+        if desired > current:
+            return max(current, min(up_candidates))
+        return min(current, max(down_candidates))
+
+    def _rate_limited(self, now, desired, current):
+        direction = 'scaleUp' if desired > current else 'scaleDown'
+        rules = self.behavior[direction]
+        if rules.get('selectPolicy') == 'Disabled':
+            return current
+        limits = []
+        for policy in rules['policies']:
+            period_start = current - sum(delta for t, delta in self.events
+                                         if t > now - policy['periodSeconds'] and (delta > 0) == (direction == 'scaleUp'))
+            if direction == 'scaleUp':
+                limit = period_start + policy['value'] if policy['type'] == 'Pods' \
+                    else math.ceil(period_start * (1 + policy['value'] / 100))
+            else:
+                limit = period_start - policy['value'] if policy['type'] == 'Pods' \
+                    else math.ceil(period_start * (1 - policy['value'] / 100))
+            limits.append(limit)
+        pick_max = rules.get('selectPolicy', 'Max') == 'Max'
+        if direction == 'scaleUp':
+            return min(desired, max(limits) if pick_max else min(limits))
+        return max(desired, min(limits) if pick_max else max(limits))
+
+    def reconcile(self, now, current, ready, observed):
+        proposals = [self._metric_replicas(metric, max(ready, 1), observed) for metric in self.metrics]
+        proposals = [p for p in proposals if p is not None]
+        desired = max(proposals) if proposals else current
+        desired = min(self.max_replicas, max(self.min_replicas, desired))
+        desired = self._stabilized(now, desired, current)
+        if desired != current:
+            desired = self._rate_limited(now, desired, current)
+        desired = min(self.max_replicas, max(self.min_replicas, desired))
+        if desired != current:
+            self.events.append((now, desired - current))
+        while self.events and self.events[0][0] < now - 1800:
+            self.events.popleft()
+        return desired
+
+
+def keda_hpa_spec(scaled_object):
+    """HPA equivalente al que KEDA genera para un ScaledObject"""
+    spec = scaled_object['spec']
+    metrics = []
+    for trigger in spec.get('triggers', []):
+        if trigger['type'] == 'cpu':
+            metrics.append({'type': 'Resource', 'resource': {'name': 'cpu', 'target': {
+                'type': 'Utilization', 'averageUtilization': float(trigger['metadata']['value'])}}})
+        elif trigger['type'] == 'prometheus' and trigger.get('metricType', 'AverageValue') == 'AverageValue':
+            metrics.append({'type': 'External', 'external': {'target': {
+                'type': 'AverageValue', 'averageValue': float(trigger['metadata']['threshold'])}}})
+    advanced = (spec.get('advanced') or {}).get('horizontalPodAutoscalerConfig') or {}
+    return {
+        'minReplicas': spec.get('minReplicaCount', 1),
+        'maxReplicas': spec.get('maxReplicaCount', 100),
+        'metrics': metrics,
+        'behavior': advanced.get('behavior'),
+    }
+
+
+# --- Simulación --------------------------------------------------------------
+
+def simulate(traffic, controller, pod_capacity, startup_delay, initial_replicas,
+             polling_interval=HPA_SYNC_PERIOD, metric_window=60, slo_ms=1000):
+    """Simular segundo a segundo; devuelve métricas agregadas y la serie temporal"""
+    service_rate = pod_capacity
+    replicas = initial_replicas
+    starting = deque()  # instantes en que quedan listos los pods en arranque
+    ready = initial_replicas
+    backlog = 0.0
+    window = deque(maxlen=metric_window)
+    observed = {'cpu': 0.0, 'external': 0.0}
+
+    over = under = 0.0
+    breach_seconds = 0
+    latencies = []
+    scale_started = None
+    scale_times = []
+    timeline = []
+
+    for now, arrival in enumerate(traffic):
+        while starting and starting[0] <= now:
+            starting.popleft()
+            ready += 1
+
+        capacity = ready * service_rate
+        served = min(arrival + backlog, capacity)
+        backlog = max(0.0, backlog + arrival - capacity)
+        window.append(arrival)
+
+        if backlog > 0:
+            latency = backlog / max(capacity, 1e-9) + 1 / service_rate
+        else:
+            latency = erlang_c_wait(arrival, service_rate, ready) + 1 / service_rate
+        latency_ms = min(latency, 3600) * 1000
+        latencies.append(latency_ms)
+        breach_seconds += latency_ms > slo_ms
+
+        needed = math.ceil(arrival / pod_capacity) if arrival else 0
+        over += max(ready - needed, 0) / 60
+        under += max(needed - ready, 0) / 60
+        if needed > ready and scale_started is None:
+            scale_started = now
+        elif needed <= ready and scale_started is not None:
+            scale_times.append(now - scale_started)
+            scale_started = None
+
+        # Métricas que ve el controlador (CPU por pod listo, RPS promedio)
+        if now % polling_interval == 0:
+            observed['external'] = sum(window) / len(window)
+        observed['cpu'] = 100.0 * served / max(capacity, 1e-9)
+
+        if now % HPA_SYNC_PERIOD == 0:
+            desired = controller.reconcile(now, replicas, ready, observed)
+            if desired > replicas:
+                starting.extend([now + startup_delay] * (desired - replicas))
+            elif desired < replicas:
+                removed = replicas - desired
+                while removed and starting:
+                    starting.pop()
+                    removed -= 1
+                ready -= removed
+            replicas = desired
+        timeline.append((now, arrival, replicas, ready, latency_ms))
+
+    if scale_started is not None:
+        scale_times.append(len(traffic) - scale_started)
+    ordered = sorted(latencies)
+    return {
+        'time_to_scale_avg': sum(scale_times) / len(scale_times) if scale_times else 0.0,
+        'time_to_scale_max': max(scale_times) if scale_times else 0,
+        'scale_events': len(scale_times),
+        'over_pod_minutes': over,
+        'under_pod_minutes': under,
+        'latency_p50_ms': ordered[len(ordered) // 2] if ordered else 0.0,
+        'latency_p95_ms': ordered[int(len(ordered) * 0.95)] if ordered else 0.0,
+        'latency_max_ms': ordered[-1] if ordered else 0.0,
+        'slo_breach_seconds': breach_seconds,
+        'peak_replicas': max(r for _, _, r, _, _ in timeline) if timeline else 0,
+    }, timeline
+
+
+def print_result(label, result):
+    print(f'  {label}')
+    print(f"    Tiempo hasta escalar: prom {result['time_to_scale_avg']:.0f}s, máx {result['time_to_scale_max']}s "
+          f"({result['scale_events']} eventos)")
+    print(f"    Pod-minutos: sobre {result['over_pod_minutes']:.1f}, sub {result['under_pod_minutes']:.1f}  "
+          f"(pico {result['peak_replicas']} réplicas)")
+    print(f"    Latencia predicha: p50 {result['latency_p50_ms']:.0f} ms, p95 {result['latency_p95_ms']:.0f} ms, "
+          f"máx {result['latency_max_ms']:.0f} ms; {result['slo_breach_seconds']}s sobre el SLO")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulador del lazo de control HPA/KEDA')
+    parser.add_argument('service', help='servicio (lee hpa-fallback/hpa-<servicio>.yaml y scaledobject-<servicio>.yaml)')
+    parser.add_argument('--traffic', metavar='PREFIJO', help='prefijo --csv de Locust con stats_history')
+    parser.add_argument('--traffic-scale', type=float, default=1.0, help='multiplicador del tráfico grabado')
+    parser.add_argument('--synthetic', choices=['constant', 'step', 'spike', 'diurnal'], default='spike')
+    parser.add_argument('--base-rps', type=float, default=40)
+    parser.add_argument('--peak-rps', type=float, default=400)
+    parser.add_argument('--duration', type=int, default=3600, help='segundos de tráfico sintético')
+    parser.add_argument('--pod-capacity', type=float, default=50, help='RPS que satura un pod')
+    parser.add_argument('--startup-delay', type=int, default=60, help='segundos hasta que un pod nuevo está listo')
+    parser.add_argument('--slo-ms', type=float, default=1000)
+    parser.add_argument('--set', action='append', default=[], metavar='RUTA=VALOR', help='sobrescribir spec del HPA')
+    parser.add_argument('--keda-set', action='append', default=[], metavar='RUTA=VALOR',
+                        help='sobrescribir spec del ScaledObject')
+    args = parser.parse_args()
+
+    if args.traffic:
+        traffic = recorded_traffic(args.traffic, args.traffic_scale)
+        source = f'{args.traffic} x{args.traffic_scale:g}'
+    else:
+        traffic = synthetic_traffic(args.synthetic, args.base_rps, args.peak_rps, args.duration)
+        source = f'{args.synthetic} {args.base_rps:g}→{args.peak_rps:g} RPS'
+    if not traffic:
+        print('❌ Curva de tráfico vacía')
+        sys.exit(2)
+
+    print(f'⚙️  Simulación de autoscaling: {args.service} ({source}, {len(traffic)}s, '
+          f'{args.pod_capacity:g} RPS/pod, arranque {args.startup_delay}s)')
+
+    hpa_path = HPA_DIR / f'hpa-{args.service}.yaml'
+    hpa = load_manifest(hpa_path)
+    if not hpa:
+        print(f'  ⚠️  Sin HPA nativo: no existe {hpa_path.relative_to(BASE_DIR)} '
+              '(generar con: python3 generate_manifests.py network-security)')
+    else:
+        for assignment in args.set:
+            set_path(hpa['spec'], assignment)
+        controller = HPAController(hpa['spec'])
+        result, _ = simulate(traffic, controller, args.pod_capacity, args.startup_delay,
+                             hpa['spec'].get('minReplicas', 1), slo_ms=args.slo_ms)
+        print_result(f'HPA (CPU) - hpa-fallback/hpa-{args.service}.yaml', result)
+
+    scaled_path = AUTOSCALING_DIR / f'scaledobject-{args.service}.yaml'
+    scaled_object = load_manifest(scaled_path)
+    if not scaled_object:
+        print(f'  ⚠️  Sin ScaledObject de KEDA: no existe {scaled_path.relative_to(BASE_DIR)}')
+    else:
+        for assignment in args.keda_set:
+            set_path(scaled_object['spec'], assignment)
+        spec = keda_hpa_spec(scaled_object)
+        controller = HPAController(spec)
+        result, _ = simulate(traffic, controller, args.pod_capacity, args.startup_delay, spec['minReplicas'],
+                             polling_interval=scaled_object['spec'].get('pollingInterval', 30), slo_ms=args.slo_ms)
+        print_result(f'KEDA (RPS + CPU) - scaledobject-{args.service}.yaml', result)
+
+    if not hpa and not scaled_object:
+        print(f'❌ No hay HPA ni ScaledObject para {args.service} en {AUTOSCALING_DIR.relative_to(BASE_DIR)}')
+        sys.exit(2)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Simulador de alcanzabilidad de NetworkPolicies
+E-Commerce Microservices Platform
+
+Carga NetworkPolicies, Deployments/StatefulSets, Services y Namespaces del
+árbol de manifiestos, precalcula índices de etiquetas (pods y namespaces) y
+evalúa los selectores de ingress/egress de cada política una sola vez. Con
+eso construye la matriz servicio → servicio de flujos permitidos (puerto a
+puerto, en ambos extremos: egress del origen e ingress del destino) y la
+compara con el grafo de llamadas que los servicios necesitan:
+
+  - las llamadas declaradas en SERVICES[...]['calls'] (rutas del gateway,
+    clientes Feign y RestTemplate)
+  - todo servicio → service-discovery:8761, cloud-config-server:8888 y,
+    si tiene base de datos, postgres:5432 (o pgbouncer:6432 y de ahí a
+    postgres cuando el entorno despliega PgBouncer)
+  - ingress-nginx → backends del Ingress, Prometheus (namespace
+    monitoring) → pods con métricas, y todos → kube-dns:53
+
+Un flujo necesario bloqueado aparece en producción como timeouts lentos
+(el SYN se descarta); los flujos permitidos que nadie necesita se listan
+como superficie sobrante. ipBlock solo se considera para 0.0.0.0/0.
+
+Si un workload o una política está definido en varios archivos se usa el
+generado (k8s/.generated, el que aplica deploy-all.sh) y se avisa; si
+ninguno o varios son generados, el simulador se niega a correr.
+
+Uso:
+  python3 simulate_network_policies.py --namespace dev
+  python3 simulate_network_policies.py k8s/environments/prod --namespace prod --matrix
+"""
+import argparse
+import sys
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+from generate_k8s_configs import PGBOUNCER_PORT
+from lint_manifests import load
+from service_registry import BASE_DIR, SERVICES
+from validate_yaml import discover
+
+Endpoint = namedtuple('Endpoint', 'name namespace labels ports')
+
+# Pods fuera del árbol que originan o reciben tráfico de la plataforma
+EXTERNAL = [
+    Endpoint('ingress-nginx', 'ingress-nginx', {'app.kubernetes.io/name': 'ingress-nginx'}, {}),
+    Endpoint('prometheus', 'monitoring', {'app.kubernetes.io/name': 'prometheus'}, {}),
+    Endpoint('kube-dns', 'kube-system', {'k8s-app': 'kube-dns'}, {('UDP', 53): 'dns', ('TCP', 53): 'dns-tcp'}),
+]
+DNS = ('kube-dns', 'UDP', 53)
+ALL_PORTS = None
+
+
+def endpoints_from(index):
+    """Un endpoint por workload: etiquetas del pod y puertos {(protocolo, número): nombre}"""
+    endpoints = []
+    for (_, namespace, name), (labels, pod) in index.pods.items():
+        ports = {}
+        for container in pod.get('containers') or []:
+            for port in container.get('ports') or []:
+                ports[(port.get('protocol', 'TCP'), port['containerPort'])] = port.get('name')
+        endpoints.append(Endpoint(labels.get('app', name), namespace, labels, ports))
+    return endpoints + EXTERNAL
+
+
+class LabelIndex:
+    """Endpoints y namespaces por etiqueta, para resolver selectores sin recorrer todos los pods"""
+
+    def __init__(self, endpoints, namespace_labels):
+        self.endpoints = endpoints
+        self.by_label = defaultdict(set)
+        self.by_namespace = defaultdict(set)
+        for position, endpoint in enumerate(endpoints):
+            self.by_namespace[endpoint.namespace].add(position)
+            for label in endpoint.labels.items():
+                self.by_label[label].add(position)
+        self.namespace_labels = namespace_labels
+
+    @staticmethod
+    def _matches_expressions(labels, expressions):
+        for expression in expressions or []:
+            key, operator, values = expression['key'], expression['operator'], expression.get('values') or []
+            if operator == 'In' and labels.get(key) not in values:
+                return False
+            if operator == 'NotIn' and labels.get(key) in values:
+                return False
+            if operator == 'Exists' and key not in labels:
+                return False
+            if operator == 'DoesNotExist' and key in labels:
+                return False
+        return True
+
+    def pods(self, selector, namespaces):
+        """Posiciones de los endpoints de esos namespaces que cumplen el selector"""
+        candidates = set().union(*(self.by_namespace[namespace] for namespace in namespaces)) if namespaces else set()
+        for label in ((selector or {}).get('matchLabels') or {}).items():
+            candidates &= self.by_label[label]
+        expressions = (selector or {}).get('matchExpressions')
+        if expressions:
+            candidates = {position for position in candidates
+                          if self._matches_expressions(self.endpoints[position].labels, expressions)}
+        return candidates
+
+    def namespaces(self, selector):
+        known = set(self.namespace_labels) | set(self.by_namespace)
+        return {namespace for namespace in known
+                if all(self.namespace_labels.get(namespace, {}).get(key) == value
+                       for key, value in ((selector or {}).get('matchLabels') or {}).items())
+                and self._matches_expressions(self.namespace_labels.get(namespace, {}),
+                                              (selector or {}).get('matchExpressions'))}
+
+
+def _peers(rule_peers, policy_namespace, labels):
+    """Endpoints de una lista from/to (ausente o vacía = todos)"""
+    if not rule_peers:
+        return set(range(len(labels.endpoints)))
+    selected = set()
+    for peer in rule_peers:
+        if 'ipBlock' in peer:
+            if peer['ipBlock'].get('cidr') == '0.0.0.0/0' and not peer['ipBlock'].get('except'):
+                selected |= set(range(len(labels.endpoints)))
+            continue
+        namespaces = labels.namespaces(peer['namespaceSelector']) if 'namespaceSelector' in peer \
+            else {policy_namespace}
+        selected |= labels.pods(peer.get('podSelector') or {}, namespaces)
+    return selected
+
+
+def _ports(rule_ports):
+    """[(protocolo, puerto o nombre, endPort)] o ALL_PORTS"""
+    if not rule_ports:
+        return ALL_PORTS
+    return [(port.get('protocol', 'TCP'), port.get('port'), port.get('endPort')) for port in rule_ports]
+
+
+def _port_allowed(ports, endpoint, protocol, number):
+    if ports is ALL_PORTS:
+        return True
+    for rule_protocol, port, end_port in ports:
+        if rule_protocol != protocol:
+            continue
+        if port is None or port == number or (end_port and isinstance(port, int) and port <= number <= end_port):
+            return True
+        if isinstance(port, str) and endpoint.ports.get((protocol, number)) == port:
+            return True
+    return False
+
+
+def compile_policies(index, labels):
+    """Reglas por endpoint: {posición: [(peers, ports, política)]} para ingress y egress"""
+    ingress, egress = defaultdict(list), defaultdict(list)
+    isolated_ingress, isolated_egress = set(), set()
+    for key in index.by_kind['NetworkPolicy']:
+        policy = index.objects[key]
+        namespace, name = key[1], key[2]
+        spec = policy.get('spec') or {}
+        types = spec.get('policyTypes') or (['Ingress'] + (['Egress'] if 'egress' in spec else []))
+        targets = labels.pods(spec.get('podSelector') or {}, {namespace})
+        for position in targets:
+            if 'Ingress' in types:
+                isolated_ingress.add(position)
+                for rule in spec.get('ingress') or []:
+                    ingress[position].append((_peers(rule.get('from'), namespace, labels), _ports(rule.get('ports')), name))
+            if 'Egress' in types:
+                isolated_egress.add(position)
+                for rule in spec.get('egress') or []:
+                    egress[position].append((_peers(rule.get('to'), namespace, labels), _ports(rule.get('ports')), name))
+    return ingress, egress, isolated_ingress, isolated_egress
+
+
+def reachability(endpoints, compiled):
+    """{(origen, destino): {(protocolo, puerto)}} de todos los flujos permitidos entre endpoints"""
+    ingress, egress, isolated_ingress, isolated_egress = compiled
+    matrix = {}
+    for source_position, source in enumerate(endpoints):
+        for target_position, target in enumerate(endpoints):
+            if source_position == target_position or not target.ports:
+                continue
+            allowed = set()
+            for protocol, number in target.ports:
+                out = source_position not in isolated_egress or any(
+                    target_position in peers and _port_allowed(ports, target, protocol, number)
+                    for peers, ports, _ in egress[source_position])
+                into = target_position not in isolated_ingress or any(
+                    source_position in peers and _port_allowed(ports, target, protocol, number)
+                    for peers, ports, _ in ingress[target_position])
+                if out and into:
+                    allowed.add((protocol, number))
+            if allowed:
+                matrix[(source.name, target.name)] = allowed
+    return matrix
+
+
+def required_flows(index, namespace):
+    """{(origen, destino, protocolo, puerto)} que la plataforma necesita"""
+    flows = set()
+    pgbouncer = any(key[1:] == (namespace, 'pgbouncer') for key in index.pods)
+    if pgbouncer:
+        flows |= {('pgbouncer', 'postgres', 'TCP', 5432), ('pgbouncer', *DNS)}
+    for name, config in SERVICES.items():
+        for target in config.get('calls') or []:
+            flows.add((name, target, 'TCP', SERVICES[target]['port']))
+        if name != 'service-discovery':
+            flows.add((name, 'service-discovery', 'TCP', SERVICES['service-discovery']['port']))
+        if name not in ('service-discovery', 'cloud-config-server'):
+            flows.add((name, 'cloud-config-server', 'TCP', SERVICES['cloud-config-server']['port']))
+        if 'db' in config:
+            flows.add((name, 'pgbouncer', 'TCP', PGBOUNCER_PORT) if pgbouncer else (name, 'postgres', 'TCP', 5432))
+        flows.add((name, *DNS))
+    for key in index.by_kind['Ingress']:
+        if key[1] != namespace:
+            continue
+        spec = index.objects[key].get('spec') or {}
+        for rule in spec.get('rules') or []:
+            for path in (rule.get('http') or {}).get('paths') or []:
+                service = (path.get('backend') or {}).get('service') or {}
+                if service.get('name') in SERVICES:
+                    flows.add(('ingress-nginx', service['name'], 'TCP', SERVICES[service['name']]['port']))
+    for (_, service_namespace, name), (labels, _) in index.pods.items():
+        if service_namespace == namespace and labels.get('metrics') == 'enabled' and name in SERVICES:
+            flows.add(('prometheus', name, 'TCP', SERVICES[name]['port']))
+    return flows
+
+
+def explain(source, target, protocol, number, endpoints, compiled):
+    """Qué extremo bloquea un flujo"""
+    ingress, egress, isolated_ingress, isolated_egress = compiled
+    positions = {endpoint.name: position for position, endpoint in enumerate(endpoints)}
+    if source not in positions or target not in positions:
+        missing = source if source not in positions else target
+        return f'{missing} no está desplegado en el árbol'
+    source_position, target_position = positions[source], positions[target]
+    target_endpoint = endpoints[target_position]
+    if (protocol, number) not in target_endpoint.ports:
+        return f'{target} no expone {protocol}/{number}'
+    reasons = []
+    if source_position in isolated_egress and not any(
+            target_position in peers and _port_allowed(ports, target_endpoint, protocol, number)
+            for peers, ports, _ in egress[source_position]):
+        reasons.append(f"egress de {source} (políticas: {', '.join(sorted({p for _, _, p in egress[source_position]})) or 'solo deny'})")
+    if target_position in isolated_ingress and not any(
+            source_position in peers and _port_allowed(ports, target_endpoint, protocol, number)
+            for peers, ports, _ in ingress[target_position]):
+        reasons.append(f"ingress de {target} (políticas: {', '.join(sorted({p for _, _, p in ingress[target_position]})) or 'solo deny'})")
+    return ' y '.join(reasons)
+
+
+def print_matrix(endpoints, matrix):
+    names = sorted({endpoint.name for endpoint in endpoints})
+    header = 'origen ↓ / destino →'
+    width = max(len(header), *(len(name) for name in names))
+    print(f"\n{header:<{width}}  " + ' '.join(f'{i:>2}' for i in range(len(names))))
+    for name in names:
+        cells = ' '.join(' ●' if (name, target) in matrix else (' ·' if name != target else '  ') for target in names)
+        print(f'{name:<{width}}  {cells}')
+    print('  ' + '  '.join(f'{i}={name}' for i, name in enumerate(names)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Matriz de alcanzabilidad de NetworkPolicies vs grafo de llamadas')
+    parser.add_argument('paths', nargs='*', default=[str(BASE_DIR / 'k8s')], help='archivos o directorios (default: k8s/)')
+    parser.add_argument('--namespace', default='dev', help='namespace de la plataforma')
+    parser.add_argument('--matrix', action='store_true', help='imprimir la matriz completa')
+    parser.add_argument('--extra', action='store_true', help='listar los flujos permitidos que nadie necesita')
+    args = parser.parse_args()
+
+    paths, _ = discover([Path(path) for path in args.paths])
+    index = load(paths)
+    relevant = {kind: {args.namespace} for kind in ('Deployment', 'StatefulSet', 'DaemonSet', 'NetworkPolicy', 'Ingress')}
+    relevant['Namespace'] = {None}
+    duplicates = sorted(key for key, sources in index.sources.items()
+                        if len(sources) > 1 and key[1] in relevant.get(key[0], ()))
+    ambiguous = [key for key in duplicates if key in index.ambiguous]
+    if ambiguous:
+        print('❌ Objetos definidos en varios archivos sin uno generado que los desempate; '
+              'borrar o mover los sobrantes:')
+        for key in ambiguous:
+            print(f"  - {key[0]} {key[2]}: {', '.join(index.sources[key])}")
+        sys.exit(2)
+    for key in duplicates:
+        used = next(path for path in index.sources[key] if path in index.generated)
+        others = ', '.join(path for path in index.sources[key] if path != used)
+        print(f'⚠️  {key[0]} {key[2]} definido también en {others}; se usa el generado {used}')
+    namespace_labels = {}
+    for key in index.by_kind['Namespace']:
+        namespace_labels[key[2]] = dict((index.objects[key].get('metadata') or {}).get('labels') or {})
+    for endpoint in EXTERNAL + [Endpoint(None, args.namespace, {}, {})]:
+        namespace_labels.setdefault(endpoint.namespace, {})
+    for namespace, values in namespace_labels.items():
+        values.setdefault('kubernetes.io/metadata.name', namespace)
+
+    endpoints = [endpoint for endpoint in endpoints_from(index) if endpoint.namespace in (args.namespace, *{
+        external.namespace for external in EXTERNAL})]
+    labels = LabelIndex(endpoints, namespace_labels)
+    compiled = compile_policies(index, labels)
+    matrix = reachability(endpoints, compiled)
+    required = required_flows(index, args.namespace)
+
+    policies = sum(1 for key in index.by_kind['NetworkPolicy'] if key[1] == args.namespace)
+    print(f'🛡️  {args.namespace}: {policies} NetworkPolicies, {len(endpoints) - len(EXTERNAL)} workloads, '
+          f'{len(matrix)} pares con tráfico permitido')
+    if args.matrix:
+        print_matrix(endpoints, matrix)
+
+    blocked = sorted(flow for flow in required if (flow[2], flow[3]) not in matrix.get(flow[:2], set()))
+    needed_pairs = {flow[:2] for flow in required}
+    internal = {endpoint.name for endpoint in endpoints if endpoint not in EXTERNAL}
+    extra = sorted(pair for pair in matrix if pair not in needed_pairs and pair[0] in internal and pair[1] in internal)
+
+    if extra:
+        print(f'\n⚠️  {len(extra)} flujos permitidos que el grafo de llamadas no necesita')
+        if args.extra:
+            for source, target in extra:
+                ports = ', '.join(f'{protocol}/{number}' for protocol, number in sorted(matrix[(source, target)]))
+                print(f'  - {source} → {target} ({ports})')
+    if blocked:
+        print(f'\n❌ {len(blocked)} flujos necesarios bloqueados:')
+        for source, target, protocol, number in blocked:
+            reason = explain(source, target, protocol, number, endpoints, compiled)
+            print(f'  - {source} → {target}:{number}/{protocol}: {reason}')
+        sys.exit(1)
+    print(f'\n✅ Los {len(required)} flujos necesarios están permitidos')
@@ -0,0 +1,73 @@
+"""
+Monitor de saturación del generador de carga (Locust)
+
+Muestrea el uso de CPU de cada proceso generador (el proceso local o cada
+worker en modo distribuido) y lo guarda junto a los CSV de estadísticas en
+<csv-prefix>_generator.csv. Si algún generador supera el umbral, las
+latencias medidas dejan de ser fiables: el cuello de botella es el cliente.
+"""
+
+import csv
+import os
+import time
+
+import gevent
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+SAMPLE_INTERVAL = float(os.environ.get('LOCUST_CPU_SAMPLE_INTERVAL', '5'))
+CPU_SATURATION_THRESHOLD = float(os.environ.get('LOCUST_CPU_SATURATION', '90'))
+
+_samples = []
+
+
+def _generator_cpu(runner):
+    """Uso de CPU (%) por generador: {'local' | worker_id: cpu}"""
+    if isinstance(runner, MasterRunner):
+        return {worker.id: worker.cpu_usage for worker in runner.clients.values()}
+    return {'local': runner.current_cpu_usage}
+
+
+def _sampler(environment):
+    while True:
+        gevent.sleep(SAMPLE_INTERVAL)
+        runner = environment.runner
+        now = int(time.time())
+        for generator, cpu in _generator_cpu(runner).items():
+            _samples.append((now, generator, runner.user_count, cpu))
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        # Los workers reportan su CPU al master en cada heartbeat
+        return
+    gevent.spawn(_sampler, environment)
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner) or not _samples:
+        return
+
+    csv_prefix = getattr(environment.parsed_options, 'csv_prefix', None)
+    if csv_prefix:
+        with open(f'{csv_prefix}_generator.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Timestamp', 'Generator', 'User Count', 'CPU %'])
+            writer.writerows(_samples)
+
+    peaks = {}
+    saturated = {}
+    for _, generator, _, cpu in _samples:
+        peaks[generator] = max(peaks.get(generator, 0), cpu)
+        if cpu >= CPU_SATURATION_THRESHOLD:
+            saturated[generator] = saturated.get(generator, 0) + 1
+
+    print('\n🖥️  CPU del generador de carga (pico por proceso):')
+    for generator, peak in sorted(peaks.items(), key=lambda item: str(item[0])):
+        print(f'  - {generator}: {peak:.0f}%')
+    if saturated:
+        seconds = max(saturated.values()) * SAMPLE_INTERVAL
+        print(f'  ⚠️  Generador saturado (>= {CPU_SATURATION_THRESHOLD:.0f}% CPU) durante ~{seconds:.0f}s: '
+              'las latencias y RPS medidos están limitados por el cliente, agregue workers')
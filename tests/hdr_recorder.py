@@ -0,0 +1,138 @@
+"""
+Registro de latencias con HdrHistogram corregido por coordinated omission
+
+Los percentiles de locust-stats_stats.csv se calculan sobre latencias
+redondeadas en buckets y, con modelo cerrado, un usuario bloqueado en una
+respuesta lenta deja de enviar las peticiones que habría enviado: la cola
+(p99/p99.9) sale optimista. Este módulo registra cada petición en un
+HdrHistogram por endpoint con record_corrected_value(), que rellena las
+muestras omitidas según el intervalo esperado entre peticiones.
+
+- Intervalo esperado: SHAPE_PACING si hay LOAD_SHAPE, si no HDR_EXPECTED_INTERVAL_MS
+  (por defecto 2000 ms, el punto medio de between(1, 3))
+- En modo distribuido cada worker envía sus histogramas al master en cada
+  reporte y el master los fusiona
+- Salida: <csv-prefix>_hdr.csv con percentiles y el histograma comprimido
+  (base64, decodificable con HdrHistogram.decode) por endpoint
+- SLO: p95 corregido contra HDR_SLO_P95_MS (1000 ms, igual que la alerta
+  HighResponseTime); con HDR_SLO_ENFORCE=1 un incumplimiento da exit code 1
+
+Requiere: pip install hdrhistogram
+"""
+
+import csv
+import os
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from load_shapes import SHAPE_PACING
+
+try:
+    from hdrh.histogram import HdrHistogram
+except ImportError:
+    HdrHistogram = None
+
+# Rango registrable: 1 µs a 1 hora, 3 cifras significativas
+LOWEST_US = 1
+HIGHEST_US = 3600 * 1000 * 1000
+SIGNIFICANT_FIGURES = 3
+
+PERCENTILES = [50, 90, 95, 99, 99.9, 99.99]
+AGGREGATED = ('', 'Aggregated')
+
+SLO_P95_MS = float(os.environ.get('HDR_SLO_P95_MS', '1000'))
+SLO_ENFORCE = os.environ.get('HDR_SLO_ENFORCE', '0') == '1'
+
+_histograms = {}
+_expected_interval_us = 0
+
+
+def _expected_interval():
+    """Intervalo esperado entre peticiones de un mismo usuario (µs)"""
+    if os.environ.get('LOAD_SHAPE'):
+        return int(SHAPE_PACING * 1000 * 1000)
+    return int(float(os.environ.get('HDR_EXPECTED_INTERVAL_MS', '2000')) * 1000)
+
+
+def _histogram(key):
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = HdrHistogram(LOWEST_US, HIGHEST_US, SIGNIFICANT_FIGURES)
+    return histogram
+
+
+def _key(request_type, name):
+    return f'{request_type}\t{name}'
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    global _expected_interval_us
+    if HdrHistogram is None:
+        print('⚠️  hdrhistogram no está instalado: registro HDR deshabilitado (pip install hdrhistogram)')
+        return
+    _expected_interval_us = _expected_interval()
+    if not isinstance(environment.runner, MasterRunner):
+        environment.events.request.add_listener(on_request)
+
+
+def on_request(request_type, name, response_time, **kwargs):
+    if response_time is None:
+        return
+    value = min(HIGHEST_US, max(LOWEST_US, int(response_time * 1000)))
+    _histogram(_key(request_type, name)).record_corrected_value(value, _expected_interval_us)
+    _histogram(_key(*AGGREGATED)).record_corrected_value(value, _expected_interval_us)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data, **kwargs):
+    """Worker: enviar los histogramas del intervalo y reiniciarlos"""
+    if HdrHistogram is None:
+        return
+    data['hdr'] = {key: h.encode().decode('ascii') for key, h in _histograms.items() if h.get_total_count()}
+    for histogram in _histograms.values():
+        histogram.reset()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data, **kwargs):
+    """Master: fusionar los histogramas recibidos de cada worker"""
+    if HdrHistogram is None:
+        return
+    for key, encoded in data.get('hdr', {}).items():
+        _histogram(key).decode_and_add(encoded)
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    if HdrHistogram is None or isinstance(environment.runner, WorkerRunner) or not _histograms:
+        return
+
+    rows = []
+    for key, histogram in _histograms.items():
+        request_type, name = key.split('\t', 1)
+        percentiles_ms = [histogram.get_value_at_percentile(p) / 1000.0 for p in PERCENTILES]
+        rows.append((request_type, name, histogram.get_total_count(), *percentiles_ms,
+                     histogram.get_max_value() / 1000.0, histogram.encode().decode('ascii')))
+    # Aggregated al final, igual que en locust-stats_stats.csv
+    rows.sort(key=lambda row: (row[:2] == AGGREGATED, row[1], row[0]))
+
+    csv_prefix = getattr(environment.parsed_options, 'csv_prefix', None)
+    if csv_prefix:
+        with open(f'{csv_prefix}_hdr.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Type', 'Name', 'Corrected Count', *[f'{p}%' for p in PERCENTILES],
+                             'Max', 'Histogram'])
+            writer.writerows(rows)
+
+    p95_index = 3 + PERCENTILES.index(95)
+    violations = [row for row in rows if row[p95_index] > SLO_P95_MS]
+    print(f'\n📐 Latencias HDR corregidas (intervalo esperado {_expected_interval_us / 1000:.0f} ms):')
+    for row in rows:
+        print(f'  - {row[1]}: p95={row[p95_index]:.1f} ms  p99={row[p95_index + 1]:.1f} ms  '
+              f'p99.9={row[p95_index + 2]:.1f} ms')
+    if violations:
+        print(f'  ❌ {len(violations)} endpoint(s) sobre el SLO p95 de {SLO_P95_MS:.0f} ms')
+        if SLO_ENFORCE:
+            environment.process_exit_code = 1
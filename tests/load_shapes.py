@@ -0,0 +1,179 @@
+"""
+Perfiles de carga de modelo abierto (tasa de llegada) para Locust
+
+Cada perfil fija la tasa de peticiones ofrecida (RPS) en función del tiempo
+en lugar de un número fijo de usuarios. Los usuarios usan constant_pacing,
+por lo que cada uno ofrece 1 / max(pacing, tiempo de respuesta) peticiones
+por segundo; el perfil recalcula en cada tick los usuarios necesarios con la
+ley de Little (usuarios = RPS objetivo * ciclo por usuario). Así, cuando el
+backend se degrada, se agregan usuarios en vez de reducir la carga ofrecida.
+
+Selección: LOAD_SHAPE=step|spike|soak|diurnal (ver scripts/run-load-test.sh)
+Resultado: <csv-prefix>_shape.csv con RPS ofrecido vs logrado por segundo.
+"""
+
+import csv
+import math
+import os
+import time
+
+from locust import LoadTestShape, events
+
+# Intervalo fijo entre inicios de tarea de cada usuario (segundos)
+SHAPE_PACING = float(os.environ.get('SHAPE_PACING', '1'))
+SHAPE_MAX_USERS = int(os.environ.get('SHAPE_MAX_USERS', '5000'))
+SHAPE_SPAWN_RATE = float(os.environ.get('SHAPE_SPAWN_RATE', '50'))
+
+
+def _seconds(value):
+    """Convertir '90', '30s', '5m' o '2h' a segundos"""
+    value = str(value).strip()
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def _env_rps(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _env_seconds(name, default):
+    return _seconds(os.environ.get(name, default))
+
+
+class ArrivalRateShape(LoadTestShape):
+    """
+    Base de los perfiles de tasa de llegada: las subclases solo definen
+    target_rps(run_time), que devuelve el RPS ofrecido o None para terminar
+    """
+    abstract = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeline = []
+
+    def target_rps(self, run_time):
+        raise NotImplementedError
+
+    def _cycle_seconds(self):
+        """Duración del ciclo de un usuario: max(pacing, mediana actual)"""
+        stats = self.runner.stats.total
+        try:
+            response_time = stats.get_current_response_time_percentile(0.5) or stats.avg_response_time
+        except ValueError:
+            response_time = stats.avg_response_time
+        return max(SHAPE_PACING, (response_time or 0) / 1000.0)
+
+    def tick(self):
+        run_time = self.get_run_time()
+        rate = self.target_rps(run_time)
+        if rate is None:
+            return None
+
+        users = min(SHAPE_MAX_USERS, max(1, math.ceil(rate * self._cycle_seconds())))
+        self.timeline.append((
+            int(time.time()), round(run_time, 1), round(rate, 2),
+            round(self.runner.stats.total.current_rps, 2), self.runner.user_count, users
+        ))
+        return users, SHAPE_SPAWN_RATE
+
+
+class StepShape(ArrivalRateShape):
+    """Rampa escalonada: STEP_START_RPS + STEP_RPS por escalón de STEP_DURATION"""
+    start_rps = _env_rps('STEP_START_RPS', '10')
+    step_rps = _env_rps('STEP_RPS', '10')
+    step_duration = _env_seconds('STEP_DURATION', '60s')
+    steps = int(os.environ.get('STEP_COUNT', '10'))
+
+    def target_rps(self, run_time):
+        step = int(run_time // self.step_duration)
+        if step >= self.steps:
+            return None
+        return self.start_rps + step * self.step_rps
+
+
+class SpikeShape(ArrivalRateShape):
+    """Carga base con un pico de SPIKE_RPS entre SPIKE_AT y SPIKE_AT + SPIKE_DURATION"""
+    base_rps = _env_rps('SPIKE_BASE_RPS', '20')
+    spike_rps = _env_rps('SPIKE_RPS', '200')
+    spike_at = _env_seconds('SPIKE_AT', '2m')
+    spike_duration = _env_seconds('SPIKE_DURATION', '1m')
+    duration = _env_seconds('SPIKE_TOTAL_DURATION', '6m')
+
+    def target_rps(self, run_time):
+        if run_time >= self.duration:
+            return None
+        if self.spike_at <= run_time < self.spike_at + self.spike_duration:
+            return self.spike_rps
+        return self.base_rps
+
+
+class SoakShape(ArrivalRateShape):
+    """Carga constante de SOAK_RPS durante SOAK_DURATION (varias horas) tras una rampa"""
+    rps = _env_rps('SOAK_RPS', '50')
+    ramp = _env_seconds('SOAK_RAMP', '5m')
+    duration = _env_seconds('SOAK_DURATION', '4h')
+
+    def target_rps(self, run_time):
+        if run_time >= self.duration:
+            return None
+        if run_time < self.ramp:
+            return max(1.0, self.rps * run_time / self.ramp)
+        return self.rps
+
+
+class DiurnalShape(ArrivalRateShape):
+    """
+    Curva diaria comprimida: valle nocturno (DIURNAL_MIN_RPS) y pico de la
+    tarde (DIURNAL_MAX_RPS) en un período de DIURNAL_PERIOD, DIURNAL_CYCLES veces
+    """
+    min_rps = _env_rps('DIURNAL_MIN_RPS', '5')
+    max_rps = _env_rps('DIURNAL_MAX_RPS', '100')
+    period = _env_seconds('DIURNAL_PERIOD', '24m')
+    cycles = float(os.environ.get('DIURNAL_CYCLES', '1'))
+
+    def target_rps(self, run_time):
+        if run_time >= self.period * self.cycles:
+            return None
+        phase = 2 * math.pi * run_time / self.period
+        return self.min_rps + (self.max_rps - self.min_rps) * (1 - math.cos(phase)) / 2
+
+
+SHAPES = {
+    'step': StepShape,
+    'spike': SpikeShape,
+    'soak': SoakShape,
+    'diurnal': DiurnalShape,
+}
+
+
+def get_shape(name):
+    """Clase de perfil para LOAD_SHAPE; error claro si el nombre no existe"""
+    try:
+        return SHAPES[name]
+    except KeyError:
+        raise ValueError(f"LOAD_SHAPE desconocido: '{name}' (opciones: {', '.join(SHAPES)})")
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    """Guardar y resumir RPS ofrecido vs logrado"""
+    shape = environment.shape_class
+    if not isinstance(shape, ArrivalRateShape) or not shape.timeline:
+        return
+
+    csv_prefix = getattr(environment.parsed_options, 'csv_prefix', None)
+    if csv_prefix:
+        with open(f'{csv_prefix}_shape.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Timestamp', 'Run Time', 'Offered RPS', 'Achieved RPS', 'User Count', 'Target Users'])
+            writer.writerows(shape.timeline)
+
+    offered = sum(row[2] for row in shape.timeline)
+    achieved = sum(row[3] for row in shape.timeline)
+    ratio = achieved / offered if offered else 0.0
+    print(f'\n📈 Perfil {type(shape).__name__}: ofrecido {offered:.0f} req, '
+          f'logrado {achieved:.0f} req ({ratio:.1%})')
+    if ratio < 0.95:
+        print('  ⚠️  El sistema no sostuvo la tasa de llegada ofrecida')
@@ -1,11 +1,35 @@
 """
 Locustfile para pruebas de carga del e-commerce
 Ejecutar: locust -f tests/locustfile.py --host=http://localhost:8080
+Solo flujo de compra: locust -f tests/locustfile.py --host=http://localhost:8080 CheckoutJourneyUser
+Alto rendimiento: MODE=distributed ./scripts/run-load-test.sh (master + un worker por núcleo)
+Tasa de llegada: LOAD_SHAPE=step|spike|soak|diurnal ./scripts/run-load-test.sh
 """
 
-from locust import HttpUser, task, between
+from locust import HttpUser, SequentialTaskSet, task, between, constant_pacing
+from locust.contrib.fasthttp import FastHttpUser
+from datetime import datetime
+import os
 import random
 
+# Registra el monitor de CPU del generador y el registro HDR (listeners de eventos)
+import generator_monitor  # noqa: F401
+import hdr_recorder  # noqa: F401
+import load_shapes
+
+# Perfil de carga de modelo abierto (tasa de llegada); vacío = modelo cerrado
+LOAD_SHAPE = os.environ.get('LOAD_SHAPE', '')
+
+# Credenciales del usuario que realiza el flujo de compra
+JOURNEY_USERNAME = os.environ.get('LOCUST_USERNAME', 'selimhorri')
+JOURNEY_PASSWORD = os.environ.get('LOCUST_PASSWORD', 'password')
+
+# Formato de fecha de OrderDto (AppConstant.LOCAL_DATE_TIME_FORMAT)
+ORDER_DATE_FORMAT = '%d-%m-%Y__%H:%M:%S:%f'
+
+# Conexiones keep-alive por usuario virtual en FastEcommerceUser
+FAST_CLIENT_CONCURRENCY = int(os.environ.get('LOCUST_FAST_CONCURRENCY', '4'))
+
 class EcommerceUser(HttpUser):
     """
     Simula un usuario del e-commerce realizando diferentes acciones
@@ -63,3 +87,174 @@ class EcommerceUser(HttpUser):
         service = random.choice(services)
         self.client.get(f"/{service}/actuator/health", name="Health Check")
 
+
+class FastEcommerceUser(FastHttpUser):
+    """
+    Variante de EcommerceUser sobre FastHttpUser (geventhttpclient) con pool
+    de conexiones keep-alive; genera varias veces más RPS por núcleo que
+    el cliente basado en python-requests
+    """
+    wait_time = EcommerceUser.wait_time
+    tasks = EcommerceUser.tasks
+    concurrency = FAST_CLIENT_CONCURRENCY
+    connection_timeout = 10.0
+    network_timeout = 30.0
+
+
+def _collection(response):
+    """Extraer la lista 'collection' de un DtoCollectionResponse"""
+    try:
+        return response.json().get('collection') or []
+    except ValueError:
+        return []
+
+
+class CheckoutJourney(SequentialTaskSet):
+    """
+    Flujo de compra completo: navegar catálogo, carrito, orden, pago y envío.
+    Cada paso reutiliza los IDs devueltos por el servidor en el paso anterior.
+    """
+
+    def on_start(self):
+        self.product = None
+        self.cart_id = None
+        self.order_id = None
+        self.payment_id = None
+        if self.user.user_id is None and not self.user.resolve_user():
+            # Sin usuario propio no se compra: compartir uno falsearía la contención medida
+            self.interrupt(reschedule=False)
+
+    def extract_id(self, response, field):
+        """
+        Obtener el ID generado por el servidor; si no existe se marca la
+        respuesta como fallida y se reinicia el flujo completo
+        """
+        try:
+            value = response.json().get(field) if response.ok else None
+        except ValueError:
+            value = None
+        if value is None:
+            response.failure(f"Respuesta sin '{field}' (HTTP {response.status_code})")
+            self.interrupt(reschedule=True)
+        return value
+
+    @task
+    def browse_products(self):
+        """Listar productos y elegir uno existente"""
+        with self.client.get("/product-service/api/products", name="Journey: Get Products",
+                             catch_response=True) as response:
+            products = _collection(response)
+            if not products:
+                response.failure("Catálogo de productos vacío")
+                self.interrupt(reschedule=True)
+            self.product = random.choice(products)
+
+    @task
+    def browse_categories(self):
+        """Listar categorías"""
+        self.client.get("/product-service/api/categories", name="Journey: Get Categories")
+
+    @task
+    def view_product(self):
+        """Ver el detalle del producto elegido"""
+        self.client.get(f"/product-service/api/products/{self.product['productId']}",
+                        name="Journey: Get Product by ID")
+
+    @task
+    def add_to_cart(self):
+        """Crear un carrito para el usuario (CartResource)"""
+        with self.client.post("/order-service/api/carts", json={'userId': self.user.user_id},
+                              name="Journey: Create Cart", catch_response=True) as response:
+            self.cart_id = self.extract_id(response, 'cartId')
+
+    @task
+    def create_order(self):
+        """Crear una orden asociada al carrito (OrderResource)"""
+        order = {
+            'orderDate': datetime.now().strftime(ORDER_DATE_FORMAT),
+            'orderDesc': f"Locust order - {self.product.get('productTitle', '')}",
+            'orderFee': self.product.get('priceUnit') or 0.0,
+            'cart': {'cartId': self.cart_id},
+        }
+        with self.client.post("/order-service/api/orders", json=order,
+                              name="Journey: Create Order", catch_response=True) as response:
+            self.order_id = self.extract_id(response, 'orderId')
+
+    @task
+    def pay_order(self):
+        """Registrar el pago de la orden (PaymentResource)"""
+        payment = {
+            'isPayed': True,
+            'paymentStatus': 'COMPLETED',
+            'order': {'orderId': self.order_id},
+        }
+        with self.client.post("/payment-service/api/payments", json=payment,
+                              name="Journey: Create Payment", catch_response=True) as response:
+            self.payment_id = self.extract_id(response, 'paymentId')
+
+    @task
+    def ship_order(self):
+        """Registrar el envío del producto (OrderItemResource)"""
+        order_item = {
+            'orderId': self.order_id,
+            'productId': self.product['productId'],
+            'orderedQuantity': random.randint(1, 3),
+        }
+        with self.client.post("/shipping-service/api/shippings", json=order_item,
+                              name="Journey: Create Shipping", catch_response=True) as response:
+            self.extract_id(response, 'orderId')
+
+    @task
+    def read_back(self):
+        """Leer de vuelta la orden, el pago y el envío creados"""
+        self.client.get(f"/order-service/api/orders/{self.order_id}", name="Journey: Get Order by ID")
+        self.client.get(f"/payment-service/api/payments/{self.payment_id}", name="Journey: Get Payment by ID")
+        self.client.get(f"/shipping-service/api/shippings/{self.order_id}/{self.product['productId']}",
+                        name="Journey: Get Shipping by ID")
+        self.interrupt(reschedule=False)
+
+
+class CheckoutJourneyUser(HttpUser):
+    """
+    Simula un cliente que completa el flujo de compra de punta a punta
+    (rutas de escritura: carrito, orden, pago y envío)
+    """
+    wait_time = between(1, 3)
+    tasks = [CheckoutJourney]
+
+    def on_start(self):
+        """Login en proxy-client y resolución del userId"""
+        self.user_id = None
+        with self.client.post("/app/api/authenticate", name="Journey: Login", catch_response=True,
+                              json={'username': JOURNEY_USERNAME, 'password': JOURNEY_PASSWORD}) as response:
+            try:
+                token = response.json().get('jwtToken') if response.ok else None
+            except ValueError:
+                token = None
+            if token:
+                self.client.headers['Authorization'] = f'Bearer {token}'
+            else:
+                response.failure(f"Login fallido para {JOURNEY_USERNAME}")
+        self.resolve_user()
+
+    def resolve_user(self):
+        """
+        Obtener el userId de JOURNEY_USERNAME; si falla se marca la respuesta
+        y el flujo no arranca hasta que la consulta se resuelva
+        """
+        with self.client.get(f"/user-service/api/users/username/{JOURNEY_USERNAME}",
+                             name="Journey: Get User by Username", catch_response=True) as response:
+            try:
+                self.user_id = response.json().get('userId') if response.ok else None
+            except ValueError:
+                self.user_id = None
+            if self.user_id is None:
+                response.failure(f"Usuario {JOURNEY_USERNAME} no encontrado")
+        return self.user_id is not None
+
+
+if LOAD_SHAPE:
+    # Modelo abierto: ritmo fijo por usuario, el perfil ajusta la cantidad de usuarios
+    for user_class in (EcommerceUser, FastEcommerceUser, CheckoutJourneyUser):
+        user_class.wait_time = constant_pacing(load_shapes.SHAPE_PACING)
+    SelectedLoadShape = load_shapes.get_shape(LOAD_SHAPE)
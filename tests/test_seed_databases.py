@@ -0,0 +1,113 @@
+"""
+Pruebas del seeder de bases de datos (seed_databases.py)
+
+La prueba de COPY contra Postgres solo corre con SEED_DATABASES_DSN apuntando
+a un servidor con las bases de los servicios, p. ej.
+SEED_DATABASES_DSN='postgresql://postgres@localhost:5432/{db}'.
+"""
+import csv
+import os
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import seed_databases  # noqa: E402
+from seed_databases import GENERATORS, check_schema, copy_statement, load_chunk, load_schema, row_counts  # noqa: E402
+
+SCALE = 0.05
+
+
+@pytest.fixture(scope='module')
+def schema():
+    tables, foreign_keys = load_schema()
+    assert check_schema(tables) == []
+    return tables, foreign_keys
+
+
+def targets_for(tables, **paths):
+    return {**{'postgres': None, 'csv': None, 'parquet': None}, **paths,
+            'types': {name: [tuple(column) for column in table.columns] for name, table in tables.items()}}
+
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_copy_statement_matches_migration_columns(schema):
+    tables, _ = schema
+    statement = copy_statement('orders', GENERATORS['orders'][1])
+    assert statement == ('COPY orders (order_id, cart_id, order_date, order_desc, order_fee, created_at, updated_at) '
+                         'FROM STDIN (FORMAT csv)')
+    assert statement.split('(')[1].split(')')[0].split(', ') == [column.name for column in tables['orders'].columns]
+
+
+def test_parquet_matches_csv(schema, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    tables, _ = schema
+    counts = row_counts(SCALE)
+    targets = targets_for(tables, csv=str(tmp_path), parquet=str(tmp_path))
+    for table in ('orders', 'products', 'credentials', 'categories'):
+        db = tables[table].db
+        assert load_chunk(table, db, 1, counts[table] + 1, counts, 7, targets) == (table, counts[table])
+
+        header, *rows = read_csv(tmp_path / db / table / 'part-0000000001.csv')
+        parquet = pyarrow.parquet.read_table(tmp_path / db / table / 'part-0000000001.parquet')
+        assert parquet.column_names == header == list(GENERATORS[table][1])
+        assert parquet.num_rows == len(rows)
+        for name, sql_type in tables[table].columns:
+            field = parquet.schema.field(name).type
+            if sql_type.startswith('DECIMAL'):
+                assert pyarrow.types.is_decimal(field)
+                assert parquet.column(name)[0].as_py() == Decimal(rows[0][header.index(name)])
+            elif sql_type.startswith('TIMESTAMP'):
+                assert pyarrow.types.is_timestamp(field)
+            elif sql_type.startswith('INT'):
+                assert pyarrow.types.is_integer(field)
+                values = [int(row[header.index(name)]) if row[header.index(name)] else None for row in rows]
+                assert parquet.column(name).to_pylist() == values
+
+
+@pytest.mark.skipif(not os.environ.get('SEED_DATABASES_DSN'), reason='sin SEED_DATABASES_DSN')
+def test_copy_loads_rows_and_refuses_non_empty_tables(schema):
+    pytest.importorskip('psycopg')
+    tables, foreign_keys = schema
+    dsn = os.environ['SEED_DATABASES_DSN']
+    user_tables = [table for table in tables.values() if table.db == 'userdb']
+    assert seed_databases.prepare_database(dsn, 'userdb', user_tables, create_schema=True, truncate=True) == []
+
+    counts = row_counts(SCALE)
+    targets = targets_for(tables, postgres=dsn)
+    assert load_chunk('users', 'userdb', 1, counts['users'] + 1, counts, 7, targets) == ('users', counts['users'])
+    with seed_databases.psycopg.connect(dsn.format(db='userdb')) as connection:
+        assert connection.execute('SELECT count(*), max(user_id) FROM users').fetchone() == (counts['users'],
+                                                                                           counts['users'])
+    assert seed_databases.prepare_database(dsn, 'userdb', user_tables, create_schema=False,
+                                           truncate=False) == ['users']
+
+
+@pytest.mark.skipif(not os.environ.get('SEED_DATABASES_DSN'), reason='sin SEED_DATABASES_DSN')
+def test_workers_keep_one_connection(schema, monkeypatch):
+    pytest.importorskip('psycopg')
+    tables, _ = schema
+    dsn = os.environ['SEED_DATABASES_DSN']
+    for db in ('userdb', 'productdb'):
+        seed_databases.prepare_database(dsn, db, [table for table in tables.values() if table.db == db],
+                                        create_schema=True, truncate=True)
+    monkeypatch.setattr(seed_databases, '_cached', None)
+
+    counts = row_counts(SCALE)
+    targets = targets_for(tables, postgres=dsn)
+    load_chunk('users', 'userdb', 1, counts['users'] + 1, counts, 7, targets)
+    first = seed_databases._cached[1]
+    load_chunk('categories', 'productdb', 1, counts['categories'] + 1, counts, 7, targets)
+    assert first.closed
+    assert seed_databases._cached[0] == dsn.format(db='productdb')
+    seed_databases._close_connection()
+    assert seed_databases.free_connections(dsn, 'userdb') > 0
@@ -0,0 +1,135 @@
+"""
+Lectura en streaming de exportaciones de trazas Jaeger y Zipkin
+E-Commerce Microservices Platform
+
+Normaliza los spans de ambos formatos a Span y los entrega traza por traza,
+de modo que en memoria solo vive la traza que se está procesando.
+
+Formatos aceptados (archivo .json o .jsonl, opcionalmente .gz):
+  - Jaeger UI / API: {"data": [{"traceID", "spans": [...], "processes": {...}}]}
+  - Zipkin v2 /api/v2/traces: [[span, ...], [span, ...]]
+  - Zipkin v2 lista plana de spans, agrupada por traceId consecutivo
+  - JSON Lines: una traza Jaeger, una traza Zipkin o un span Zipkin por línea
+
+Con el paquete opcional ijson los .json grandes se recorren sin cargarlos
+completos; sin él se usa json.load (recomendado: exportar en .jsonl).
+"""
+import gzip
+import json
+from collections import namedtuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+Span = namedtuple('Span', 'trace_id span_id parent_id service name kind start duration remote_service')
+
+
+def _open(path):
+    path = str(path)
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def _jaeger_trace(trace):
+    processes = trace.get('processes', {})
+    spans = []
+    for raw in trace.get('spans', []):
+        tags = {tag['key']: tag.get('value') for tag in raw.get('tags', [])}
+        parent = next((ref['spanID'] for ref in raw.get('references', []) if ref.get('refType') == 'CHILD_OF'), None)
+        process = processes.get(raw.get('processID'), raw.get('process') or {})
+        spans.append(Span(
+            trace_id=raw['traceID'],
+            span_id=raw['spanID'],
+            parent_id=parent,
+            service=process.get('serviceName', 'unknown'),
+            name=tags.get('http.route') or raw.get('operationName', ''),
+            kind=str(tags.get('span.kind', 'internal')).lower(),
+            start=int(raw['startTime']),
+            duration=int(raw.get('duration', 0)),
+            remote_service=tags.get('peer.service'),
+        ))
+    return spans
+
+
+def _zipkin_span(raw):
+    tags = raw.get('tags') or {}
+    local = raw.get('localEndpoint') or {}
+    remote = raw.get('remoteEndpoint') or {}
+    name = tags.get('http.route') or raw.get('name', '')
+    if tags.get('http.method') and not name.lower().startswith(tags['http.method'].lower()):
+        name = f"{tags['http.method'].lower()} {name}"
+    return Span(
+        trace_id=raw['traceId'],
+        span_id=raw['id'],
+        parent_id=raw.get('parentId'),
+        service=local.get('serviceName', 'unknown'),
+        name=name,
+        kind=str(raw.get('kind', 'internal')).lower(),
+        start=int(raw.get('timestamp', 0)),
+        duration=int(raw.get('duration', 0)),
+        remote_service=remote.get('serviceName') or tags.get('peer.service'),
+    )
+
+
+def _traces_from_items(items):
+    """Agrupa elementos de nivel superior (traza Jaeger, traza Zipkin o span) en trazas"""
+    pending, pending_id = [], None
+    for item in items:
+        if isinstance(item, dict) and 'spans' in item:
+            yield _jaeger_trace(item)
+        elif isinstance(item, dict) and 'data' in item:
+            for trace in item['data']:
+                yield _jaeger_trace(trace)
+        elif isinstance(item, list):
+            yield [_zipkin_span(raw) for raw in item]
+        elif isinstance(item, dict):
+            span = _zipkin_span(item)
+            if pending and span.trace_id != pending_id:
+                yield pending
+                pending = []
+            pending.append(span)
+            pending_id = span.trace_id
+    if pending:
+        yield pending
+
+
+def _json_items(f):
+    first = f.read(1)
+    while first.isspace():
+        first = f.read(1)
+    f.seek(0)
+    if ijson is not None:
+        yield from ijson.items(f, 'data.item' if first == b'{' else 'item', use_float=True)
+        return
+    document = json.load(f)
+    yield from document.get('data', []) if isinstance(document, dict) else document
+
+
+def iter_traces(path):
+    """Trazas (listas de Span) de un archivo de exportación, una a la vez"""
+    with _open(path) as f:
+        if '.jsonl' in str(path):
+            items = (json.loads(line) for line in f if line.strip())
+        else:
+            items = _json_items(f)
+        yield from _traces_from_items(items)
+
+
+def build_tree(spans):
+    """(raíces, hijos por span_id) de una traza; los huérfanos se tratan como raíces"""
+    ids = {span.span_id for span in spans}
+    children = {}
+    roots = []
+    for span in spans:
+        if span.parent_id and span.parent_id in ids:
+            children.setdefault(span.parent_id, []).append(span)
+        else:
+            roots.append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span.start)
+    return roots, children
+
+
+def endpoint_name(span):
+    return f'{span.service} {span.name}'
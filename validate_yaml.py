@@ -1,57 +1,340 @@
 #!/usr/bin/env python3
-import yaml
+"""
+Validación de todos los YAML del repositorio
+E-Commerce Microservices Platform
+
+Descubre cada .yaml/.yml (k8s/, helm-charts/, .github/workflows/, compose,
+configuración de Spring...), los parsea con el cargador C de libyaml en un
+pool de procesos y valida los objetos de Kubernetes (apiVersion + kind)
+contra los esquemas de KINDS: apiVersion admitida, campos obligatorios,
+nombres DNS-1123, etiquetas y variables de entorno como strings, cantidades
+de recursos, selectores del Deployment contenidos en las etiquetas del pod
+y data de los Secret en base64.
+
+Los resultados se guardan en .yaml-validation-cache.json por SHA-256 del
+contenido: un archivo cuyo tamaño y mtime no cambiaron no se vuelve a leer,
+y uno que cambió pero con un contenido ya visto no se vuelve a parsear.
+Las plantillas de los charts de Helm (templates/) son Go templates y se
+omiten.
+
+Uso:
+  python3 validate_yaml.py                     # todo el repositorio
+  python3 validate_yaml.py k8s helm-charts     # solo algunas rutas
+  python3 validate_yaml.py --no-cache --verbose
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-errors = []
-files_checked = 0
+import yaml
+
+from generate_manifests import PARALLEL_THRESHOLD
+from service_registry import BASE_DIR
+
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+CACHE_FILE = BASE_DIR / '.yaml-validation-cache.json'
+# Cambiar al modificar KINDS o las reglas: invalida los resultados guardados
+CACHE_VERSION = 2
+EXTENSIONS = ('.yaml', '.yml')
+EXCLUDED_DIRS = {'.git', 'target', 'node_modules', '__pycache__', '.venv', 'venv', '.mvn', '.idea'}
+
+POD_TEMPLATES = ('spec.template.spec', 'spec.jobTemplate.spec.template.spec')
+# kind -> (apiVersions admitidas, {campo obligatorio: tipo})
+KINDS = {
+    'Namespace': (('v1',), {}),
+    'ConfigMap': (('v1',), {}),
+    'Secret': (('v1',), {}),
+    'ServiceAccount': (('v1',), {}),
+    'Service': (('v1',), {'spec.ports': list}),
+    'PersistentVolumeClaim': (('v1',), {'spec.accessModes': list, 'spec.resources.requests': dict}),
+    'Deployment': (('apps/v1',), {'spec.selector.matchLabels': dict, 'spec.template.metadata.labels': dict,
+                                  'spec.template.spec.containers': list}),
+    'StatefulSet': (('apps/v1',), {'spec.serviceName': str, 'spec.selector.matchLabels': dict,
+                                   'spec.template.metadata.labels': dict, 'spec.template.spec.containers': list}),
+    'Job': (('batch/v1',), {'spec.template.spec.containers': list}),
+    'CronJob': (('batch/v1',), {'spec.schedule': str, 'spec.jobTemplate.spec.template.spec.containers': list}),
+    'Ingress': (('networking.k8s.io/v1',), {'spec.rules': list}),
+    'NetworkPolicy': (('networking.k8s.io/v1',), {'spec.podSelector': dict}),
+    'Role': (('rbac.authorization.k8s.io/v1',), {'rules': list}),
+    'ClusterRole': (('rbac.authorization.k8s.io/v1',), {'rules': list}),
+    'RoleBinding': (('rbac.authorization.k8s.io/v1',), {'roleRef.kind': str, 'roleRef.name': str, 'subjects': list}),
+    'ClusterRoleBinding': (('rbac.authorization.k8s.io/v1',), {'roleRef.kind': str, 'roleRef.name': str,
+                                                               'subjects': list}),
+    'StorageClass': (('storage.k8s.io/v1',), {'provisioner': str}),
+    'PodDisruptionBudget': (('policy/v1',), {'spec.selector': dict}),
+    'HorizontalPodAutoscaler': (('autoscaling/v2',), {'spec.scaleTargetRef.kind': str, 'spec.scaleTargetRef.name': str,
+                                                      'spec.maxReplicas': int, 'spec.metrics': list}),
+    'ScaledObject': (('keda.sh/v1alpha1',), {'spec.scaleTargetRef.name': str, 'spec.triggers': list}),
+    'ServiceMonitor': (('monitoring.coreos.com/v1',), {'spec.selector': dict, 'spec.endpoints': list}),
+    'PrometheusRule': (('monitoring.coreos.com/v1',), {'spec.groups': list}),
+    'Jaeger': (('jaegertracing.io/v1',), {}),
+}
+DNS_1123 = re.compile(r'^[a-z0-9]([-a-z0-9.]*[a-z0-9])?$')
+QUANTITY = re.compile(r'^[0-9]+(\.[0-9]+)?([eE][0-9]+|m|k|M|G|T|P|E|Ki|Mi|Gi|Ti|Pi|Ei)?$')
+
+
+def lookup(document, path):
+    """Valor de un campo con notación de puntos (None si falta algún nivel)"""
+    value = document
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def as_list(value, where, errors):
+    """Elementos de un campo de lista (vacío si falta); si no es lista agrega el error"""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        errors.append(f'{where} debe ser una lista')
+        return []
+    return value
+
+
+def as_dict(value, where, errors):
+    """Un campo de mapa (vacío si falta); si no es mapa agrega el error"""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        errors.append(f'{where} debe ser un mapa')
+        return {}
+    return value
+
+
+def check_labels(labels, where):
+    if not isinstance(labels, dict):
+        return [f'{where} debe ser un mapa']
+    return [f'{where}.{key}: el valor debe ser string (es {type(value).__name__})'
+            for key, value in labels.items() if not isinstance(value, str)]
+
+
+def check_containers(pod_spec, where):
+    errors = []
+    for field in ('initContainers', 'containers'):
+        for index, container in enumerate(as_list(pod_spec.get(field), f'{where}.{field}', errors)):
+            prefix = f'{where}.{field}[{index}]'
+            if not isinstance(container, dict):
+                errors.append(f'{prefix} debe ser un mapa')
+                continue
+            for key in ('name', 'image'):
+                if not isinstance(container.get(key), str):
+                    errors.append(f'{prefix}.{key} es obligatorio')
+            for port in as_list(container.get('ports'), f'{prefix}.ports', errors):
+                if not isinstance(port, dict) or not isinstance(port.get('containerPort'), int):
+                    errors.append(f'{prefix}.ports.containerPort debe ser entero')
+            for variable in as_list(container.get('env'), f'{prefix}.env', errors):
+                if not isinstance(variable, dict):
+                    errors.append(f'{prefix}.env: cada variable debe ser un mapa')
+                elif 'value' in variable and not isinstance(variable['value'], str):
+                    errors.append(f"{prefix}.env {variable.get('name')}: value debe ser string")
+            resources = as_dict(container.get('resources'), f'{prefix}.resources', errors)
+            for section in ('requests', 'limits'):
+                quantities = as_dict(resources.get(section), f'{prefix}.resources.{section}', errors)
+                for resource, quantity in quantities.items():
+                    if not QUANTITY.match(str(quantity)):
+                        errors.append(f'{prefix}.resources.{section}.{resource}: cantidad inválida {quantity!r}')
+    return errors
+
+
+def check_object(document):
+    """Errores de un objeto de Kubernetes según KINDS (un kind desconocido solo valida metadata)"""
+    kind, api_version = document['kind'], document['apiVersion']
+    errors = []
+    name = lookup(document, 'metadata.name')
+    if not isinstance(name, str) or not name:
+        errors.append('metadata.name es obligatorio')
+    elif len(name) > 253 or not DNS_1123.match(name):
+        errors.append(f'metadata.name {name!r} no es un nombre DNS-1123 válido')
+    if lookup(document, 'metadata.labels') is not None:
+        errors.extend(check_labels(document['metadata']['labels'], 'metadata.labels'))
+
+    if kind not in KINDS:
+        return errors
+    versions, required = KINDS[kind]
+    if api_version not in versions:
+        errors.append(f"apiVersion {api_version} no válida para {kind} (esperada: {', '.join(versions)})")
+    for path, expected in required.items():
+        value = lookup(document, path)
+        if value is None:
+            errors.append(f'{path} es obligatorio')
+        elif not isinstance(value, expected):
+            errors.append(f'{path} debe ser {expected.__name__}')
 
-def validate_yaml_file(filepath):
-    global files_checked
+    for path in POD_TEMPLATES:
+        pod_spec = lookup(document, path)
+        if isinstance(pod_spec, dict):
+            errors.extend(check_containers(pod_spec, path))
+    selector = lookup(document, 'spec.selector.matchLabels')
+    template_labels = lookup(document, 'spec.template.metadata.labels')
+    if isinstance(selector, dict) and isinstance(template_labels, dict):
+        errors.extend(check_labels(template_labels, 'spec.template.metadata.labels'))
+        if any(template_labels.get(key) != value for key, value in selector.items()):
+            errors.append('spec.selector.matchLabels no coincide con spec.template.metadata.labels')
+    if kind == 'Secret':
+        for key, value in as_dict(document.get('data'), 'data', errors).items():
+            try:
+                base64.b64decode(str(value), validate=True)
+            except binascii.Error:
+                errors.append(f'data.{key} no es base64 válido')
+    return errors
+
+
+def validate_content(content):
+    """{'documents': n, 'kinds': [...], 'errors': [...], 'warnings': [...]} de un archivo"""
+    result = {'documents': 0, 'kinds': [], 'errors': [], 'warnings': []}
     try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-            # Handle multiple YAML documents
-            for doc in yaml.safe_load_all(content):
-                if doc is not None:
-                    files_checked += 1
-        return True
-    except yaml.YAMLError as e:
-        errors.append(f'{filepath}: {e}')
-        return False
-    except Exception as e:
-        errors.append(f'{filepath}: {e}')
-        return False
-
-# Validate key files
-key_files = [
-    'k8s/namespaces/namespaces.yaml',
-    'k8s/storage/storage-class.yaml',
-    'k8s/databases/postgres-statefulset.yaml',
-    'k8s/services/user_service/deployment.yaml',
-    'k8s/config/user-service-configmap.yaml',
-    'k8s/secrets/user-service-secret.yaml',
-    'k8s/ingress/ingress.yaml',
-    'k8s/network-policies/default-deny.yaml',
-    'k8s/rbac/service-accounts.yaml',
-    'k8s/autoscaling/hpa-user-service.yaml'
-]
-
-print('Validando archivos YAML clave...')
-for file in key_files:
-    path = Path(file)
-    if path.exists():
-        if validate_yaml_file(path):
-            print(f'  âœ… {file}')
+        documents = list(yaml.load_all(content, Loader=Loader))
+    except yaml.YAMLError as error:
+        result['errors'].append(str(error).replace('\n', ' '))
+        return result
+    for index, document in enumerate(documents, 1):
+        if document is None:
+            continue
+        result['documents'] += 1
+        if not isinstance(document, dict) or 'apiVersion' not in document or 'kind' not in document:
+            continue
+        kind = document['kind']
+        if not isinstance(kind, str) or not isinstance(document['apiVersion'], str):
+            result['errors'].append(f'documento {index}: kind y apiVersion deben ser string')
+            continue
+        result['kinds'].append(kind)
+        if kind not in KINDS:
+            result['warnings'].append(f'documento {index}: kind {kind} sin esquema, solo se valida metadata')
+        label = f"documento {index} ({kind} {lookup(document, 'metadata.name') or '?'})"
+        result['errors'].extend(f'{label}: {error}' for error in check_object(document))
+    return result
+
+
+def _validate_chunk(items):
+    return [(path, validate_content(content)) for path, content in items]
+
+
+def _relative(path):
+    try:
+        return path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def discover(roots):
+    """(archivos YAML relativos a BASE_DIR o absolutos si están fuera, plantillas de Helm omitidas)"""
+    found, skipped = [], 0
+    for root in roots:
+        root = Path(root).resolve()
+        if root.is_file():
+            found.append(_relative(root))
+            continue
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+            if 'Chart.yaml' in files and 'templates' in dirs:
+                dirs.remove('templates')
+                skipped += sum(len(names) for _, _, names in os.walk(Path(directory) / 'templates'))
+            for name in sorted(files):
+                if name.endswith(EXTENSIONS):
+                    found.append(_relative(Path(directory) / name))
+    return sorted(set(found)), skipped
+
+
+def load_cache(path=CACHE_FILE):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {'version': CACHE_VERSION, 'files': {}, 'results': {}}
+    if cache.get('version') != CACHE_VERSION:
+        return {'version': CACHE_VERSION, 'files': {}, 'results': {}}
+    return cache
+
+
+def validate(paths, cache, jobs=None):
+    """{ruta: resultado} reutilizando la caché; devuelve también cuántos se parsearon"""
+    results, pending, files = {}, [], {}
+    for path in paths:
+        stat = (BASE_DIR / path).stat()
+        entry = cache['files'].get(path)
+        if entry and entry[:2] == [stat.st_mtime_ns, stat.st_size] and entry[2] in cache['results']:
+            results[path] = cache['results'][entry[2]]
+            files[path] = entry
+            continue
+        content = (BASE_DIR / path).read_bytes()
+        sha = hashlib.sha256(content).hexdigest()
+        files[path] = [stat.st_mtime_ns, stat.st_size, sha]
+        if sha in cache['results']:
+            results[path] = cache['results'][sha]
         else:
-            print(f'  âŒ {file}')
+            pending.append((path, content))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) < PARALLEL_THRESHOLD:
+        parsed = _validate_chunk(pending)
     else:
-        print(f'  âš ï¸  {file} no encontrado')
-
-if errors:
-    print(f'\nâŒ Errores encontrados: {len(errors)}')
-    for error in errors:
-        print(f'  {error}')
-    sys.exit(1)
-else:
-    print(f'\nâœ… Todos los archivos validados correctamente ({files_checked} documentos)')
+        size = -(-len(pending) // jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = [item for chunk in pool.map(_validate_chunk, [pending[i:i + size]
+                                                                   for i in range(0, len(pending), size)])
+                      for item in chunk]
+    for path, result in parsed:
+        results[path] = result
+
+    # Conservar solo los resultados referenciados por archivos que siguen existiendo
+    previous = cache['results']
+    fresh = {files[path][2]: results[path] for path in files}
+    cache['files'].update(files)
+    cache['files'] = {path: entry for path, entry in cache['files'].items()
+                      if path in files or (BASE_DIR / path).exists()}
+    cache['results'] = {entry[2]: fresh.get(entry[2]) or previous[entry[2]] for entry in cache['files'].values()
+                        if entry[2] in fresh or entry[2] in previous}
+    return results, len(pending)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Validación de sintaxis y esquemas de todos los YAML')
+    parser.add_argument('paths', nargs='*', default=[str(BASE_DIR)], help='archivos o directorios (default: repositorio)')
+    parser.add_argument('--jobs', type=int, help='procesos de parseo (default: CPUs)')
+    parser.add_argument('--no-cache', action='store_true', help='ignorar y no guardar la caché')
+    parser.add_argument('--verbose', action='store_true', help='listar cada archivo y las advertencias')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    paths, skipped = discover(args.paths)
+    if not paths:
+        print('⚠️  No se encontraron archivos YAML')
+        sys.exit(0)
+    cache = {'version': CACHE_VERSION, 'files': {}, 'results': {}} if args.no_cache else load_cache()
+    results, parsed = validate(paths, cache, args.jobs)
+    if not args.no_cache:
+        with open(CACHE_FILE, 'w') as f:
+            json.dump(cache, f)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    failed = {path: result for path, result in results.items() if result['errors']}
+    for path in paths:
+        result = results[path]
+        if args.verbose:
+            print(f"  {'❌' if result['errors'] else '✅'} {path} ({result['documents']} documentos)")
+            for warning in result['warnings']:
+                print(f'      ⚠️  {warning}')
+    documents = sum(result['documents'] for result in results.values())
+    objects = sum(len(result['kinds']) for result in results.values())
+    note = f', {skipped} plantillas de Helm omitidas' if skipped else ''
+    print(f'📄 {len(paths)} archivos, {documents} documentos ({objects} objetos de Kubernetes){note}; '
+          f'{parsed} parseados, {len(paths) - parsed} desde caché en {elapsed:.0f} ms')
+
+    if failed:
+        print(f"\n❌ Errores encontrados: {sum(len(result['errors']) for result in failed.values())}")
+        for path, result in sorted(failed.items()):
+            for error in result['errors']:
+                print(f'  {path}: {error}')
+        sys.exit(1)
+    print('✅ Todos los archivos validados correctamente')